@@ -18,7 +18,7 @@ def rebuild_paths_circuits(obj):
     termination_type = ContentType.objects.get_for_model(CircuitTermination)
 
     cable_paths = CablePath.objects.filter(
-        Q(path__contains=obj)
+        Q(pk__in=CablePath.objects.traversing(obj).values("pk"))
         | Q(destination_type=termination_type, destination_id=obj.pk)
         | Q(origin_type=termination_type, origin_id=obj.pk)
     )
@@ -1,5 +1,11 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
 from django.db.models import QuerySet
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from nautobot.utilities.config import get_settings_or_config
 
@@ -9,10 +15,26 @@ class OptionalLimitOffsetPagination(LimitOffsetPagination):
     Override the stock paginator to allow setting limit=0 to disable pagination for a request. This returns all objects
     matching a query, but retains the same format as a paginated request. The limit can only be disabled if
     MAX_PAGE_SIZE has been set to 0 or None.
+
+    Passing the `cursor` query parameter (initially empty) instead of `offset` switches to keyset pagination: objects
+    are ordered by primary key, and each page is retrieved by filtering on the last primary key of the previous page,
+    which is encoded in the `next` link. This avoids both counting the objects (`count` is null) and skipping over
+    previous pages with OFFSET, so every page is equally fast to retrieve and objects created or deleted while paging
+    through a list neither shift the following pages nor cause objects to be returned twice.
     """
 
+    cursor_query_param = "cursor"
+    cursor_query_description = "Opaque cursor returned in the `next` link, or empty to retrieve the first page."
+    invalid_cursor_message = "Invalid cursor"
+
+    cursor = None
+    next_cursor = None
+
     def paginate_queryset(self, queryset, request, view=None):
 
+        if self.cursor_query_param in request.query_params and isinstance(queryset, QuerySet):
+            return self.paginate_queryset_by_cursor(queryset, request)
+
         if isinstance(queryset, QuerySet):
             self.count = queryset.count()
         else:
@@ -34,6 +56,47 @@ class OptionalLimitOffsetPagination(LimitOffsetPagination):
         else:
             return list(queryset[self.offset :])  # noqa: E203
 
+    def paginate_queryset_by_cursor(self, queryset, request):
+        """
+        Return the page of objects following the cursor, ordered by primary key.
+        """
+        self.count = None
+        self.limit = self.get_limit(request)
+        self.request = request
+        self.cursor = self.decode_cursor(queryset.model, request.query_params[self.cursor_query_param])
+
+        queryset = queryset.order_by("pk")
+        if self.cursor is not None:
+            queryset = queryset.filter(pk__gt=self.cursor)
+
+        if not self.limit:
+            return list(queryset)
+
+        # Retrieve one extra object to determine whether there is a next page
+        results = list(queryset[: self.limit + 1])
+        if len(results) > self.limit:
+            results = results[: self.limit]
+            self.next_cursor = results[-1].pk
+        return results
+
+    def decode_cursor(self, model, cursor):
+        """
+        Return the primary key encoded in the given cursor, or None for an empty cursor (the first page).
+        """
+        if not cursor:
+            return None
+        try:
+            value = urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            return model._meta.pk.to_python(value)
+        except (binascii.Error, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, pk):
+        """
+        Return the cursor identifying the page of objects following the given primary key.
+        """
+        return urlsafe_b64encode(str(pk).encode("utf-8")).decode("ascii")
+
     def get_limit(self, request):
 
         if self.limit_query_param:
@@ -60,12 +123,34 @@ class OptionalLimitOffsetPagination(LimitOffsetPagination):
         if not self.limit:
             return None
 
+        if self.count is None:
+            # Keyset pagination
+            if self.next_cursor is None:
+                return None
+            url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+            return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_cursor))
+
         return super().get_next_link()
 
     def get_previous_link(self):
 
-        # Pagination has been disabled
-        if not self.limit:
+        # Pagination has been disabled, or keyset pagination (which only moves forward) is in use
+        if not self.limit or self.count is None:
             return None
 
         return super().get_previous_link()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {
+                    "type": "string",
+                },
+            }
+        )
+        return parameters
@@ -22,7 +22,6 @@ from drf_yasg.openapi import Schema, TYPE_OBJECT, TYPE_ARRAY
 from drf_yasg.utils import swagger_auto_schema
 from rq.worker import Worker as RQWorker
 
-from graphql import get_default_backend
 from graphql.execution import ExecutionResult
 from graphql.type.schema import GraphQLSchema
 from graphql.execution.middleware import MiddlewareManager
@@ -30,8 +29,11 @@ from graphene_django.settings import graphene_settings
 from graphene_django.views import GraphQLView, instantiate_middleware, HttpError
 
 from nautobot.core.celery import app as celery_app
+from nautobot.core.graphql import get_saved_query
+from nautobot.core.graphql.backends import get_backend
 from nautobot.core.api import BulkOperationSerializer
 from nautobot.core.api.exceptions import SerializerNotFound
+from nautobot.extras.models import GraphQLQuery
 from nautobot.utilities.api import get_serializer_for_model
 from . import serializers
 
@@ -204,6 +206,9 @@ class ModelViewSet(BulkUpdateModelMixin, BulkDestroyModelMixin, ModelViewSetMixi
     Extend DRF's ModelViewSet to support bulk update and delete functions.
     """
 
+    # Objects saved by perform_update() during a bulk update, whose object-level permissions are enforced at once
+    _bulk_updated_objects = None
+
     def _validate_objects(self, instance):
         """
         Check that the provided instance or list of instances are matched by the current queryset. This confirms that
@@ -236,14 +241,32 @@ class ModelViewSet(BulkUpdateModelMixin, BulkDestroyModelMixin, ModelViewSetMixi
         logger = logging.getLogger("nautobot.core.api.views.ModelViewSet")
         logger.info(f"Updating {model._meta.verbose_name} {serializer.instance} (PK: {serializer.instance.pk})")
 
-        # Enforce object-level permissions on save()
+        # Enforce object-level permissions on save(), or once all objects have been saved when updating in bulk
         try:
             with transaction.atomic():
                 instance = serializer.save()
-                self._validate_objects(instance)
+                if self._bulk_updated_objects is not None:
+                    self._bulk_updated_objects.append(instance)
+                else:
+                    self._validate_objects(instance)
         except ObjectDoesNotExist:
             raise PermissionDenied()
 
+    def perform_bulk_update(self, objects, update_data, partial):
+        self._bulk_updated_objects = []
+        try:
+            with transaction.atomic():
+                data_list = super().perform_bulk_update(objects, update_data, partial)
+                # Enforce object-level permissions on all updated objects with a single query
+                try:
+                    self._validate_objects(self._bulk_updated_objects)
+                except ObjectDoesNotExist:
+                    raise PermissionDenied()
+        finally:
+            self._bulk_updated_objects = None
+
+        return data_list
+
     def perform_destroy(self, instance):
         model = self.queryset.model
         logger = logging.getLogger("nautobot.core.api.views.ModelViewSet")
@@ -391,7 +414,7 @@ class GraphQLDRFAPIView(APIView):
             schema = graphene_settings.SCHEMA
 
         if backend is None:
-            backend = get_default_backend()
+            backend = get_backend()
 
         if middleware is None:
             middleware = graphene_settings.MIDDLEWARE
@@ -461,6 +484,9 @@ class GraphQLDRFAPIView(APIView):
         """
         query, variables, operation_name, id = GraphQLView.get_graphql_params(request, data)
 
+        if not query:
+            query = self.get_persisted_query(id, data)
+
         execution_result = self.execute_graphql_request(request, data, query, variables, operation_name)
 
         status_code = 200
@@ -475,12 +501,40 @@ class GraphQLDRFAPIView(APIView):
             else:
                 response["data"] = execution_result.data
 
+            if execution_result.extensions:
+                response["extensions"] = execution_result.extensions
+
             result = response
         else:
             result = None
 
         return result, status_code
 
+    def get_persisted_query(self, id, data):
+        """Return the text of the saved query identified by the SHA-256 hash of its text, if provided.
+
+        The hash can be given either as the `id` parameter, or as the `extensions.persistedQuery.sha256Hash` parameter
+        used by Apollo clients.
+
+        Args:
+            id (str): Optional persisted query ID, as extracted from the request
+            data (dict): Parsed content of the body of the request.
+
+        Returns:
+            str: GraphQL query, or None if no persisted query ID is provided
+        """
+        query_hash = id
+        extensions = data.get("extensions")
+        if not query_hash and isinstance(extensions, dict):
+            query_hash = (extensions.get("persistedQuery") or {}).get("sha256Hash")
+        if not query_hash:
+            return None
+
+        try:
+            return get_saved_query(query_hash=query_hash).query
+        except GraphQLQuery.DoesNotExist:
+            raise HttpError(HttpResponseBadRequest("PersistedQueryNotFound"))
+
     def parse_body(self, request):
         """Analyze the request and based on the content type,
         extract the query from the body as a string or as a JSON payload.
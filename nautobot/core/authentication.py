@@ -1,6 +1,9 @@
 import logging
-from collections import defaultdict
+import threading
+import time
+from collections import defaultdict, OrderedDict
 
+from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.backends import (
     BaseBackend,
@@ -8,6 +11,8 @@ from django.contrib.auth.backends import (
     RemoteUserBackend as _RemoteUserBackend,
 )
 from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Q
 
 from nautobot.users.models import ObjectPermission
@@ -19,13 +24,114 @@ from nautobot.utilities.permissions import (
 
 logger = logging.getLogger("nautobot.authentication")
 
+# Cache key of the shared ObjectPermission version, incremented every time permissions or group memberships change.
+OBJECT_PERMISSIONS_VERSION_CACHE_KEY = "nautobot.authentication.object_permissions.version"
+
+# Number of seconds the permissions of a user are kept in the shared cache
+OBJECT_PERMISSIONS_CACHE_TIMEOUT = 3600
+
+
+class ObjectPermissionCache:
+    """
+    Cache of the permissions granted to each user by ObjectPermissions, shared by all processes through the Django
+    cache, with an in-process LRU cache in front of it.
+
+    Entries are keyed by user and by a version counter stored in the Django cache, which is incremented by signals
+    whenever an ObjectPermission, its assignments or group memberships change, so that no process uses permissions
+    loaded before the change. As with `nautobot.extras.metadata.metadata_cache`, the shared version is checked at most
+    once per request (or once per `version_check_interval` seconds outside of requests).
+
+    Cached permissions are shared by every caller in this process and must not be modified.
+    """
+
+    max_size = 1024
+    version_check_interval = 1
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.version = None
+        self._checked_at = None
+
+    def _check_version(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.version_check_interval:
+            return
+        version = cache.get(OBJECT_PERMISSIONS_VERSION_CACHE_KEY, 0)
+        with self._lock:
+            if version != self.version:
+                self._entries = OrderedDict()
+                self.version = version
+            self._checked_at = now
+
+    def _has_uncommitted_changes(self):
+        """
+        Return True if permissions have been changed by a transaction of this thread which is not yet committed, in
+        which case the cache is bypassed until the transaction ends.
+        """
+        connection = transaction.get_connection()
+        return any(entry[1] == self.invalidate for entry in connection.run_on_commit)
+
+    def get(self, user_obj, load):
+        """
+        Return the cached permissions of the given user, calling `load(user_obj)` to load them if needed.
+        """
+        if self._has_uncommitted_changes():
+            return load(user_obj)
+
+        self._check_version()
+        version = self.version
+        with self._lock:
+            perms = self._entries.get(user_obj.pk)
+            if perms is not None:
+                self._entries.move_to_end(user_obj.pk)
+                return perms
+
+        cache_key = f"nautobot.authentication.object_permissions.{version}.{user_obj.pk}"
+        perms = cache.get(cache_key)
+        if perms is None:
+            # The version was read before loading, so permissions changed meanwhile are stored under an old version
+            perms = dict(load(user_obj))
+            cache.set(cache_key, perms, timeout=OBJECT_PERMISSIONS_CACHE_TIMEOUT)
+
+        with self._lock:
+            # The cache may have been invalidated while the permissions were loaded
+            if self.version == version and self._checked_at is not None:
+                self._entries[user_obj.pk] = perms
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return perms
+
+    def expire(self, **kwargs):
+        """Check the shared version on the next lookup; connected to the start of each request."""
+        self._checked_at = None
+
+    def changed(self):
+        """
+        Invalidate the cache for permissions changed in the current transaction, immediately and again once the
+        transaction is committed.
+        """
+        self.invalidate()
+        transaction.on_commit(self.invalidate)
+
+    def invalidate(self, **kwargs):
+        """Discard the cached permissions and increment the shared version, notifying other processes of the change."""
+        with self._lock:
+            self._entries = OrderedDict()
+            self._checked_at = None
+        cache.add(OBJECT_PERMISSIONS_VERSION_CACHE_KEY, 0, timeout=None)
+        cache.incr(OBJECT_PERMISSIONS_VERSION_CACHE_KEY)
+
+
+object_permission_cache = ObjectPermissionCache()
+
 
 class ObjectPermissionBackend(ModelBackend):
     def get_all_permissions(self, user_obj, obj=None):
         if not user_obj.is_active or user_obj.is_anonymous:
             return dict()
         if not hasattr(user_obj, "_object_perm_cache"):
-            user_obj._object_perm_cache = self.get_object_permissions(user_obj)
+            user_obj._object_perm_cache = object_permission_cache.get(user_obj, self.get_object_permissions)
         return user_obj._object_perm_cache
 
     def get_object_permissions(self, user_obj):
@@ -76,21 +182,47 @@ class ObjectPermissionBackend(ModelBackend):
         if model._meta.label_lower != ".".join((app_label, model_name)):
             raise ValueError(f"Invalid permission {perm} for model {model}")
 
-        # Compile a query filter that matches all instances of the specified model
-        obj_perm_constraints = self.get_all_permissions(user_obj)[perm]
+        # Permission to perform the requested action on the object depends on whether the specified object matches
+        # the specified constraints. Note that this check is made against the *database* record representing the object,
+        # not the instance itself.
+        return model.objects.filter(self.get_constraints(user_obj, perm), pk=obj.pk).exists()
+
+    def get_constraints(self, user_obj, perm):
+        """
+        Compile a query filter that matches all instances to which the given permission is granted to the user.
+        """
         constraints = Q()
-        for perm_constraints in obj_perm_constraints:
+        for perm_constraints in self.get_all_permissions(user_obj)[perm]:
             if perm_constraints:
                 constraints |= Q(**perm_constraints)
             else:
                 # Found ObjectPermission with null constraints; allow model-level access
                 constraints = Q()
                 break
+        return constraints
 
-        # Permission to perform the requested action on the object depends on whether the specified object matches
-        # the specified constraints. Note that this check is made against the *database* record representing the object,
-        # not the instance itself.
-        return model.objects.filter(constraints, pk=obj.pk).exists()
+    def get_permitted_pks(self, user_obj, perm, objects):
+        """
+        Return the set of PKs of the given objects (all instances of the model the permission applies to) on which
+        the given permission is granted to the user, evaluating the permission constraints with a single query.
+
+        This is equivalent to, but much faster than, calling `has_perm()` for each object.
+        """
+        objects = list(objects)
+        if not objects or not self.has_perm(user_obj, perm):
+            return set()
+
+        app_label, _, model_name = resolve_permission(perm)
+        model = apps.get_model(app_label, model_name)
+        if any(obj._meta.model is not model for obj in objects):
+            raise ValueError(f"Invalid permission {perm} for the given objects")
+        pks = {obj.pk for obj in objects}
+
+        # Superusers implicitly have all permissions, and exempt permissions are not enforced
+        if user_obj.is_superuser or permission_is_exempt(perm):
+            return pks
+
+        return set(model.objects.filter(self.get_constraints(user_obj, perm), pk__in=pks).values_list("pk", flat=True))
 
 
 class RemoteUserBackend(_RemoteUserBackend):
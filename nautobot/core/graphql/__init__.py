@@ -1,10 +1,11 @@
 from django.test.client import RequestFactory
 
+from nautobot.core.graphql.backends import get_backend, get_query_hash
+from nautobot.extras.metadata import metadata_cache
 from nautobot.extras.models import GraphQLQuery
 
 from graphene.types import Scalar
 from graphene_django.settings import graphene_settings
-from graphql import get_default_backend
 from graphql.language import ast
 
 
@@ -25,7 +26,7 @@ def execute_query(query, variables=None, request=None, user=None):
     if not request:
         request = RequestFactory().post("/graphql/")
         request.user = user
-    backend = get_default_backend()
+    backend = get_backend()
     schema = graphene_settings.SCHEMA
     document = backend.document_from_string(schema, query)
     if variables:
@@ -46,10 +47,31 @@ def execute_saved_query(saved_query_slug, **kwargs):
     Returns:
         GraphQL Object: Result for query
     """
-    query = GraphQLQuery.objects.get(slug=saved_query_slug)
+    query = get_saved_query(slug=saved_query_slug)
     return execute_query(query=query.query, **kwargs)
 
 
+def get_saved_query(slug=None, query_hash=None):
+    """Return a saved GraphQL query, from the definitions cached by the process.
+
+    Args:
+        - slug (str, optional): Slug of the saved GraphQL query.
+        - query_hash (str, optional): SHA-256 hash of the text of the saved GraphQL query, used as a persisted query ID.
+
+    Returns:
+        GraphQLQuery: Saved query
+
+    Raises:
+        GraphQLQuery.DoesNotExist: if no saved query matches
+    """
+    for query in metadata_cache.get(GraphQLQuery.objects.all()):
+        if slug is not None and query.slug == slug:
+            return query
+        if query_hash is not None and get_query_hash(query.query) == query_hash:
+            return query
+    raise GraphQLQuery.DoesNotExist("GraphQLQuery matching query does not exist.")
+
+
 # See also:
 # https://github.com/graphql-python/graphene-django/issues/241
 # https://github.com/graphql-python/graphene/pull/1261 (graphene 3.0)
@@ -0,0 +1,135 @@
+"""GraphQL backend caching parsed and validated documents."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache, partial
+
+from graphql import GraphQLError, parse, validate
+from graphql.backend.core import GraphQLCoreBackend
+from graphql.backend.base import GraphQLDocument
+from graphql.execution import ExecutionResult, execute
+from graphql.language import ast
+from prometheus_client import Counter, Histogram
+
+from nautobot.core.graphql.cost import analyze_query_cost
+
+# Maximum number of parsed and validated documents kept in memory by each process
+DOCUMENT_CACHE_SIZE = 500
+
+graphql_document_cache_hit = Counter("graphql_document_cache_hit", "Number of parsed GraphQL document cache hits")
+graphql_document_cache_miss = Counter("graphql_document_cache_miss", "Number of parsed GraphQL document cache misses")
+graphql_phase_duration = Histogram(
+    "graphql_phase_duration_seconds",
+    "Time spent parsing, validating, estimating the cost of and executing GraphQL queries",
+    ["phase"],
+)
+
+
+@lru_cache(maxsize=DOCUMENT_CACHE_SIZE)
+def get_query_hash(query):
+    """Return the SHA-256 hash of a GraphQL query, identifying it in the document cache and as a persisted query."""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def timed(phase):
+    """Record the duration of the enclosed GraphQL processing phase."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        graphql_phase_duration.labels(phase).observe(time.monotonic() - start)
+
+
+def execute_document(schema, document_ast, validation_errors, **kwargs):
+    """Execute a parsed document, unless it failed validation or exceeds the configured cost limits.
+
+    When cost limits are configured, the cost of the query is reported in the `cost` extension of the result.
+    """
+    if validation_errors:
+        return ExecutionResult(errors=validation_errors, invalid=True)
+
+    with timed("estimate"):
+        cost = analyze_query_cost(
+            schema,
+            document_ast,
+            variables=kwargs.get("variable_values"),
+            operation_name=kwargs.get("operation_name"),
+            context=kwargs.get("context_value"),
+        )
+    if cost is not None:
+        try:
+            cost.check_limits()
+        except GraphQLError as error:
+            return ExecutionResult(errors=[error], invalid=True, extensions={"cost": cost.as_dict()})
+
+    with timed("execute"):
+        result = execute(schema, document_ast, **kwargs)
+
+    if cost is not None:
+        result.extensions["cost"] = cost.as_dict(result.data)
+    return result
+
+
+class CachedGraphQLBackend(GraphQLCoreBackend):
+    """
+    GraphQL backend which parses and validates each distinct query only once.
+
+    Parsed documents, along with the result of their validation, are kept in a least-recently-used cache keyed by the
+    hash of the query, shared by all threads of the process. Executing a cached document therefore skips both parsing
+    and validation.
+    """
+
+    def __init__(self, executor=None, cache_size=DOCUMENT_CACHE_SIZE):
+        super().__init__(executor=executor)
+        self.cache_size = cache_size
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def document_from_string(self, schema, document_string):
+        if isinstance(document_string, ast.Document):
+            return super().document_from_string(schema, document_string)
+
+        key = (id(schema), get_query_hash(document_string))
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+                graphql_document_cache_hit.inc()
+                return document
+
+        graphql_document_cache_miss.inc()
+        # Syntax errors are raised to the caller, and never cached
+        with timed("parse"):
+            document_ast = parse(document_string)
+        with timed("validate"):
+            validation_errors = validate(schema, document_ast)
+
+        document = GraphQLDocument(
+            schema=schema,
+            document_string=document_string,
+            document_ast=document_ast,
+            execute=partial(execute_document, schema, document_ast, validation_errors, **self.execute_params),
+        )
+
+        with self._lock:
+            self._documents[key] = document
+            if len(self._documents) > self.cache_size:
+                self._documents.popitem(last=False)
+        return document
+
+    def clear(self):
+        """Discard all cached documents."""
+        with self._lock:
+            self._documents.clear()
+
+
+_backend = CachedGraphQLBackend()
+
+
+def get_backend():
+    """Return the GraphQL backend shared by the process."""
+    return _backend
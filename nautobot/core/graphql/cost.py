@@ -0,0 +1,212 @@
+"""Static cost analysis of GraphQL queries."""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql import GraphQLError
+from graphql.execution.values import get_argument_values
+from graphql.language.ast import FragmentDefinition, FragmentSpread, InlineFragment, OperationDefinition
+from graphql.type.definition import GraphQLList, GraphQLNonNull
+
+logger = logging.getLogger("nautobot.graphql.cost")
+
+# Number of seconds the total number of objects of each model is cached for, to estimate the size of nested lists
+ROW_COUNT_CACHE_TIMEOUT = 300
+
+
+class QueryCost:
+    """Estimated cost of a GraphQL query.
+
+    Attributes:
+        depth (int): maximum nesting depth of the selected fields
+        estimated_rows (int): estimated number of objects returned by all the list fields of the query, or None if
+            not estimated
+    """
+
+    def __init__(self, depth=0, estimated_rows=0):
+        self.depth = depth
+        self.estimated_rows = estimated_rows
+
+    def check_limits(self):
+        """Raise a GraphQLError if the query exceeds GRAPHQL_MAX_QUERY_DEPTH or GRAPHQL_MAX_QUERY_COST."""
+        if settings.GRAPHQL_MAX_QUERY_DEPTH and self.depth > settings.GRAPHQL_MAX_QUERY_DEPTH:
+            raise GraphQLError(
+                f"Query depth of {self.depth} exceeds the maximum allowed depth of {settings.GRAPHQL_MAX_QUERY_DEPTH}."
+            )
+        if (
+            settings.GRAPHQL_MAX_QUERY_COST
+            and self.estimated_rows is not None
+            and self.estimated_rows > settings.GRAPHQL_MAX_QUERY_COST
+        ):
+            raise GraphQLError(
+                f"Query is estimated to return {self.estimated_rows} objects, exceeding the maximum allowed cost of "
+                f"{settings.GRAPHQL_MAX_QUERY_COST}. Use filters to reduce the number of objects returned."
+            )
+
+    def as_dict(self, data=None):
+        """Return the cost to report in the extensions of the response, along with the actual number of objects."""
+        result = {"depth": self.depth}
+        if self.estimated_rows is not None:
+            result["estimated_rows"] = self.estimated_rows
+        if data is not None:
+            result["actual_rows"] = count_rows(data)
+        return result
+
+
+def analyze_query_cost(schema, document_ast, variables=None, operation_name=None, context=None):
+    """Return the QueryCost of a query if GRAPHQL_MAX_QUERY_DEPTH or GRAPHQL_MAX_QUERY_COST is set, otherwise None.
+
+    The number of objects returned by the query is only estimated if GRAPHQL_MAX_QUERY_COST is set, as this requires
+    counting the objects matching each top-level list.
+    """
+    if not settings.GRAPHQL_MAX_QUERY_DEPTH and not settings.GRAPHQL_MAX_QUERY_COST:
+        return None
+    return QueryCostEstimator(
+        schema,
+        document_ast,
+        variables=variables,
+        operation_name=operation_name,
+        user=getattr(context, "user", None),
+        estimate_rows=bool(settings.GRAPHQL_MAX_QUERY_COST),
+    ).estimate()
+
+
+def get_row_count(model):
+    """Return the total number of objects of a model, cached for ROW_COUNT_CACHE_TIMEOUT seconds."""
+    return cache.get_or_set(
+        f"nautobot.graphql.row_count.{model._meta.label_lower}", model.objects.count, timeout=ROW_COUNT_CACHE_TIMEOUT
+    )
+
+
+def count_rows(data):
+    """Return the number of objects included in lists of the result of a query."""
+    if isinstance(data, dict):
+        return sum(count_rows(value) for value in data.values())
+    if isinstance(data, list):
+        return sum(1 + count_rows(item) if isinstance(item, dict) else 0 for item in data)
+    return 0
+
+
+def _unwrap_type(graphql_type):
+    """Return the named type of a field type, and whether it is a list."""
+    is_list = False
+    while isinstance(graphql_type, (GraphQLList, GraphQLNonNull)):
+        if isinstance(graphql_type, GraphQLList):
+            is_list = True
+        graphql_type = graphql_type.of_type
+    return graphql_type, is_list
+
+
+def _get_model(graphql_type):
+    """Return the Django model of a GraphQL object type, if any."""
+    meta = getattr(getattr(graphql_type, "graphene_type", None), "_meta", None)
+    return getattr(meta, "model", None)
+
+
+class QueryCostEstimator:
+    """
+    Estimate the cost of a query from its parsed document, before executing it.
+
+    The cost of a query is the estimated number of objects returned by all of its list fields:
+
+    - A list at the top level of the query returns the objects matching its filters, which are counted exactly with the
+      FilterSet used by its list resolver (see `generate_list_resolver`).
+    - A nested list, such as the interfaces of each device, is estimated to return for each of its parent objects the
+      average number of its objects per parent object across the whole database.
+    """
+
+    def __init__(self, schema, document_ast, variables=None, operation_name=None, user=None, estimate_rows=True):
+        self.schema = schema
+        self.estimate_rows = estimate_rows
+        self.document_ast = document_ast
+        self.variables = variables or {}
+        self.operation_name = operation_name
+        self.user = user
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document_ast.definitions
+            if isinstance(definition, FragmentDefinition)
+        }
+
+    def get_operation(self):
+        for definition in self.document_ast.definitions:
+            if isinstance(definition, OperationDefinition):
+                if self.operation_name is None or (definition.name and definition.name.value == self.operation_name):
+                    return definition
+        return None
+
+    def estimate(self):
+        """Return the QueryCost of the query operation."""
+        operation = self.get_operation()
+        if operation is None or operation.operation != "query":
+            return QueryCost()
+        cost = self._estimate_selection_set(operation.selection_set, self.schema.get_query_type(), None, 1, 1)
+        if not self.estimate_rows:
+            cost.estimated_rows = None
+        return cost
+
+    def _iter_fields(self, selection_set):
+        """Yield the field selections of a selection set, including those of fragments."""
+        for selection in selection_set.selections:
+            if isinstance(selection, FragmentSpread):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is not None:
+                    yield from self._iter_fields(fragment.selection_set)
+            elif isinstance(selection, InlineFragment):
+                yield from self._iter_fields(selection.selection_set)
+            else:
+                yield selection
+
+    def _estimate_selection_set(self, selection_set, parent_type, parent_model, parent_rows, depth):
+        cost = QueryCost(depth=depth)
+        for field_ast in self._iter_fields(selection_set):
+            field_def = getattr(parent_type, "fields", {}).get(field_ast.name.value)
+            if field_def is None or field_ast.selection_set is None:
+                # Scalar or introspection field
+                continue
+
+            field_type, is_list = _unwrap_type(field_def.type)
+            model = _get_model(field_type)
+            rows = parent_rows
+            if is_list and self.estimate_rows:
+                rows = parent_rows * self._estimate_list_rows(
+                    field_ast, field_def, field_type, model, parent_model, depth
+                )
+                cost.estimated_rows += rows
+
+            child_cost = self._estimate_selection_set(field_ast.selection_set, field_type, model, rows, depth + 1)
+            cost.depth = max(cost.depth, child_cost.depth)
+            cost.estimated_rows += child_cost.estimated_rows
+        return cost
+
+    def _estimate_list_rows(self, field_ast, field_def, field_type, model, parent_model, depth):
+        """Return the estimated number of objects returned by a list field for each of its parent objects."""
+        if model is None:
+            return 1
+
+        if depth == 1:
+            # Top-level list: count the objects matching the filters, as the list resolver would return them
+            filterset_class = getattr(field_type.graphene_type._meta, "filterset_class", None)
+            try:
+                queryset = model.objects.all()
+                if self.user is not None and hasattr(queryset, "restrict"):
+                    queryset = queryset.restrict(self.user, "view")
+                if filterset_class is not None and field_ast.arguments:
+                    kwargs = get_argument_values(field_def.args, field_ast.arguments, self.variables)
+                    filterset = filterset_class(kwargs, queryset)
+                    if not filterset.is_valid():
+                        return 0
+                    queryset = filterset.qs
+                return queryset.count()
+            except Exception as error:
+                logger.debug("Unable to count the objects of %s: %s", field_ast.name.value, error)
+                return get_row_count(model)
+
+        # Nested list: average number of objects per parent object
+        if parent_model is None:
+            return 1
+        parent_count = get_row_count(parent_model)
+        if not parent_count:
+            return 0
+        return -(-get_row_count(model) // parent_count)
@@ -5,11 +5,12 @@ import logging
 import graphene
 import graphene_django_optimizer as gql_optimizer
 from graphql import GraphQLError
+from graphql.language.ast import FragmentSpread, InlineFragment
 from graphene_django import DjangoObjectType
 
+from nautobot.core.graphql.loaders import get_relationship_peers_loader
 from nautobot.core.graphql.utils import str_to_var_name, get_filtering_args_from_filterset
 from nautobot.extras.choices import RelationshipSideChoices
-from nautobot.extras.models import RelationshipAssociation
 from nautobot.utilities.utils import get_filterset_for_model
 
 logger = logging.getLogger("nautobot.graphql.generators")
@@ -130,72 +131,15 @@ def generate_relationship_resolver(name, resolver_name, relationship, side, peer
     """
 
     def resolve_relationship(self, info, **kwargs):
-        """Return a queryset or an object depending on the type of the relationship."""
+        """Return a list of objects or an object depending on the type of the relationship."""
         peer_side = RelationshipSideChoices.OPPOSITE[side]
-        query_params = {"relationship": relationship}
-        # https://github.com/nautobot/nautobot/issues/1228
-        # If querying for **only** the ID of the related object, for example:
-        # { device(id:"...") { ... rel_my_relationship { id } } }
-        # we will get this exception:
-        # TypeError: Cannot call select_related() after .values() or .values_list()
-        # This appears to be a bug in graphene_django_optimizer but I haven't found a known issue on GitHub.
-        # For now we just work around it by catching the exception and retrying without optimization, below...
-        if not relationship.symmetric:
-            # Get the objects on the other side of this relationship
-            query_params[f"{side}_id"] = self.pk
-
-            try:
-                queryset_ids = gql_optimizer.query(
-                    RelationshipAssociation.objects.filter(**query_params).values_list(f"{peer_side}_id", flat=True),
-                    info,
-                )
-            except TypeError:
-                logger.debug("Caught TypeError in graphene_django_optimizer, falling back to un-optimized query")
-                queryset_ids = RelationshipAssociation.objects.filter(**query_params).values_list(
-                    f"{peer_side}_id", flat=True
-                )
-        else:
-            # Get objects that are peers for this relationship, regardless of side
-            try:
-                queryset_ids = list(
-                    gql_optimizer.query(
-                        RelationshipAssociation.objects.filter(source_id=self.pk, **query_params).values_list(
-                            "destination_id", flat=True
-                        ),
-                        info,
-                    )
-                )
-                queryset_ids += list(
-                    gql_optimizer.query(
-                        RelationshipAssociation.objects.filter(destination_id=self.pk, **query_params).values_list(
-                            "source_id", flat=True
-                        ),
-                        info,
-                    )
-                )
-            except TypeError:
-                logger.debug("Caught TypeError in graphene_django_optimizer, falling back to un-optimized query")
-                queryset_ids = list(
-                    RelationshipAssociation.objects.filter(source_id=self.pk, **query_params).values_list(
-                        "destination_id", flat=True
-                    ),
-                )
-                queryset_ids += list(
-                    RelationshipAssociation.objects.filter(destination_id=self.pk, **query_params).values_list(
-                        "source_id", flat=True
-                    ),
-                )
+        # The peers of all the objects being resolved are loaded at once by a loader shared across the request
+        peers = get_relationship_peers_loader(info, relationship, side, peer_model).load(self.pk)
 
         if relationship.has_many(peer_side):
-            return gql_optimizer.query(peer_model.objects.filter(id__in=queryset_ids), info)
+            return peers
 
-        # Also apparently a graphene_django_optimizer bug - in the same query case as described above, here we may see:
-        # AttributeError: object has no attribute "only"
-        try:
-            return gql_optimizer.query(peer_model.objects.filter(id__in=queryset_ids).first(), info)
-        except AttributeError:
-            logger.debug("Caught AttributeError in graphene_django_optimizer, falling back to un-optimized query")
-            return peer_model.objects.filter(id__in=queryset_ids).first()
+        return peers.then(lambda peers: peers[0] if peers else None)
 
     resolve_relationship.__name__ = resolver_name
     return resolve_relationship
@@ -278,6 +222,33 @@ def generate_single_item_resolver(schema_type, resolver_name):
     return single_resolver
 
 
+def selection_includes_field(info, field_name):
+    """
+    Return True if the field named `field_name` is selected directly on the field being resolved, including through
+    fragments.
+
+    Args:
+        info (ResolveInfo): GraphQL resolve info of the field being resolved
+        field_name (str): name of the field to look for
+
+    Returns:
+        bool: whether the field is selected
+    """
+    selection_sets = [field_ast.selection_set for field_ast in info.field_asts]
+    while selection_sets:
+        selection_set = selection_sets.pop()
+        if selection_set is None:
+            continue
+        for selection in selection_set.selections:
+            if isinstance(selection, FragmentSpread):
+                selection_sets.append(info.fragments[selection.name.value].selection_set)
+            elif isinstance(selection, InlineFragment):
+                selection_sets.append(selection.selection_set)
+            elif selection.name.value == field_name:
+                return True
+    return False
+
+
 def generate_list_resolver(schema_type, resolver_name):
     """
     Generate resolver for a list of schema_type.
@@ -296,6 +267,16 @@ def generate_list_resolver(schema_type, resolver_name):
     model = schema_type._meta.model
 
     def list_resolver(self, info, **kwargs):
+        queryset = _list_resolver(self, info, **kwargs)
+
+        # Resolving config_context per object would run a separate query for each object; compute it for the whole
+        # list at once instead.
+        if hasattr(model, "prefetch_config_context") and selection_includes_field(info, "config_context"):
+            return model.prefetch_config_context(queryset)
+
+        return queryset
+
+    def _list_resolver(self, info, **kwargs):
         filterset_class = schema_type._meta.filterset_class
         if filterset_class is not None:
             resolved_obj = filterset_class(kwargs, model.objects.restrict(info.context.user, "view").all())
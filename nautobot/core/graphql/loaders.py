@@ -0,0 +1,92 @@
+"""Request-scoped batch loaders for GraphQL resolvers."""
+
+import graphene_django_optimizer as gql_optimizer
+from django.db.models import Q
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from nautobot.extras.choices import RelationshipSideChoices
+from nautobot.extras.models import RelationshipAssociation
+
+
+class RelationshipPeersLoader(DataLoader):
+    """
+    Load the peers of objects through a given side of a custom relationship.
+
+    The PKs of all the objects whose peers are requested while executing a query are collected, and their associations
+    and peers are then retrieved with one query each, rather than with two or three queries per object.
+    """
+
+    def __init__(self, relationship, side, peer_model, info):
+        # Results are not cached, as the loader is attached to the request, which may execute several queries
+        super().__init__(cache=False)
+        self.relationship = relationship
+        self.side = side
+        self.peer_model = peer_model
+        self.info = info
+
+    def batch_load_fn(self, keys):
+        """Return a Promise of the list of peers of each of the given object PKs."""
+        associations = RelationshipAssociation.objects.filter(relationship=self.relationship)
+        peer_ids = {key: [] for key in keys}
+
+        if self.relationship.symmetric:
+            # Get objects that are peers for this relationship, regardless of side
+            for source_id, destination_id in associations.filter(
+                Q(source_id__in=peer_ids) | Q(destination_id__in=peer_ids)
+            ).values_list("source_id", "destination_id"):
+                if source_id in peer_ids:
+                    peer_ids[source_id].append(destination_id)
+                if destination_id in peer_ids:
+                    peer_ids[destination_id].append(source_id)
+        else:
+            # Get the objects on the other side of this relationship
+            peer_side = RelationshipSideChoices.OPPOSITE[self.side]
+            for object_id, peer_id in associations.filter(**{f"{self.side}_id__in": peer_ids}).values_list(
+                f"{self.side}_id", f"{peer_side}_id"
+            ):
+                peer_ids[object_id].append(peer_id)
+
+        all_peer_ids = {peer_id for ids in peer_ids.values() for peer_id in ids}
+        peers = {}
+        if all_peer_ids:
+            queryset = self.peer_model.objects.filter(id__in=all_peer_ids).order_by(
+                *(self.peer_model._meta.ordering or ["pk"])
+            )
+            peers = {peer.pk: peer for peer in gql_optimizer.query(queryset, self.info)}
+
+        # Return the peers of each object in the default order of the peer model
+        ordering = {pk: index for index, pk in enumerate(peers)}
+        return Promise.resolve(
+            [
+                sorted(
+                    (peers[peer_id] for peer_id in set(peer_ids[key]) if peer_id in peers),
+                    key=lambda peer: ordering[peer.pk],
+                )
+                for key in keys
+            ]
+        )
+
+
+def get_relationship_peers_loader(info, relationship, side, peer_model):
+    """
+    Return the RelationshipPeersLoader for this relationship and side, shared by all the resolvers of the request which
+    resolve the same field (such as `devices.rel_peers` for every device in a list), so that the peer query is
+    optimized for the selection of that field.
+
+    Args:
+        info (ResolveInfo): GraphQL resolve info of the field being resolved
+        relationship (Relationship): Relationship to load the peers through
+        side (str): side of the relationship of the objects whose peers are loaded
+        peer_model (Model): Django Model of the peer of this relationship
+
+    Returns:
+        RelationshipPeersLoader: loader of the peers of objects
+    """
+    loaders = info.context.__dict__.setdefault("_graphql_relationship_loaders", {})
+    # The path of the field in the response, without the indices of the objects in lists
+    field_path = tuple(key for key in info.path if not isinstance(key, int))
+    key = (relationship.pk, side, field_path)
+    if key not in loaders:
+        loaders[key] = RelationshipPeersLoader(relationship, side, peer_model, info)
+    return loaders[key]
@@ -57,6 +57,13 @@ ALLOWED_URL_SCHEMES = (
 # Base directory wherein all created files (jobs, git repositories, file uploads, static files) will be stored)
 NAUTOBOT_ROOT = os.getenv("NAUTOBOT_ROOT", os.path.expanduser("~/.nautobot"))
 
+# Buffer the change log records for each request or job, coalescing multiple changes to the same object into a
+# single record, and write them with one bulk insert. Set to False to record each change as soon as it is made.
+CHANGELOG_DEFERRED = True
+
+# Number of rows of CSV data validated (and, where possible, inserted) together when importing objects in bulk
+CSV_IMPORT_CHUNK_SIZE = 1000
+
 DOCS_ROOT = os.path.join(BASE_DIR, "docs")
 
 # By default, Nautobot will permit users to create duplicate prefixes and IP addresses in the global
@@ -78,6 +85,10 @@ HTTP_PROXIES = None
 JOBS_ROOT = os.getenv("NAUTOBOT_JOBS_ROOT", os.path.join(NAUTOBOT_ROOT, "jobs").rstrip("/"))
 MAINTENANCE_MODE = False
 
+# Store the rendered config context of each device and virtual machine, re-rendered in the background whenever anything
+# it depends on changes, so that reading it is a single indexed lookup.
+MATERIALIZED_CONFIG_CONTEXTS_ENABLED = False
+
 # Metrics
 METRICS_ENABLED = False
 
@@ -91,6 +102,10 @@ NAPALM_USERNAME = ""
 PLUGINS = []
 PLUGINS_CONFIG = {}
 
+# Maintain an in-memory radix tree index of all Prefixes in each Nautobot process, used to answer Prefix hierarchy,
+# utilization and available space queries without loading every child Prefix from the database.
+PREFIX_TREE_INDEX_ENABLED = False
+
 # Global 3rd-party authentication settings
 EXTERNAL_AUTH_DEFAULT_GROUPS = []
 EXTERNAL_AUTH_DEFAULT_PERMISSIONS = {}
@@ -112,6 +127,15 @@ STORAGE_CONFIG = {}
 # integration tests if explicitly passed in with `nautobot-server test --tag integration`.
 TEST_RUNNER = "nautobot.core.tests.runner.NautobotTestRunner"
 
+# Webhooks
+# Maximum number of webhook endpoints to which a single background task sends requests concurrently
+WEBHOOK_MAX_CONCURRENT_ENDPOINTS = 16
+# Maximum number of pooled connections to (and concurrent requests sent to) a single webhook endpoint per worker process
+WEBHOOK_MAX_CONNECTIONS_PER_ENDPOINT = 4
+# Number of times a failed webhook request is retried, waiting WEBHOOK_RETRY_BACKOFF seconds (doubled each retry)
+WEBHOOK_RETRY_BACKOFF = 30
+WEBHOOK_RETRY_LIMIT = 3
+
 #
 # Django cryptography
 #
@@ -539,6 +563,10 @@ GRAPHQL_CUSTOM_FIELD_PREFIX = "cf"
 GRAPHQL_RELATIONSHIP_PREFIX = "rel"
 GRAPHQL_COMPUTED_FIELD_PREFIX = "cpf"
 
+# Maximum estimated number of objects returned by, and maximum nesting depth of, a GraphQL query (None for no limit)
+GRAPHQL_MAX_QUERY_COST = None
+GRAPHQL_MAX_QUERY_DEPTH = None
+
 
 #
 # Caching
@@ -96,6 +96,34 @@ class APIPaginationTestCase(APITestCase):
         self.assertHttpStatus(response, 200)
         self.assertEqual(len(response.data["results"]), Provider.objects.count())
 
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"], PAGINATE_COUNT=4, MAX_PAGE_SIZE=10)
+    def test_cursor_pagination(self):
+        """Page through all objects with a cursor, following the next links."""
+        url = f"{self.url}?cursor="
+        pks = []
+        while url:
+            response = self.client.get(url, **self.header)
+            self.assertHttpStatus(response, 200)
+            self.assertIsNone(response.data["count"])
+            self.assertIsNone(response.data["previous"])
+            self.assertLessEqual(len(response.data["results"]), settings.PAGINATE_COUNT)
+            pks.extend(result["id"] for result in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(pks, sorted(str(pk) for pk in Provider.objects.values_list("pk", flat=True)))
+
+        # Objects deleted while paging through the list don't shift the following pages
+        response = self.client.get(f"{self.url}?cursor=&limit=5", **self.header)
+        Provider.objects.filter(pk=response.data["results"][0]["id"]).delete()
+        response = self.client.get(response.data["next"], **self.header)
+        self.assertEqual([result["id"] for result in response.data["results"]], pks[5:])
+        self.assertIsNone(response.data["next"])
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"])
+    def test_cursor_pagination_invalid_cursor(self):
+        response = self.client.get(f"{self.url}?cursor=foo", **self.header)
+        self.assertHttpStatus(response, 404)
+
     @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"])
     @override_config(PAGINATE_COUNT=5, MAX_PAGE_SIZE=10)
     def test_pagination_based_on_constance(self):
@@ -10,12 +10,14 @@ from django.urls import reverse
 from netaddr import IPNetwork
 from rest_framework.test import APIClient
 
+from nautobot.core.authentication import ObjectPermissionBackend, object_permission_cache
 from nautobot.core.settings_funcs import sso_auth_enabled
 from nautobot.dcim.models import Site
 from nautobot.extras.models import Status
 from nautobot.ipam.models import Prefix
 from nautobot.users.models import ObjectPermission, Token
-from nautobot.utilities.testing import TestCase
+from nautobot.utilities.permissions import get_permitted_pks
+from nautobot.utilities.testing import TestCase, TransactionTestCase
 
 
 # Use the proper swappable User model
@@ -412,3 +414,93 @@ class ObjectPermissionAPIViewTestCase(TestCase):
         url = reverse("ipam-api:prefix-detail", kwargs={"pk": self.prefixes[0].pk})
         response = self.client.delete(url, format="json", **self.header)
         self.assertEqual(response.status_code, 204)
+
+
+class ObjectPermissionCacheTestCase(TransactionTestCase):
+    """
+    Note: This is a TransactionTestCase, rather than a TestCase, because permissions changed by a transaction which is
+    not yet committed (such as the one wrapping each TestCase) are never cached.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username="testuser")
+        self.group = Group.objects.create(name="Group 1")
+        self.backend = ObjectPermissionBackend()
+        self.site_ct = ContentType.objects.get_for_model(Site)
+        self.permission = ObjectPermission.objects.create(name="View sites", actions=["view"])
+        self.permission.object_types.add(self.site_ct)
+        self.permission.users.add(self.user)
+
+    def tearDown(self):
+        # The database is flushed without sending any signals
+        object_permission_cache.invalidate()
+        super().tearDown()
+
+    def get_all_permissions(self):
+        # A new user instance for each call, as each request loads its own
+        return self.backend.get_all_permissions(User.objects.get(pk=self.user.pk))
+
+    def test_permissions_cached(self):
+        self.assertEqual(self.get_all_permissions(), {"dcim.view_site": [None]})
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_all_permissions(user), {"dcim.view_site": [None]})
+
+        # The permissions are shared by other processes through the Django cache
+        object_permission_cache.expire()
+        object_permission_cache._entries.clear()
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_all_permissions(user), {"dcim.view_site": [None]})
+
+    def test_permissions_invalidated(self):
+        self.get_all_permissions()
+
+        # Changing an ObjectPermission
+        self.permission.actions = ["view", "change"]
+        self.permission.save()
+        self.assertEqual(self.get_all_permissions(), {"dcim.view_site": [None], "dcim.change_site": [None]})
+
+        # Assigning an ObjectPermission to a group of the user
+        permission = ObjectPermission.objects.create(name="Add sites", actions=["add"], constraints={"name": "Site 1"})
+        permission.object_types.add(self.site_ct)
+        permission.groups.add(self.group)
+        self.assertNotIn("dcim.add_site", self.get_all_permissions())
+        self.user.groups.add(self.group)
+        self.assertEqual(self.get_all_permissions()["dcim.add_site"], [{"name": "Site 1"}])
+
+        # Removing the user from the group
+        self.user.groups.remove(self.group)
+        self.assertNotIn("dcim.add_site", self.get_all_permissions())
+
+        # Deleting an ObjectPermission
+        self.permission.delete()
+        self.assertEqual(self.get_all_permissions(), {})
+
+
+class ObjectPermissionBulkEvaluationTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sites = [Site.objects.create(name=f"Site {i}", slug=f"site-{i}") for i in range(1, 4)]
+        permission = ObjectPermission.objects.create(
+            name="Change sites", actions=["change"], constraints=[{"name": "Site 1"}, {"slug": "site-2"}]
+        )
+        permission.object_types.add(ContentType.objects.get_for_model(Site))
+        permission.users.add(self.user)
+
+    def test_get_permitted_pks(self):
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.has_perm("dcim.change_site"))
+
+        with self.assertNumQueries(1):
+            permitted_pks = get_permitted_pks(user, "dcim.change_site", self.sites)
+        self.assertEqual(permitted_pks, {self.sites[0].pk, self.sites[1].pk})
+        self.assertEqual(permitted_pks, {site.pk for site in self.sites if user.has_perm("dcim.change_site", obj=site)})
+        self.assertEqual(get_permitted_pks(user, "dcim.delete_site", self.sites), set())
+
+    def test_get_permitted_pks_superuser(self):
+        self.user.is_superuser = True
+        self.user.save()
+        with self.assertNumQueries(0):
+            permitted_pks = get_permitted_pks(self.user, "dcim.delete_site", self.sites)
+        self.assertEqual(permitted_pks, {site.pk for site in self.sites})
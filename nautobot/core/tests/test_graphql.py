@@ -22,7 +22,8 @@ from nautobot.core.graphql.generators import (
     generate_list_search_parameters,
     generate_schema_type,
 )
-from nautobot.core.graphql import execute_query, execute_saved_query
+from nautobot.core.graphql import execute_query, execute_saved_query, get_saved_query
+from nautobot.core.graphql.backends import CachedGraphQLBackend, get_query_hash
 from nautobot.core.graphql.utils import str_to_var_name
 from nautobot.core.graphql.schema import (
     extend_schema_type,
@@ -111,6 +112,60 @@ class GraphQLTestCase(TestCase):
         resp = execute_saved_query("gql-2", user=self.user, variables={"name": "site-1"}).to_dict()
         self.assertFalse(resp["data"].get("error"))
 
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"], GRAPHQL_MAX_QUERY_DEPTH=2)
+    def test_execute_query_max_depth(self):
+        result = execute_query("{ sites { name } }", user=self.user)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.extensions["cost"], {"depth": 2, "actual_rows": 3})
+
+        result = execute_query("{ sites { name region { name } } }", user=self.user)
+        self.assertTrue(result.invalid)
+        self.assertIn("exceeds the maximum allowed depth of 2", str(result.errors[0]))
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"], GRAPHQL_MAX_QUERY_COST=2)
+    def test_execute_query_max_cost(self):
+        result = execute_query("{ sites { name } }", user=self.user)
+        self.assertTrue(result.invalid)
+        self.assertIn("estimated to return 3 objects", str(result.errors[0]))
+        self.assertEqual(result.extensions["cost"], {"depth": 2, "estimated_rows": 3})
+
+        query = "query ($name: [String!]) { sites(name: $name) { name } }"
+        result = execute_query(query, user=self.user, variables={"name": ["Site-1", "Site-2"]})
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.extensions["cost"], {"depth": 2, "estimated_rows": 2, "actual_rows": 2})
+
+    def test_get_saved_query(self):
+        query = GraphQLQuery.objects.get(slug="gql-2")
+        self.assertEqual(get_saved_query(slug="gql-2"), query)
+        self.assertEqual(get_saved_query(query_hash=get_query_hash(query.query)), query)
+        with self.assertRaises(GraphQLQuery.DoesNotExist):
+            get_saved_query(query_hash=get_query_hash("{ sites {name} }"))
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"])
+    def test_document_cache(self):
+        backend = CachedGraphQLBackend(cache_size=2)
+        schema = graphene_settings.SCHEMA
+        request = RequestFactory().post("/graphql/")
+        request.user = self.user
+
+        document = backend.document_from_string(schema, "{ query: sites {name} }")
+        self.assertIs(backend.document_from_string(schema, "{ query: sites {name} }"), document)
+        self.assertEqual(len(document.execute(context_value=request).data["query"]), 3)
+
+        # Documents failing validation are cached along with their errors
+        invalid_document = backend.document_from_string(schema, "{ sites { nonexistent } }")
+        self.assertIs(backend.document_from_string(schema, "{ sites { nonexistent } }"), invalid_document)
+        result = invalid_document.execute(context_value=request)
+        self.assertTrue(result.invalid)
+        self.assertEqual(len(result.errors), 1)
+
+        # Least recently used documents are evicted
+        backend.document_from_string(schema, "{ regions {name} }")
+        self.assertIsNot(backend.document_from_string(schema, "{ query: sites {name} }"), document)
+
+        with self.assertRaises(GraphQLError):
+            backend.document_from_string(schema, "THIS TEST WILL ERROR")
+
 
 class GraphQLUtilsTestCase(TestCase):
     def test_str_to_var_name(self):
@@ -572,6 +627,23 @@ class GraphQLAPIPermissionTest(TestCase):
         names = [item["name"] for item in response.data["data"]["racks"]]
         self.assertEqual(names, ["Rack 1-1", "Rack 1-2"])
 
+    def test_graphql_persisted_query(self):
+        """Validate that a saved query can be executed by sending the hash of its text instead of the text itself."""
+        GraphQLQuery.objects.create(name="Racks", slug="racks", query=self.get_racks_params_query)
+        query_hash = get_query_hash(self.get_racks_params_query)
+
+        for payload in (
+            {"id": query_hash},
+            {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}},
+        ):
+            response = self.clients[2].post(self.api_url, payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names = [item["name"] for item in response.data["data"]["racks"]]
+            self.assertEqual(names, ["Rack 1-1", "Rack 1-2"])
+
+        response = self.clients[2].post(self.api_url, {"id": get_query_hash("{ racks { id } }")}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_graphql_query_variables(self):
         """Validate graphql variables are working as expected."""
         payload = {"query": self.get_racks_var_query, "variables": {"site": "test1"}}
@@ -896,6 +968,33 @@ class GraphQLQueryTest(TestCase):
         self.assertEqual(custom_field_data[0], {})
         self.assertEqual(result.data["device"]["_custom_field_data"], {})
 
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"])
+    def test_query_config_context_in_fragment(self):
+        self.device1.local_context_data = {"c": 1, "d": 2}
+        self.device1.save()
+
+        query = """
+        query {
+            devices {
+                ...DeviceFields
+            }
+        }
+        fragment DeviceFields on DeviceType {
+            name
+            config_context
+        }
+        """
+
+        result = self.execute_query(query)
+
+        self.assertIsNone(result.errors)
+        for item in result.data["devices"]:
+            self.assertEqual(item["config_context"], Device.objects.get(name=item["name"]).get_config_context())
+        self.assertEqual(
+            [item["config_context"] for item in result.data["devices"] if item["name"] == "Device 1"],
+            [{"a": 123, "b": 456, "c": 1, "d": 2}],
+        )
+
     @skip("Works in isolation, fails as part of the overall test suite due to issue #446")
     @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"])
     def test_query_relationship_associations(self):
@@ -928,6 +1027,68 @@ class GraphQLQueryTest(TestCase):
         self.assertIn(str(self.device2.id), set(item["id"] for item in result.data["device"]["rel_device_group"]))
         self.assertIn(str(self.device3.id), set(item["id"] for item in result.data["device"]["rel_device_group"]))
 
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"])
+    def test_query_relationship_associations_list(self):
+        """Test that the relationship peers of a list of objects are all resolved."""
+        query = """
+        query {
+            devices {
+                name
+                rel_device_to_vm {
+                    name
+                }
+                rel_device_group {
+                    name
+                }
+            }
+            virtual_machines {
+                name
+                rel_device_to_vm {
+                    name
+                }
+            }
+        }
+        """
+        result = self.execute_query(query)
+
+        self.assertIsNone(result.errors)
+        devices = {item["name"]: item for item in result.data["devices"]}
+        self.assertEqual(devices["Device 1"]["rel_device_to_vm"], {"name": self.virtualmachine.name})
+        self.assertIsNone(devices["Device 2"]["rel_device_to_vm"])
+        self.assertEqual([item["name"] for item in devices["Device 1"]["rel_device_group"]], ["Device 2", "Device 3"])
+        self.assertEqual([item["name"] for item in devices["Device 2"]["rel_device_group"]], ["Device 1", "Device 3"])
+        self.assertEqual([item["name"] for item in devices["Device 3"]["rel_device_group"]], ["Device 1", "Device 2"])
+        virtual_machines = {item["name"]: item for item in result.data["virtual_machines"]}
+        self.assertEqual(virtual_machines[self.virtualmachine.name]["rel_device_to_vm"], {"name": "Device 1"})
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"])
+    def test_query_relationship_associations_list_aliases(self):
+        """Test that the relationship peers of each field selecting them are loaded for that field's selection."""
+        query = """
+        query {
+            devices {
+                name
+                group_names: rel_device_group {
+                    name
+                }
+                group_sites: rel_device_group {
+                    site {
+                        name
+                    }
+                }
+            }
+        }
+        """
+        result = self.execute_query(query)
+
+        self.assertIsNone(result.errors)
+        devices = {item["name"]: item for item in result.data["devices"]}
+        self.assertEqual([item["name"] for item in devices["Device 1"]["group_names"]], ["Device 2", "Device 3"])
+        self.assertEqual(
+            [item["site"]["name"] for item in devices["Device 1"]["group_sites"]],
+            [self.device2.site.name, self.device3.site.name],
+        )
+
     @override_settings(EXEMPT_VIEW_PERMISSIONS=["*"])
     def test_query_device_role_filter(self):
 
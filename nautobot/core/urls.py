@@ -3,6 +3,7 @@ from django.conf.urls import include
 from django.urls import path
 from django.views.static import serve
 
+from nautobot.core.graphql.backends import get_backend
 from nautobot.core.views import CustomGraphQLView, HomeView, StaticMediaFailureView, SearchView
 from nautobot.extras.plugins.urls import (
     plugin_admin_patterns,
@@ -30,7 +31,7 @@ urlpatterns = [
     # API
     path("api/", include("nautobot.core.api.urls")),
     # GraphQL
-    path("graphql/", CustomGraphQLView.as_view(graphiql=True), name="graphql"),
+    path("graphql/", CustomGraphQLView.as_view(graphiql=True, backend=get_backend()), name="graphql"),
     # Serving static media in Django
     path("media/<path:path>", serve, {"document_root": settings.MEDIA_ROOT}),
     # Admin
@@ -1,4 +1,5 @@
 from copy import deepcopy
+from itertools import islice
 import logging
 import re
 
@@ -12,8 +13,8 @@ from django.core.exceptions import (
 )
 from django.db import transaction, IntegrityError
 from django.db.models import ManyToManyField, ProtectedError
-from django.forms import Form, ModelMultipleChoiceField, MultipleHiddenInput, Textarea
-from django.http import HttpResponse
+from django.forms import BooleanField, Form, ModelMultipleChoiceField, MultipleHiddenInput, Textarea
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import NoReverseMatch, reverse
 from django.utils.html import escape
@@ -22,7 +23,8 @@ from django.utils.safestring import mark_safe
 from django.views.generic import View
 from django_tables2 import RequestConfig
 
-from nautobot.extras.models import CustomField, ExportTemplate
+from nautobot.extras.models import ComputedField, CustomField, ExportTemplate
+from nautobot.utilities.csv_import import CSVImporter
 from nautobot.utilities.error_handlers import handle_protectederror
 from nautobot.utilities.exceptions import AbortTransaction
 from nautobot.utilities.forms import (
@@ -36,11 +38,14 @@ from nautobot.utilities.forms import (
     restrict_form_fields,
 )
 from nautobot.utilities.paginator import EnhancedPaginator, get_paginate_count
-from nautobot.utilities.permissions import get_permission_for_model
+from nautobot.utilities.permissions import get_permission_for_model, get_permitted_pks
+from nautobot.utilities.tasks import enqueue_import_csv_data
 from nautobot.utilities.utils import (
+    buffer_stream,
     csv_format,
     normalize_querydict,
     prepare_cloned_fields,
+    queryset_iterator,
 )
 from nautobot.utilities.views import GetReturnURLMixin, ObjectPermissionRequiredMixin
 
@@ -152,15 +157,34 @@ class ObjectListView(ObjectPermissionRequiredMixin, View):
         """
         Export the queryset of objects as concatenated YAML documents.
         """
-        yaml_data = [obj.to_yaml() for obj in self.queryset]
+        return "".join(self.queryset_to_yaml_stream())
 
-        return "---\n".join(yaml_data)
+    def queryset_to_yaml_stream(self):
+        """
+        Export the queryset of objects as concatenated YAML documents, yielding the output in chunks while iterating
+        over the queryset in batches instead of loading every object into memory.
+        """
+
+        def documents():
+            for i, obj in enumerate(queryset_iterator(self.queryset)):
+                if i:
+                    yield "---\n"
+                yield obj.to_yaml()
+
+        return buffer_stream(documents())
 
     def queryset_to_csv(self):
         """
         Export the queryset of objects as comma-separated value (CSV), using the model's to_csv() method.
         """
-        csv_data = []
+        return "".join(self.queryset_to_csv_stream())
+
+    def queryset_to_csv_stream(self):
+        """
+        Export the queryset of objects as comma-separated value (CSV), using the model's to_csv() method, yielding the
+        output in chunks while iterating over the queryset in batches instead of loading every object into memory.
+        Computed fields are rendered once per batch of objects.
+        """
         custom_fields = []
 
         # Start with the column headers
@@ -172,18 +196,32 @@ class ObjectListView(ObjectPermissionRequiredMixin, View):
                 headers.append(custom_field.name)
                 custom_fields.append(custom_field.name)
 
-        csv_data.append(",".join(headers))
+        # Add computed field headers, if any
+        computed_fields = list(ComputedField.objects.get_for_model(self.queryset.model))
+        headers.extend(computed_field.slug for computed_field in computed_fields)
+
+        def lines():
+            yield ",".join(headers)
+
+            # Iterate through the queryset appending each object, rendering computed fields for a chunk at a time
+            objects = queryset_iterator(self.queryset)
+            while True:
+                chunk = list(islice(objects, 2000))
+                if not chunk:
+                    return
+                computed_values = [computed_field.render_many(chunk) for computed_field in computed_fields]
 
-        # Iterate through the queryset appending each object
-        for obj in self.queryset:
-            data = obj.to_csv()
+                for i, obj in enumerate(chunk):
+                    data = obj.to_csv()
 
-            for custom_field in custom_fields:
-                data += (obj.cf.get(custom_field, ""),)
+                    for custom_field in custom_fields:
+                        data += (obj.cf.get(custom_field, ""),)
 
-            csv_data.append(csv_format(data))
+                    data += tuple(values[i] for values in computed_values)
 
-        return "\n".join(csv_data)
+                    yield "\n" + csv_format(data)
+
+        return buffer_stream(lines())
 
     def get(self, request):
 
@@ -210,14 +248,22 @@ class ObjectListView(ObjectPermissionRequiredMixin, View):
 
         # Check for YAML export support
         elif "export" in request.GET and hasattr(model, "to_yaml"):
-            response = HttpResponse(self.queryset_to_yaml(), content_type="text/yaml")
+            if type(self).queryset_to_yaml is ObjectListView.queryset_to_yaml:
+                response = StreamingHttpResponse(self.queryset_to_yaml_stream(), content_type="text/yaml")
+            else:
+                # The view provides its own (non-streaming) YAML export
+                response = HttpResponse(self.queryset_to_yaml(), content_type="text/yaml")
             filename = "nautobot_{}.yaml".format(self.queryset.model._meta.verbose_name_plural)
             response["Content-Disposition"] = 'attachment; filename="{}"'.format(filename)
             return response
 
         # Fall back to built-in CSV formatting if export requested but no template specified
         elif "export" in request.GET and hasattr(model, "to_csv"):
-            response = HttpResponse(self.queryset_to_csv(), content_type="text/csv")
+            if type(self).queryset_to_csv is ObjectListView.queryset_to_csv:
+                response = StreamingHttpResponse(self.queryset_to_csv_stream(), content_type="text/csv")
+            else:
+                # The view provides its own (non-streaming) CSV export
+                response = HttpResponse(self.queryset_to_csv(), content_type="text/csv")
             filename = "nautobot_{}.csv".format(self.queryset.model._meta.verbose_name_plural)
             response["Content-Disposition"] = 'attachment; filename="{}"'.format(filename)
             return response
@@ -741,6 +787,8 @@ class BulkImportView(GetReturnURLMixin, ObjectPermissionRequiredMixin, View):
     table: The django-tables2 Table used to render the list of imported objects
     template_name: The name of the template
     widget_attrs: A dict of attributes to apply to the import widget (e.g. to require a session key)
+    bulk_create: Whether valid rows may be inserted with bulk_create(), bypassing the model's save() method, its
+        pre_save/post_save signals, and _save_obj() (only suitable for models which don't rely on any of these)
     """
 
     queryset = None
@@ -748,11 +796,22 @@ class BulkImportView(GetReturnURLMixin, ObjectPermissionRequiredMixin, View):
     table = None
     template_name = "generic/object_bulk_import.html"
     widget_attrs = {}
+    bulk_create = False
 
     def _import_form(self, *args, **kwargs):
         class ImportForm(BootstrapMixin, Form):
             csv_data = CSVDataField(from_form=self.model_form, widget=Textarea(attrs=self.widget_attrs))
             csv_file = CSVFileField(from_form=self.model_form)
+            skip_invalid = BooleanField(
+                required=False,
+                label="Skip invalid rows",
+                help_text="Import the valid rows even if some rows are invalid, rather than importing nothing",
+            )
+            background = BooleanField(
+                required=False,
+                label="Run in the background",
+                help_text="Import the data as a background job, recommended for large files",
+            )
 
         return ImportForm(*args, **kwargs)
 
@@ -762,6 +821,19 @@ class BulkImportView(GetReturnURLMixin, ObjectPermissionRequiredMixin, View):
         """
         return obj_form.save()
 
+    def _get_importer(self, request, headers, **kwargs):
+        """
+        Return the CSVImporter used to import the rows of CSV data with the given headers.
+        """
+        return CSVImporter(
+            self.model_form,
+            headers,
+            request,
+            save_obj=lambda obj_form: self._save_obj(obj_form, request),
+            bulk_create=self.bulk_create,
+            **kwargs,
+        )
+
     def get_required_permission(self):
         return get_permission_for_model(self.queryset.model, "add")
 
@@ -781,60 +853,47 @@ class BulkImportView(GetReturnURLMixin, ObjectPermissionRequiredMixin, View):
 
     def post(self, request):
         logger = logging.getLogger("nautobot.views.BulkImportView")
-        new_objs = []
         form = self._import_form(request.POST, request.FILES)
 
         if form.is_valid():
             logger.debug("Form validation was successful")
 
-            try:
-                # Iterate through CSV data and bind each row to a new model form instance.
-                with transaction.atomic():
-                    if request.FILES:
-                        field_name = "csv_file"
-                    else:
-                        field_name = "csv_data"
-                    headers, records = form.cleaned_data[field_name]
-                    for row, data in enumerate(records, start=1):
-                        obj_form = self.model_form(data, headers=headers)
-                        restrict_form_fields(obj_form, request.user)
-
-                        if obj_form.is_valid():
-                            obj = self._save_obj(obj_form, request)
-                            new_objs.append(obj)
-                        else:
-                            for field, err in obj_form.errors.items():
-                                form.add_error(field_name, "Row {} {}: {}".format(row, field, err[0]))
-                            raise ValidationError("")
+            if request.FILES:
+                field_name = "csv_file"
+            else:
+                field_name = "csv_data"
+            headers, records = form.cleaned_data[field_name]
+            atomic = not form.cleaned_data["skip_invalid"]
 
-                    # Enforce object-level permissions
-                    if self.queryset.filter(pk__in=[obj.pk for obj in new_objs]).count() != len(new_objs):
-                        raise ObjectDoesNotExist
+            if form.cleaned_data["background"]:
+                job_result = enqueue_import_csv_data(self, request, headers, records, atomic=atomic)
+                msg = "Import of {} rows queued as a background job".format(len(records))
+                logger.info(msg)
+                messages.info(request, msg)
 
-                # Compile a table containing the imported objects
-                obj_table = self.table(new_objs)
+                return redirect(job_result.get_absolute_url())
 
-                if new_objs:
-                    msg = "Imported {} {}".format(len(new_objs), new_objs[0]._meta.verbose_name_plural)
-                    logger.info(msg)
-                    messages.success(request, msg)
+            # Validate and save the rows in chunks, collecting the errors of every invalid row
+            new_objs, errors = self._get_importer(request, headers, atomic=atomic).run(records)
+            error_messages = [message for row in sorted(errors) for message in errors[row]]
 
-                    return render(
-                        request,
-                        "import_success.html",
-                        {
-                            "table": obj_table,
-                            "return_url": self.get_return_url(request),
-                        },
-                    )
+            if new_objs:
+                msg = "Imported {} {}".format(len(new_objs), new_objs[0]._meta.verbose_name_plural)
+                logger.info(msg)
+                messages.success(request, msg)
 
-            except ValidationError:
-                pass
+                return render(
+                    request,
+                    "import_success.html",
+                    {
+                        "table": self.table(new_objs),
+                        "errors": error_messages,
+                        "return_url": self.get_return_url(request),
+                    },
+                )
 
-            except ObjectDoesNotExist:
-                msg = "Object import failed due to object-level permissions violation"
-                logger.debug(msg)
-                form.add_error(None, msg)
+            for message in error_messages:
+                form.add_error(field_name, message)
 
         else:
             logger.debug("Form validation failed")
@@ -951,10 +1010,9 @@ class BulkEditView(GetReturnURLMixin, ObjectPermissionRequiredMixin, View):
                             if form.cleaned_data.get("remove_tags", None):
                                 obj.tags.remove(*form.cleaned_data["remove_tags"])
 
-                        # Enforce object-level permissions
-                        if self.queryset.filter(pk__in=[obj.pk for obj in updated_objects]).count() != len(
-                            updated_objects
-                        ):
+                        # Enforce object-level permissions on all updated objects at once
+                        permitted_pks = get_permitted_pks(request.user, self.get_required_permission(), updated_objects)
+                        if len(permitted_pks) != len(updated_objects):
                             raise ObjectDoesNotExist
 
                     if updated_objects:
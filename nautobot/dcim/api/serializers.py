@@ -435,6 +435,24 @@ class RackElevationDetailFilterSerializer(serializers.Serializer):
         return attrs
 
 
+class RackAvailableUnitsFilterSerializer(serializers.Serializer):
+    device_u_height = serializers.IntegerField(min_value=1, default=1)
+    face = serializers.ChoiceField(choices=DeviceFaceChoices, required=False, default=None)
+    include_reserved = serializers.BooleanField(required=False, default=True)
+
+
+class RackAvailableUnitsSerializer(NestedRackSerializer):
+    """
+    A rack along with the units at which a device of the requested height could be mounted.
+    """
+
+    available_units = serializers.ListField(child=serializers.IntegerField(), read_only=True)
+    max_contiguous_units = serializers.IntegerField(read_only=True)
+
+    class Meta(NestedRackSerializer.Meta):
+        fields = [*NestedRackSerializer.Meta.fields, "available_units", "max_contiguous_units"]
+
+
 #
 # Device types
 #
@@ -1395,6 +1413,16 @@ class VirtualChassisSerializer(TaggedObjectSerializer, CustomFieldModelSerialize
 #
 
 
+class PowerUtilizationSerializer(serializers.Serializer):
+    """
+    The total allocated draw and available power (in VA) of the power feeds of a rack, power panel or site.
+    """
+
+    id = serializers.UUIDField(read_only=True)
+    allocated_draw = serializers.IntegerField(read_only=True)
+    available_power = serializers.IntegerField(read_only=True)
+
+
 class PowerPanelSerializer(TaggedObjectSerializer, CustomFieldModelSerializer):
     url = serializers.HyperlinkedIdentityField(view_name="dcim-api:powerpanel-detail")
     site = NestedSiteSerializer()
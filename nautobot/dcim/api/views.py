@@ -2,15 +2,20 @@ import socket
 from collections import OrderedDict
 
 from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.db import transaction
 from django.db.models import F
 from django.http import HttpResponseForbidden, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.views.decorators.clickjacking import xframe_options_sameorigin
 from drf_yasg import openapi
 from drf_yasg.openapi import Parameter
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.mixins import ListModelMixin
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -21,6 +26,8 @@ from nautobot.circuits.models import Circuit
 from nautobot.core.api.views import ModelViewSet
 from nautobot.core.api.exceptions import ServiceUnavailable
 from nautobot.dcim import filters
+from nautobot.dcim.elevations import render_rack_elevations
+from nautobot.dcim.provisioning import bulk_create_devices
 from nautobot.dcim.models import (
     Cable,
     CablePath,
@@ -61,6 +68,8 @@ from nautobot.extras.api.views import (
     CustomFieldModelViewSet,
     StatusViewSetMixin,
 )
+from nautobot.extras.models import TaggedItem
+from nautobot.extras.signals import handle_bulk_created_objects
 from nautobot.extras.choices import SecretsGroupAccessTypeChoices, SecretsGroupSecretTypeChoices
 from nautobot.extras.secrets.exceptions import SecretError
 from nautobot.ipam.models import Prefix, VLAN
@@ -83,6 +92,34 @@ class DCIMRootView(APIRootView):
 # Mixins
 
 
+class PowerUtilizationMixin(object):
+    @swagger_auto_schema(responses={200: serializers.PowerUtilizationSerializer(many=True)})
+    @action(detail=False, url_path="power-utilization", url_name="power-utilization")
+    def power_utilization(self, request):
+        """
+        Roll up the allocated draw and available power (in VA) of the power feeds of all (filtered) objects, returning
+        the ID of each object along with its totals.
+
+        The totals of all objects in a page are computed with a fixed number of aggregate queries.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).annotate_power_utilization()
+        page = self.paginate_queryset(queryset)
+        objects = page if page is not None else queryset
+
+        results = [
+            {
+                "id": obj.pk,
+                "allocated_draw": obj.power_utilization.numerator,
+                "available_power": obj.power_utilization.denominator,
+            }
+            for obj in objects
+        ]
+
+        if page is not None:
+            return self.get_paginated_response(results)
+        return Response(results)
+
+
 class PathEndpointMixin(object):
     @action(detail=True, url_path="trace")
     def trace(self, request, pk):
@@ -91,7 +128,29 @@ class PathEndpointMixin(object):
         """
         obj = get_object_or_404(self.queryset, pk=pk)
 
-        # Initialize the path array
+        return Response(self._serialize_trace(obj, request))
+
+    @action(detail=False, url_path="trace", url_name="bulk-trace")
+    def bulk_trace(self, request):
+        """
+        Trace the complete cable paths of all (filtered) objects, returning the ID of each object along with its
+        segments as three-tuples of (termination, cable, termination).
+
+        The objects of all paths in a page are loaded with a single query per model type.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).select_related("_path")
+        page = self.paginate_queryset(queryset)
+        objects = list(page if page is not None else queryset)
+
+        CablePath.prefetch_paths([obj._path for obj in objects if obj._path is not None])
+        results = [{"id": obj.pk, "trace": self._serialize_trace(obj, request)} for obj in objects]
+
+        if page is not None:
+            return self.get_paginated_response(results)
+        return Response(results)
+
+    @staticmethod
+    def _serialize_trace(obj, request):
         path = []
 
         for near_end, cable, far_end in obj.trace():
@@ -114,7 +173,7 @@ class PathEndpointMixin(object):
 
             path.append((x, y, z))
 
-        return Response(path)
+        return path
 
 
 class PassThroughPortMixin(object):
@@ -124,7 +183,7 @@ class PassThroughPortMixin(object):
         Return all CablePaths which traverse a given pass-through port.
         """
         obj = get_object_or_404(self.queryset, pk=pk)
-        cablepaths = CablePath.objects.filter(path__contains=obj).prefetch_related("origin", "destination")
+        cablepaths = CablePath.objects.traversing(obj).prefetch_related("origin", "destination")
         serializer = serializers.CablePathSerializer(cablepaths, context={"request": request}, many=True)
 
         return Response(serializer.data)
@@ -146,7 +205,7 @@ class RegionViewSet(CustomFieldModelViewSet):
 #
 
 
-class SiteViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
+class SiteViewSet(PowerUtilizationMixin, StatusViewSetMixin, CustomFieldModelViewSet):
     queryset = Site.objects.prefetch_related("region", "status", "tenant", "tags").annotate(
         device_count=count_related(Device, "site"),
         rack_count=count_related(Rack, "site"),
@@ -188,7 +247,7 @@ class RackRoleViewSet(CustomFieldModelViewSet):
 #
 
 
-class RackViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
+class RackViewSet(PowerUtilizationMixin, StatusViewSetMixin, CustomFieldModelViewSet):
     queryset = Rack.objects.prefetch_related("site", "group__site", "status", "role", "tenant", "tags").annotate(
         device_count=count_related(Device, "rack"),
         powerfeed_count=count_related(PowerFeed, "rack"),
@@ -213,16 +272,10 @@ class RackViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
 
         if data["render"] == "svg":
             # Render and return the elevation as an SVG drawing with the correct content type
-            drawing = rack.get_elevation_svg(
-                face=data["face"],
-                user=request.user,
-                unit_width=data["unit_width"],
-                unit_height=data["unit_height"],
-                legend_width=data["legend_width"],
-                include_images=data["include_images"],
-                base_url=request.build_absolute_uri("/"),
-            )
-            return HttpResponse(drawing.tostring(), content_type="image/svg+xml")
+            etag, svg = self._render_elevations([rack], request, data)[rack.pk]
+            response = HttpResponse(svg, content_type="image/svg+xml")
+            response["ETag"] = quote_etag(etag)
+            return get_conditional_response(request, etag=response["ETag"], response=response)
 
         else:
             # Return a JSON representation of the rack units in the elevation
@@ -243,6 +296,75 @@ class RackViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
                 rack_units = serializers.RackUnitSerializer(page, many=True, context={"request": request})
                 return self.get_paginated_response(rack_units.data)
 
+    @swagger_auto_schema(query_serializer=serializers.RackElevationDetailFilterSerializer)
+    @action(detail=False, url_path="elevation", url_name="bulk-elevation")
+    def bulk_elevation(self, request):
+        """
+        Render the elevations of all (filtered) racks as SVG documents, returning the ID of each rack along with its
+        elevation and the ETag under which the rack elevation endpoint serves it.
+
+        The devices and reservations of all racks in a page are loaded with a single query each.
+        """
+        serializer = serializers.RackElevationDetailFilterSerializer(data=request.GET)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        racks = list(page if page is not None else queryset)
+
+        elevations = self._render_elevations(racks, request, serializer.validated_data)
+        results = [
+            {"id": rack.pk, "etag": quote_etag(elevations[rack.pk][0]), "svg": elevations[rack.pk][1]} for rack in racks
+        ]
+
+        if page is not None:
+            return self.get_paginated_response(results)
+        return Response(results)
+
+    @staticmethod
+    def _render_elevations(racks, request, data):
+        return render_rack_elevations(
+            racks,
+            face=data["face"],
+            unit_width=data["unit_width"],
+            unit_height=data["unit_height"],
+            legend_width=data["legend_width"],
+            user=request.user,
+            include_images=data["include_images"],
+            base_url=request.build_absolute_uri("/"),
+        )
+
+    @swagger_auto_schema(
+        responses={200: serializers.RackAvailableUnitsSerializer(many=True)},
+        query_serializer=serializers.RackAvailableUnitsFilterSerializer,
+    )
+    @action(detail=False, url_path="available-units", url_name="available-units")
+    def available_units(self, request):
+        """
+        Find the (filtered) racks able to accommodate a device of the given height, returning each rack along with
+        the units at which the device could be mounted and its largest block of contiguous free units.
+
+        The occupancy of the racks is computed from a single query for their devices and another for their
+        reservations, per thousand racks.
+        """
+        serializer = serializers.RackAvailableUnitsFilterSerializer(data=request.GET)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        racks = []
+        for rack in self.filter_queryset(self.get_queryset()).with_available_units(
+            u_height=data["device_u_height"], face=data["face"], include_reserved=data["include_reserved"]
+        ):
+            rack.max_contiguous_units = rack.occupancy.get_max_contiguous_free(
+                face=data["face"], include_reserved=data["include_reserved"]
+            )
+            racks.append(rack)
+
+        page = self.paginate_queryset(racks)
+        if page is not None:
+            results = serializers.RackAvailableUnitsSerializer(page, many=True, context={"request": request})
+            return self.get_paginated_response(results.data)
+        return Response(serializers.RackAvailableUnitsSerializer(racks, many=True, context={"request": request}).data)
+
 
 #
 # Rack reservations
@@ -411,6 +533,42 @@ class DeviceViewSet(ConfigContextQuerySetMixin, StatusViewSetMixin, CustomFieldM
 
         return serializers.DeviceWithConfigContextSerializer
 
+    def perform_create(self, serializer):
+        """
+        Create a list of devices (and their components) in bulk; see `bulk_create_devices()`.
+        """
+        if not isinstance(serializer.validated_data, list):
+            return super().perform_create(serializer)
+
+        devices = []
+        tags = []
+        for attrs in serializer.validated_data:
+            attrs = attrs.copy()
+            tags.append(attrs.pop("tags", None) or [])
+            devices.append(Device(**attrs))
+
+        # Each device has already been validated by the serializer, so only check for conflicts between them
+        try:
+            with transaction.atomic():
+                bulk_create_devices(devices, validate=False)
+                content_type = ContentType.objects.get_for_model(Device)
+                TaggedItem.objects.bulk_create(
+                    [
+                        TaggedItem(content_type=content_type, object_id=device.pk, tag=tag)
+                        for device, device_tags in zip(devices, tags)
+                        for tag in device_tags
+                    ]
+                )
+                # Enforce object-level permissions on the new devices
+                self._validate_objects(devices)
+                handle_bulk_created_objects(self.request, devices)
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
+        except ObjectDoesNotExist:
+            raise PermissionDenied()
+
+        serializer.instance = devices
+
     @swagger_auto_schema(
         manual_parameters=[Parameter(name="method", in_="query", required=True, type=openapi.TYPE_STRING)],
         responses={"200": serializers.DeviceNAPALMSerializer},
@@ -690,7 +848,7 @@ class VirtualChassisViewSet(ModelViewSet):
 #
 
 
-class PowerPanelViewSet(ModelViewSet):
+class PowerPanelViewSet(PowerUtilizationMixin, ModelViewSet):
     queryset = PowerPanel.objects.prefetch_related("site", "rack_group").annotate(
         powerfeed_count=count_related(PowerFeed, "power_panel")
     )
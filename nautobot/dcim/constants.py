@@ -11,6 +11,7 @@ RACK_U_HEIGHT_DEFAULT = 42
 
 RACK_ELEVATION_BORDER_WIDTH = 2
 RACK_ELEVATION_LEGEND_WIDTH_DEFAULT = 30
+RACK_ELEVATION_CACHE_TIMEOUT = 60 * 60 * 24  # Rendered elevations are keyed by their content, so they never go stale
 
 
 #
@@ -1,12 +1,18 @@
+import hashlib
+
 import svgwrite
 
 from django.conf import settings
+from django.core.cache import cache
 from django.urls import reverse
 from django.utils.http import urlencode
 
 from nautobot.utilities.utils import foreground_color
 from .choices import DeviceFaceChoices
-from .constants import RACK_ELEVATION_BORDER_WIDTH
+from .constants import RACK_ELEVATION_BORDER_WIDTH, RACK_ELEVATION_CACHE_TIMEOUT
+
+
+RACK_ELEVATION_CACHE_KEY_PREFIX = "nautobot.dcim.rack_elevation"
 
 
 class RackElevationSVG:
@@ -17,21 +23,39 @@ class RackElevationSVG:
     :param user: User instance. If specified, only devices viewable by this user will be fully displayed.
     :param include_images: If true, the SVG document will embed front/rear device face images, where available
     :param base_url: Base URL for links within the SVG document. If none, links will be relative.
+    :param devices: Devices installed within the rack, as loaded by `Rack.get_elevation_devices()`. If none, they
+        will be retrieved from the database.
+    :param reservations: RackReservations of the rack. If none, they will be retrieved from the database.
+    :param permitted_device_ids: PKs of the devices viewable by the user. If none, they will be retrieved from the
+        database.
     """
 
-    def __init__(self, rack, user=None, include_images=True, base_url=None):
+    def __init__(
+        self,
+        rack,
+        user=None,
+        include_images=True,
+        base_url=None,
+        devices=None,
+        reservations=None,
+        permitted_device_ids=None,
+    ):
         self.rack = rack
         self.include_images = include_images
         if base_url is not None:
             self.base_url = base_url.rstrip("/")
         else:
             self.base_url = ""
+        self.devices = devices
+        self.reservations = reservations
 
         # Determine the subset of devices within this rack that are viewable by the user, if any
-        permitted_devices = self.rack.devices
-        if user is not None:
-            permitted_devices = permitted_devices.restrict(user, "view")
-        self.permitted_device_ids = permitted_devices.values_list("pk", flat=True)
+        if permitted_device_ids is None:
+            permitted_devices = self.rack.devices
+            if user is not None:
+                permitted_devices = permitted_devices.restrict(user, "view")
+            permitted_device_ids = permitted_devices.values_list("pk", flat=True)
+        self.permitted_device_ids = permitted_device_ids
 
     @staticmethod
     def _get_device_description(device):
@@ -78,7 +102,10 @@ class RackElevationSVG:
     def _draw_device_front(self, drawing, device, start, end, text):
         name = str(device)
         if device.devicebay_count:
-            name += " ({}/{})".format(device.get_children().count(), device.devicebay_count)
+            children_count = getattr(device, "children_count", None)
+            if children_count is None:
+                children_count = device.get_children().count()
+            name += " ({}/{})".format(children_count, device.devicebay_count)
 
         color = device.device_role.color
         link = drawing.add(
@@ -130,7 +157,7 @@ class RackElevationSVG:
                     urlencode(
                         {
                             "rack": rack.pk,
-                            "site": rack.site.pk,
+                            "site": rack.site_id,
                             "face": face_id,
                             "position": id_,
                         }
@@ -145,12 +172,12 @@ class RackElevationSVG:
         link.add(drawing.text("add device", insert=text, class_="add-device"))
 
     def merge_elevations(self, face):
-        elevation = self.rack.get_rack_units(face=face, expand_devices=False)
+        elevation = self.rack.get_rack_units(face=face, expand_devices=False, devices=self.devices)
         if face == DeviceFaceChoices.FACE_REAR:
             other_face = DeviceFaceChoices.FACE_FRONT
         else:
             other_face = DeviceFaceChoices.FACE_REAR
-        other = self.rack.get_rack_units(face=other_face)
+        other = self.rack.get_rack_units(face=other_face, devices=self.devices)
 
         unit_cursor = 0
         for u in elevation:
@@ -170,7 +197,7 @@ class RackElevationSVG:
             unit_width + legend_width + RACK_ELEVATION_BORDER_WIDTH * 2,
             unit_height * self.rack.u_height + RACK_ELEVATION_BORDER_WIDTH * 2,
         )
-        reserved_units = self.rack.get_reserved_units()
+        reserved_units = self.rack.get_reserved_units(reservations=self.reservations)
 
         unit_cursor = 0
         for ru in range(0, self.rack.u_height):
@@ -240,3 +267,97 @@ class RackElevationSVG:
         drawing.add(frame)
 
         return drawing
+
+
+def _get_elevation_fingerprint(rack, devices, reservations, permitted_device_ids, *params):
+    """
+    Return a hash of everything that a rendered rack elevation depends on.
+    """
+    content = [settings.VERSION, str(rack.pk), str(rack.last_updated), *(str(param) for param in params)]
+    for device in devices:
+        content += [
+            str(device.pk),
+            str(device.last_updated),
+            str(device.device_type.last_updated),
+            str(device.device_type.manufacturer.last_updated),
+            str(device.device_role.last_updated),
+            str(device.devicebay_count),
+            str(device.children_count),
+            str(device.pk in permitted_device_ids),
+        ]
+    for reservation in reservations:
+        content += [str(reservation.pk), str(reservation.last_updated)]
+    return hashlib.sha256("|".join(content).encode("utf-8")).hexdigest()
+
+
+def render_rack_elevations(
+    racks,
+    face,
+    unit_width,
+    unit_height,
+    legend_width,
+    user=None,
+    include_images=True,
+    base_url=None,
+):
+    """
+    Render the elevations of many racks as SVG documents with a fixed number of queries.
+
+    Each rendered elevation is cached under a hash of its content: the rack, its devices (including their device
+    types, manufacturers and roles) and reservations, which of its devices the user may view, and the rendering
+    parameters. Any change to these results in a different hash, so cached elevations never need to be invalidated.
+
+    Returns a dictionary mapping the PK of each rack to a tuple of the content hash, suitable for use as an ETag, and
+    the SVG document as a string.
+    """
+    from nautobot.dcim.models import Device, Rack, RackReservation
+
+    racks = list(racks)
+    rack_ids = [rack.pk for rack in racks]
+    elevation_devices = Rack.get_elevation_devices(racks)
+    elevation_reservations = {pk: [] for pk in rack_ids}
+    for reservation in RackReservation.objects.select_related("user").filter(rack__in=rack_ids):
+        elevation_reservations[reservation.rack_id].append(reservation)
+    permitted_devices = Device.objects.filter(rack__in=rack_ids)
+    if user is not None:
+        permitted_devices = permitted_devices.restrict(user, "view")
+    permitted_device_ids = set(permitted_devices.values_list("pk", flat=True))
+
+    fingerprints = {
+        rack.pk: _get_elevation_fingerprint(
+            rack,
+            elevation_devices[rack.pk],
+            elevation_reservations[rack.pk],
+            permitted_device_ids,
+            face,
+            unit_width,
+            unit_height,
+            legend_width,
+            include_images,
+            base_url,
+        )
+        for rack in racks
+    }
+    cache_keys = {pk: f"{RACK_ELEVATION_CACHE_KEY_PREFIX}.{fingerprint}" for pk, fingerprint in fingerprints.items()}
+    cached = cache.get_many(list(cache_keys.values()))
+
+    elevations = {}
+    rendered = {}
+    for rack in racks:
+        svg = cached.get(cache_keys[rack.pk])
+        if svg is None:
+            elevation = RackElevationSVG(
+                rack,
+                include_images=include_images,
+                base_url=base_url,
+                devices=elevation_devices[rack.pk],
+                reservations=elevation_reservations[rack.pk],
+                permitted_device_ids=permitted_device_ids,
+            )
+            svg = elevation.render(face, unit_width, unit_height, legend_width).tostring()
+            rendered[cache_keys[rack.pk]] = svg
+        elevations[rack.pk] = (fingerprints[rack.pk], svg)
+    if rendered:
+        cache.set_many(rendered, timeout=RACK_ELEVATION_CACHE_TIMEOUT)
+
+    return elevations
@@ -1,6 +1,12 @@
-from django.core.management.base import BaseCommand
+import bisect
+import json
+import multiprocessing
+import os
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management.color import no_style
-from django.db import connection
+from django.db import connection, connections
 
 from nautobot.circuits.models import CircuitTermination
 from nautobot.dcim.models import (
@@ -13,6 +19,7 @@ from nautobot.dcim.models import (
     PowerPort,
 )
 from nautobot.dcim.signals import create_cablepath
+from nautobot.dcim.tracing import CableGraph, retrace_cable_paths
 
 ENDPOINT_MODELS = (
     CircuitTermination,
@@ -24,6 +31,14 @@ ENDPOINT_MODELS = (
     PowerPort,
 )
 
+# Cable graph shared with the worker processes, which inherit it when forked
+_graph = None
+
+
+def _retrace_chunk(args):
+    model, origin_ids = args
+    return origin_ids[0], origin_ids[-1], retrace_cable_paths(_graph, model, origin_ids)
+
 
 class Command(BaseCommand):
     help = "Generate any missing cable paths among all cable termination objects in Nautobot"
@@ -41,6 +56,23 @@ class Command(BaseCommand):
             dest="no_input",
             help="Do not prompt user for any input/confirmation",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Trace paths in memory and write them in bulk, using this many worker processes. "
+            "Existing paths are only rewritten if they are incorrect, so --force does not delete them.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of origins traced and written at a time by each worker (with --workers)",
+        )
+        parser.add_argument(
+            "--progress-file",
+            help="File recording the origins already traced (with --workers). If it exists, the run resumes from it; "
+            "it is deleted once all paths have been traced.",
+        )
 
     def draw_progress_bar(self, percentage):
         """
@@ -50,6 +82,9 @@ class Command(BaseCommand):
         self.stdout.write(f"\r  [{'#' * bar_size}{' ' * (20-bar_size)}] {int(percentage)}%", ending="")
 
     def handle(self, *model_names, **options):
+        if options["workers"] is not None:
+            self.handle_bulk(**options)
+            return
 
         # If --force was passed, first delete all existing CablePaths
         if options["force"]:
@@ -98,3 +133,99 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f"\n  Retraced {i} {model._meta.verbose_name_plural}"))
 
         self.stdout.write(self.style.SUCCESS("Finished."))
+
+    def handle_bulk(self, **options):
+        """
+        Trace all paths from an in-memory cable graph, partitioning origins across worker processes.
+        """
+        global _graph
+
+        if options["workers"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--workers and --chunk-size must be positive")
+
+        # {model label: [[first origin ID, last origin ID], ...]} of the chunks of origins already traced
+        progress = {}
+        progress_file = options["progress_file"]
+        if progress_file and os.path.exists(progress_file):
+            with open(progress_file) as f:
+                progress = json.load(f)
+            self.stdout.write(f"Resuming from {progress_file}")
+
+        self.stdout.write("Loading cable graph...")
+        _graph = CableGraph()
+        self.stdout.write(self.style.SUCCESS(f"  Loaded {len(_graph.terminations)} cabled terminations"))
+
+        pool = None
+        if options["workers"] > 1:
+            # Each worker opens its own database connection
+            connections.close_all()
+            pool = multiprocessing.get_context("fork").Pool(options["workers"])
+
+        try:
+            for model in ENDPOINT_MODELS:
+                label = model._meta.label_lower
+                origins = model.objects.filter(cable__isnull=False)
+                if not options["force"]:
+                    origins = origins.filter(_path__isnull=True)
+                origin_ids = list(origins.order_by("pk").values_list("pk", flat=True))
+
+                # Skip the origins within the chunks traced by a previous run
+                completed = sorted(
+                    (uuid.UUID(first), uuid.UUID(last)) for first, last in progress.setdefault(label, [])
+                )
+                if completed:
+                    origin_ids = [pk for pk in origin_ids if not self._is_completed(pk, completed)]
+
+                if not origin_ids:
+                    self.stdout.write(f"Found no {model._meta.verbose_name} paths to trace; skipping")
+                    continue
+                self.stdout.write(f"Retracing {len(origin_ids)} cabled {model._meta.verbose_name_plural}...")
+
+                chunks = [
+                    (model, origin_ids[i : i + options["chunk_size"]])
+                    for i in range(0, len(origin_ids), options["chunk_size"])
+                ]
+                results = pool.imap_unordered(_retrace_chunk, chunks) if pool else map(_retrace_chunk, chunks)
+                totals = [0, 0, 0]
+                for i, (first, last, counts) in enumerate(results, start=1):
+                    totals = [total + count for total, count in zip(totals, counts)]
+                    if progress_file:
+                        progress[label].append([str(first), str(last)])
+                        self._write_progress(progress_file, progress)
+                    self.draw_progress_bar(i * 100 / len(chunks))
+
+                if options["force"]:
+                    # Delete the paths of origins which are no longer cabled
+                    stale = CablePath.objects.filter(origin_type_id=_graph.content_type_ids[model]).exclude(
+                        origin_id__in=model.objects.filter(cable__isnull=False).values("pk")
+                    )
+                    stale.delete()
+
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"\n  Retraced {len(origin_ids)} {model._meta.verbose_name_plural}: {totals[0]} paths created, "
+                        f"{totals[1]} updated, {totals[2]} unchanged"
+                    )
+                )
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+            _graph = None
+
+        if progress_file and os.path.exists(progress_file):
+            os.remove(progress_file)
+        self.stdout.write(self.style.SUCCESS("Finished."))
+
+    @staticmethod
+    def _is_completed(pk, completed):
+        """Return whether `pk` is within any of the sorted `completed` ranges."""
+        i = bisect.bisect_right(completed, (pk, pk))
+        return any(first <= pk <= last for first, last in completed[max(i - 1, 0) : i + 1])
+
+    @staticmethod
+    def _write_progress(progress_file, progress):
+        # Write to a temporary file first so that an interruption never leaves a truncated progress file
+        with open(f"{progress_file}.tmp", "w") as f:
+            json.dump(progress, f)
+        os.replace(f"{progress_file}.tmp", progress_file)
@@ -0,0 +1,66 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def populate_cablepath_nodes(apps, schema_editor):
+    """
+    Record the nodes of the path of every existing CablePath.
+    """
+    CablePath = apps.get_model("dcim", "CablePath")
+    CablePathNode = apps.get_model("dcim", "CablePathNode")
+
+    nodes = []
+    for path_id, path in CablePath.objects.values_list("pk", "path").iterator():
+        for position, node in enumerate(path):
+            node_type_id, node_id = node.split(":")
+            nodes.append(
+                CablePathNode(
+                    path_id=path_id, node_type_id=int(node_type_id), node_id=uuid.UUID(node_id), position=position
+                )
+            )
+        if len(nodes) >= 1000:
+            CablePathNode.objects.bulk_create(nodes)
+            nodes = []
+    CablePathNode.objects.bulk_create(nodes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("dcim", "0007_device_secrets_group"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CablePathNode",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("node_id", models.UUIDField()),
+                ("position", models.PositiveSmallIntegerField()),
+                (
+                    "node_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="contenttypes.contenttype"
+                    ),
+                ),
+                (
+                    "path",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="nodes", to="dcim.cablepath"
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("path", "position")},
+                "index_together": {("node_type", "node_id")},
+            },
+        ),
+        migrations.RunPython(populate_cablepath_nodes, migrations.RunPython.noop),
+    ]
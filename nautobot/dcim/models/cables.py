@@ -12,6 +12,7 @@ from nautobot.dcim.choices import CableLengthUnitChoices, CableTypeChoices
 from nautobot.dcim.constants import CABLE_TERMINATION_MODELS, COMPATIBLE_TERMINATION_TYPES, NONCONNECTABLE_IFACE_TYPES
 
 from nautobot.dcim.fields import JSONPathField
+from nautobot.dcim.querysets import CablePathQuerySet
 from nautobot.dcim.utils import (
     decompile_path_node,
     object_to_path_node,
@@ -29,6 +30,7 @@ from .device_components import FrontPort, RearPort
 __all__ = (
     "Cable",
     "CablePath",
+    "CablePathNode",
 )
 
 
@@ -327,6 +329,8 @@ class CablePath(BaseModel):
     is_active = models.BooleanField(default=False)
     is_split = models.BooleanField(default=False)
 
+    objects = CablePathQuerySet.as_manager()
+
     class Meta:
         unique_together = ("origin_type", "origin_id")
 
@@ -341,6 +345,8 @@ class CablePath(BaseModel):
         model = self.origin._meta.model
         model.objects.filter(pk=self.origin.pk).update(_path=self.pk)
 
+        CablePathNode.objects.rebuild([self])
+
     @property
     def segment_count(self):
         total_length = 1 + len(self.path) + (1 if self.destination else 0)
@@ -436,20 +442,17 @@ class CablePath(BaseModel):
         """
         Return the path as a list of prefetched objects.
         """
+        # Already prefetched by prefetch_paths()
+        if hasattr(self, "_path_objects"):
+            return self._path_objects
+
         # Compile a list of IDs to prefetch for each type of model in the path
         to_prefetch = defaultdict(list)
         for node in self.path:
             ct_id, object_id = decompile_path_node(node)
             to_prefetch[ct_id].append(object_id)
 
-        # Prefetch path objects using one query per model type. Prefetch related devices where appropriate.
-        prefetched = {}
-        for ct_id, object_ids in to_prefetch.items():
-            model_class = ContentType.objects.get_for_id(ct_id).model_class()
-            queryset = model_class.objects.filter(pk__in=object_ids)
-            if hasattr(model_class, "device"):
-                queryset = queryset.prefetch_related("device")
-            prefetched[ct_id] = {obj.id: obj for obj in queryset}
+        prefetched = self._prefetch_nodes(to_prefetch)
 
         # Replicate the path using the prefetched objects.
         path = []
@@ -459,6 +462,50 @@ class CablePath(BaseModel):
 
         return path
 
+    @classmethod
+    def prefetch_paths(cls, cable_paths):
+        """
+        Prefetch the path objects and destinations of all the given CablePaths using one query per model type, so that
+        calling `get_path()` or accessing `destination` on any of them requires no further queries.
+        """
+        to_prefetch = defaultdict(set)
+        for cable_path in cable_paths:
+            for node in cable_path.path:
+                ct_id, object_id = decompile_path_node(node)
+                to_prefetch[ct_id].add(object_id)
+            if cable_path.destination_id is not None:
+                to_prefetch[cable_path.destination_type_id].add(cable_path.destination_id)
+
+        prefetched = cls._prefetch_nodes(to_prefetch)
+
+        for cable_path in cable_paths:
+            cable_path._path_objects = [
+                prefetched[ct_id][object_id]
+                for ct_id, object_id in (decompile_path_node(node) for node in cable_path.path)
+            ]
+            if cable_path.destination_id is not None:
+                cls.destination.set_cached_value(
+                    cable_path, prefetched[cable_path.destination_type_id].get(cable_path.destination_id)
+                )
+        return cable_paths
+
+    @staticmethod
+    def _prefetch_nodes(to_prefetch):
+        """
+        Load the objects identified by a dictionary of {content type ID: object IDs}, by content type ID and object ID.
+        """
+        # Prefetch path objects using one query per model type. Prefetch related devices, circuits and statuses where
+        # appropriate.
+        prefetched = {}
+        for ct_id, object_ids in to_prefetch.items():
+            model_class = ContentType.objects.get_for_id(ct_id).model_class()
+            queryset = model_class.objects.filter(pk__in=object_ids)
+            for related_field in ("device", "circuit", "status"):
+                if hasattr(model_class, related_field):
+                    queryset = queryset.prefetch_related(related_field)
+            prefetched[ct_id] = {obj.id: obj for obj in queryset}
+        return prefetched
+
     def get_total_length(self):
         """
         Return the sum of the length of each cable in the path.
@@ -476,3 +523,44 @@ class CablePath(BaseModel):
         """
         rearport = path_node_to_object(self.path[-1])
         return FrontPort.objects.filter(rear_port=rearport)
+
+
+class CablePathNodeQuerySet(models.QuerySet):
+    def rebuild(self, cable_paths):
+        """
+        Replace the nodes of the given CablePaths with those of their current `path`.
+
+        This must be called whenever the `path` of a CablePath is written without calling its `save()` method.
+        """
+        self.filter(path__in=[cable_path.pk for cable_path in cable_paths]).delete()
+        nodes = []
+        for cable_path in cable_paths:
+            for position, node in enumerate(cable_path.path):
+                node_type_id, node_id = decompile_path_node(node)
+                nodes.append(
+                    self.model(path_id=cable_path.pk, node_type_id=node_type_id, node_id=node_id, position=position)
+                )
+        self.bulk_create(nodes, batch_size=1000)
+
+
+class CablePathNode(BaseModel):
+    """
+    An index of the objects traversed by each CablePath, such that the CablePaths which traverse a given object can be
+    found with `CablePath.objects.traversing()` without scanning the `path` of every CablePath.
+
+    Each node of `CablePath.path` is recorded along with its position within the path.
+    """
+
+    path = models.ForeignKey(to=CablePath, on_delete=models.CASCADE, related_name="nodes")
+    node_type = models.ForeignKey(to=ContentType, on_delete=models.CASCADE, related_name="+")
+    node_id = models.UUIDField()
+    position = models.PositiveSmallIntegerField()
+
+    objects = CablePathNodeQuerySet.as_manager()
+
+    class Meta:
+        index_together = [["node_type", "node_id"]]
+        unique_together = [["path", "position"]]
+
+    def __str__(self):
+        return f"{self.path_id} node {self.position}"
@@ -209,9 +209,18 @@ class PowerOutletTemplate(ComponentTemplateModel):
         if self.power_port and self.power_port.device_type != self.device_type:
             raise ValidationError("Parent power port ({}) must belong to the same device type".format(self.power_port))
 
-    def instantiate(self, device):
+    def instantiate(self, device, power_ports=None):
+        """
+        Instantiate a new PowerOutlet on the specified Device.
+
+        :param power_ports: Dictionary mapping the names of the PowerPorts of the Device to them (optional); if not
+            given, the parent PowerPort is retrieved from the database
+        """
         if self.power_port:
-            power_port = PowerPort.objects.get(device=device, name=self.power_port.name)
+            if power_ports is not None:
+                power_port = power_ports[self.power_port.name]
+            else:
+                power_port = PowerPort.objects.get(device=device, name=self.power_port.name)
         else:
             power_port = None
         return self.instantiate_model(
@@ -304,9 +313,18 @@ class FrontPortTemplate(ComponentTemplateModel):
                 )
             )
 
-    def instantiate(self, device):
+    def instantiate(self, device, rear_ports=None):
+        """
+        Instantiate a new FrontPort on the specified Device.
+
+        :param rear_ports: Dictionary mapping the names of the RearPorts of the Device to them (optional); if not
+            given, the RearPort is retrieved from the database
+        """
         if self.rear_port:
-            rear_port = RearPort.objects.get(device=device, name=self.rear_port.name)
+            if rear_ports is not None:
+                rear_port = rear_ports[self.rear_port.name]
+            else:
+                rear_port = RearPort.objects.get(device=device, name=self.rear_port.name)
         else:
             rear_port = None
         return self.instantiate_model(
@@ -11,6 +11,7 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 
 from nautobot.dcim.choices import DeviceFaceChoices, SubdeviceRoleChoices
+from nautobot.dcim.provisioning import instantiate_device_components
 
 from nautobot.extras.models import ConfigContextModel, StatusModel
 from nautobot.extras.querysets import ConfigContextModelQuerySet
@@ -23,7 +24,6 @@ from nautobot.utilities.fields import ColorField, NaturalOrderingField
 from .device_components import (
     ConsolePort,
     ConsoleServerPort,
-    DeviceBay,
     FrontPort,
     Interface,
     PowerOutlet,
@@ -748,19 +748,10 @@ class Device(PrimaryModel, ConfigContextModel, StatusModel):
 
         # If this is a new Device, instantiate all of the related components per the DeviceType definition
         if is_new:
-            ConsolePort.objects.bulk_create([x.instantiate(self) for x in self.device_type.consoleporttemplates.all()])
-            ConsoleServerPort.objects.bulk_create(
-                [x.instantiate(self) for x in self.device_type.consoleserverporttemplates.all()]
-            )
-            PowerPort.objects.bulk_create([x.instantiate(self) for x in self.device_type.powerporttemplates.all()])
-            PowerOutlet.objects.bulk_create([x.instantiate(self) for x in self.device_type.poweroutlettemplates.all()])
-            Interface.objects.bulk_create([x.instantiate(self) for x in self.device_type.interfacetemplates.all()])
-            RearPort.objects.bulk_create([x.instantiate(self) for x in self.device_type.rearporttemplates.all()])
-            FrontPort.objects.bulk_create([x.instantiate(self) for x in self.device_type.frontporttemplates.all()])
-            DeviceBay.objects.bulk_create([x.instantiate(self) for x in self.device_type.devicebaytemplates.all()])
-
-        # Update Site and Rack assignment for any child Devices
-        devices = Device.objects.filter(parent_bay__device=self)
+            instantiate_device_components([self])
+
+        # Update Site and Rack assignment for any child Devices (a new Device has none)
+        devices = Device.objects.filter(parent_bay__device=self) if not is_new else Device.objects.none()
         for device in devices:
             device.site = self.site
             device.rack = self.rack
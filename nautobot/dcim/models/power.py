@@ -10,9 +10,12 @@ from nautobot.dcim.constants import (
     POWERFEED_VOLTAGE_DEFAULT,
 )
 
+from nautobot.dcim.power_budget import get_power_utilizations
+from nautobot.dcim.querysets import PowerPanelQuerySet
 from nautobot.extras.models import StatusModel
 from nautobot.extras.utils import extras_features
 from nautobot.core.models.generics import PrimaryModel
+from nautobot.utilities.utils import UtilizationData
 from nautobot.utilities.validators import ExclusionValidator
 from .device_components import CableTermination, PathEndpoint
 
@@ -45,6 +48,8 @@ class PowerPanel(PrimaryModel):
     rack_group = models.ForeignKey(to="RackGroup", on_delete=models.PROTECT, blank=True, null=True)
     name = models.CharField(max_length=100)
 
+    objects = PowerPanelQuerySet.as_manager()
+
     csv_headers = ["site", "rack_group", "name"]
 
     class Meta:
@@ -75,6 +80,20 @@ class PowerPanel(PrimaryModel):
                 )
             )
 
+    def get_power_utilization(self):
+        """Determine the utilization numerator and denominator for power utilization on the power panel.
+
+        Returns:
+            UtilizationData: (numerator=allocated draw of all feeds, denominator=available power of all feeds)
+        """
+        # Use the value computed by `PowerPanelQuerySet.annotate_power_utilization()` if available
+        power_utilization = getattr(self, "power_utilization", None)
+        if power_utilization is None:
+            power_utilization = get_power_utilizations(self.powerfeeds.all(), "power_panel").get(
+                self.pk, UtilizationData(numerator=0, denominator=0)
+            )
+        return power_utilization
+
 
 @extras_features(
     "custom_fields",
@@ -2,11 +2,10 @@ from collections import OrderedDict
 
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
-from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import Count, Sum, Q
+from django.db.models import Count, Q
 from django.urls import reverse
 from mptt.models import MPTTModel, TreeForeignKey
 
@@ -14,6 +13,9 @@ from nautobot.dcim.choices import DeviceFaceChoices, RackDimensionUnitChoices, R
 from nautobot.dcim.constants import RACK_ELEVATION_LEGEND_WIDTH_DEFAULT, RACK_U_HEIGHT_DEFAULT
 
 from nautobot.dcim.elevations import RackElevationSVG
+from nautobot.dcim.occupancy import get_rack_occupancies
+from nautobot.dcim.power_budget import get_power_utilizations
+from nautobot.dcim.querysets import RackQuerySet
 from nautobot.extras.models import ObjectChange, StatusModel
 from nautobot.extras.utils import extras_features
 from nautobot.core.fields import AutoSlugField
@@ -23,7 +25,6 @@ from nautobot.utilities.config import get_settings_or_config
 from nautobot.utilities.fields import ColorField, NaturalOrderingField, JSONArrayField
 from nautobot.utilities.mptt import TreeManager
 from nautobot.utilities.utils import array_to_string, serialize_object, UtilizationData
-from .device_components import PowerOutlet, PowerPort
 from .devices import Device
 from .power import PowerFeed
 
@@ -240,6 +241,8 @@ class Rack(PrimaryModel, StatusModel):
     comments = models.TextField(blank=True)
     images = GenericRelation(to="extras.ImageAttachment")
 
+    objects = RackQuerySet.as_manager()
+
     csv_headers = [
         "site",
         "group",
@@ -359,6 +362,7 @@ class Rack(PrimaryModel, StatusModel):
         face=DeviceFaceChoices.FACE_FRONT,
         exclude=None,
         expand_devices=True,
+        devices=None,
     ):
         """
         Return a list of rack units as dictionaries. Example: {'device': None, 'face': 0, 'id': 48, 'name': 'U48'}
@@ -371,6 +375,8 @@ class Rack(PrimaryModel, StatusModel):
         :param expand_devices: When True, all units that a device occupies will be listed with each containing a
             reference to the device. When False, only the bottom most unit for a device is included and that unit
             contains a height attribute for the device
+        :param devices: Devices installed within the rack, as loaded by `get_elevation_devices()` (optional); when
+            given, the devices of the rack are not retrieved from the database
         """
 
         elevation = OrderedDict()
@@ -387,13 +393,24 @@ class Rack(PrimaryModel, StatusModel):
         if self.present_in_database:
 
             # Retrieve all devices installed within the rack
-            queryset = (
-                Device.objects.prefetch_related("device_type", "device_type__manufacturer", "device_role")
-                .annotate(devicebay_count=Count("devicebays"))
-                .exclude(pk=exclude)
-                .filter(rack=self, position__gt=0, device_type__u_height__gt=0)
-                .filter(Q(face=face) | Q(device_type__is_full_depth=True))
-            )
+            if devices is None:
+                queryset = (
+                    Device.objects.prefetch_related("device_type", "device_type__manufacturer", "device_role")
+                    .annotate(devicebay_count=Count("devicebays"))
+                    .exclude(pk=exclude)
+                    .filter(rack=self, position__gt=0, device_type__u_height__gt=0)
+                    .filter(Q(face=face) | Q(device_type__is_full_depth=True))
+                )
+            else:
+                queryset = [
+                    device
+                    for device in devices
+                    if device.pk != exclude
+                    and device.position
+                    and device.position > 0
+                    and device.device_type.u_height > 0
+                    and (device.face == face or device.device_type.is_full_depth)
+                ]
 
             # Determine which devices the user has permission to view
             permitted_device_ids = []
@@ -429,38 +446,38 @@ class Rack(PrimaryModel, StatusModel):
         :param rack_face: The face of the rack (front or rear) required; 'None' if device is full depth
         :param exclude: List of devices IDs to exclude (useful when moving a device within a rack)
         """
-        # Gather all devices which consume U space within the rack
-        devices = self.devices.prefetch_related("device_type").filter(position__gte=1)
-        if exclude is not None:
-            devices = devices.exclude(pk__in=exclude)
-
-        # Initialize the rack unit skeleton
-        units = list(range(1, self.u_height + 1))
-
-        # Remove units consumed by installed devices
-        for d in devices:
-            if rack_face is None or d.face == rack_face or d.device_type.is_full_depth:
-                for u in range(d.position, d.position + d.device_type.u_height):
-                    try:
-                        units.remove(u)
-                    except ValueError:
-                        # Found overlapping devices in the rack!
-                        pass
-
-        # Remove units without enough space above them to accommodate a device of the specified height
-        available_units = []
-        for u in units:
-            if set(range(u, u + u_height)).issubset(units):
-                available_units.append(u)
-
-        return list(reversed(available_units))
-
-    def get_reserved_units(self):
+        occupancy = get_rack_occupancies([self], exclude=exclude, include_reservations=False)[self.pk]
+        return occupancy.get_available_units(u_height=u_height, face=rack_face)
+
+    @classmethod
+    def get_elevation_devices(cls, racks):
+        """
+        Return a dictionary mapping the PK of each of the given racks to a list of the devices installed within it,
+        retrieved with a single query and annotated as needed to render their elevations.
+        """
+        elevation_devices = {rack.pk: [] for rack in racks}
+        queryset = (
+            Device.objects.select_related("device_type", "device_type__manufacturer", "device_role")
+            .annotate(
+                devicebay_count=Count("devicebays", distinct=True),
+                children_count=Count("devicebays__installed_device", distinct=True),
+            )
+            .filter(rack__in=list(elevation_devices), position__gt=0, device_type__u_height__gt=0)
+        )
+        for device in queryset:
+            elevation_devices[device.rack_id].append(device)
+        return elevation_devices
+
+    def get_reserved_units(self, reservations=None):
         """
         Return a dictionary mapping all reserved units within the rack to their reservation.
+
+        :param reservations: RackReservations of the rack to use instead of querying the database (optional)
         """
+        if reservations is None:
+            reservations = self.reservations.all()
         reserved_units = {}
-        for r in self.reservations.all():
+        for r in reservations:
             for u in r.units:
                 reserved_units[u] = r
         return reserved_units
@@ -505,16 +522,14 @@ class Rack(PrimaryModel, StatusModel):
         Returns:
             UtilizationData: (numerator=Occupied Unit Count, denominator=U Height of the rack)
         """
-        # Determine unoccupied units
-        available_units = self.get_available_units()
-
-        # Remove reserved units
-        for u in self.get_reserved_units():
-            if u in available_units:
-                available_units.remove(u)
+        # Use the value computed by `RackQuerySet.annotate_utilization()` if available
+        numerator = getattr(self, "utilization_numerator", None)
+        if numerator is None:
+            # Count the units occupied by devices or reservations
+            numerator = get_rack_occupancies([self])[self.pk].occupied_count
 
         # Return the numerator and denominator as percentage is to be calculated later where needed
-        return UtilizationData(numerator=self.u_height - len(available_units), denominator=self.u_height)
+        return UtilizationData(numerator=numerator, denominator=self.u_height)
 
     def get_power_utilization(self):
         """Determine the utilization numerator and denominator for power utilization on the rack.
@@ -522,25 +537,13 @@ class Rack(PrimaryModel, StatusModel):
         Returns:
             UtilizationData: (numerator, denominator)
         """
-        powerfeeds = PowerFeed.objects.filter(rack=self)
-        available_power_total = sum(pf.available_power for pf in powerfeeds)
-        if not available_power_total:
-            return UtilizationData(numerator=0, denominator=0)
-
-        pf_powerports = PowerPort.objects.filter(
-            _cable_peer_type=ContentType.objects.get_for_model(PowerFeed),
-            _cable_peer_id__in=powerfeeds.values_list("id", flat=True),
-        )
-        poweroutlets = PowerOutlet.objects.filter(power_port_id__in=pf_powerports)
-        allocated_draw_total = (
-            PowerPort.objects.filter(
-                _cable_peer_type=ContentType.objects.get_for_model(PowerOutlet),
-                _cable_peer_id__in=poweroutlets.values_list("id", flat=True),
-            ).aggregate(Sum("allocated_draw"))["allocated_draw__sum"]
-            or 0
-        )
-
-        return UtilizationData(numerator=allocated_draw_total, denominator=available_power_total)
+        # Use the value computed by `RackQuerySet.annotate_power_utilization()` if available
+        power_utilization = getattr(self, "power_utilization", None)
+        if power_utilization is None:
+            power_utilization = get_power_utilizations(PowerFeed.objects.filter(rack=self), "rack").get(
+                self.pk, UtilizationData(numerator=0, denominator=0)
+            )
+        return power_utilization
 
 
 @extras_features(
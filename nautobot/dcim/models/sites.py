@@ -6,13 +6,15 @@ from mptt.models import MPTTModel, TreeForeignKey
 from timezone_field import TimeZoneField
 
 from nautobot.dcim.fields import ASNField
+from nautobot.dcim.power_budget import get_power_utilizations
+from nautobot.dcim.querysets import SiteQuerySet
 from nautobot.extras.models import ObjectChange, StatusModel
 from nautobot.extras.utils import extras_features
 from nautobot.core.fields import AutoSlugField
 from nautobot.core.models.generics import OrganizationalModel, PrimaryModel
 from nautobot.utilities.fields import NaturalOrderingField
 from nautobot.utilities.mptt import TreeManager
-from nautobot.utilities.utils import serialize_object
+from nautobot.utilities.utils import serialize_object, UtilizationData
 
 __all__ = (
     "Region",
@@ -153,6 +155,8 @@ class Site(PrimaryModel, StatusModel):
     comments = models.TextField(blank=True)
     images = GenericRelation(to="extras.ImageAttachment")
 
+    objects = SiteQuerySet.as_manager()
+
     csv_headers = [
         "name",
         "slug",
@@ -218,3 +222,19 @@ class Site(PrimaryModel, StatusModel):
             self.contact_email,
             self.comments,
         )
+
+    def get_power_utilization(self):
+        """Determine the utilization numerator and denominator for power utilization at the site.
+
+        Returns:
+            UtilizationData: (numerator=allocated draw of all feeds, denominator=available power of all feeds)
+        """
+        from nautobot.dcim.models import PowerFeed
+
+        # Use the value computed by `SiteQuerySet.annotate_power_utilization()` if available
+        power_utilization = getattr(self, "power_utilization", None)
+        if power_utilization is None:
+            power_utilization = get_power_utilizations(
+                PowerFeed.objects.filter(power_panel__site=self), "power_panel__site"
+            ).get(self.pk, UtilizationData(numerator=0, denominator=0))
+        return power_utilization
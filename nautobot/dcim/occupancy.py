@@ -0,0 +1,126 @@
+"""
+Bitmap representation of the occupancy of rack units.
+
+Each `RackOccupancy` holds integer bitmasks in which bit `u - 1` is set when unit `u` of the rack is occupied, so that
+finding the units able to accommodate a device of a given height is a handful of bitwise operations rather than a set
+comparison per unit. The occupancies of any number of racks are loaded by `get_rack_occupancies()` with a single query
+for their devices and another for their reservations.
+"""
+from .choices import DeviceFaceChoices
+
+
+class RackOccupancy:
+    """
+    The units of a rack occupied by devices (on each face, and on either face) and by reservations.
+
+    :param u_height: Height of the rack, in rack units
+    """
+
+    def __init__(self, u_height):
+        self.u_height = u_height
+        self.mask = (1 << u_height) - 1
+        # Units occupied by a device mounted on either face
+        self.devices = 0
+        # Units occupied by a device mounted on each face (full-depth devices occupy both)
+        self.faces = {
+            DeviceFaceChoices.FACE_FRONT: 0,
+            DeviceFaceChoices.FACE_REAR: 0,
+        }
+        # Units reserved by a RackReservation
+        self.reserved = 0
+
+    def add_device(self, position, u_height, face, is_full_depth):
+        """
+        Mark the units occupied by a device of the given height, mounted with its lowest unit at `position`.
+        """
+        if not position or position < 1 or u_height < 1:
+            return
+        units = (((1 << u_height) - 1) << (position - 1)) & self.mask
+        self.devices |= units
+        for rack_face in self.faces:
+            if is_full_depth or face == rack_face:
+                self.faces[rack_face] |= units
+
+    def add_reservation(self, units):
+        """
+        Mark the given units as reserved.
+        """
+        for u in units:
+            if 1 <= u <= self.u_height:
+                self.reserved |= 1 << (u - 1)
+
+    def get_occupied(self, face=None, include_reserved=False):
+        """
+        Return the bitmask of occupied units.
+
+        :param face: Rack face (front or rear) to consider, or None to consider devices mounted on either face
+        :param include_reserved: Whether reserved units are considered occupied
+        """
+        occupied = self.devices if face is None else self.faces.get(face, self.devices)
+        if include_reserved:
+            occupied |= self.reserved
+        return occupied
+
+    def get_available_units(self, u_height=1, face=None, include_reserved=False):
+        """
+        Return a list of the units able to accommodate a device of the given height with its lowest unit, in
+        descending order (as returned by `Rack.get_available_units()`).
+
+        :param u_height: Minimum number of contiguous free units required
+        :param face: Rack face (front or rear) required, or None for a full-depth device
+        :param include_reserved: Whether reserved units are considered occupied
+        """
+        free = ~self.get_occupied(face, include_reserved) & self.mask
+        # A unit can accommodate the device if it and the (u_height - 1) units above it are all free
+        candidates = free
+        for offset in range(1, u_height):
+            candidates &= free >> offset
+        return [u for u in range(self.u_height, 0, -1) if candidates >> (u - 1) & 1]
+
+    def get_max_contiguous_free(self, face=None, include_reserved=False):
+        """
+        Return the height of the largest block of contiguous free units.
+        """
+        free = ~self.get_occupied(face, include_reserved) & self.mask
+        longest = 0
+        while free:
+            # Each iteration shortens every run of set bits by one
+            free &= free >> 1
+            longest += 1
+        return longest
+
+    @property
+    def occupied_count(self):
+        """
+        Number of units occupied by a device on either face or reserved, as counted by `Rack.get_utilization()`.
+        """
+        return bin(self.get_occupied(include_reserved=True)).count("1")
+
+
+def get_rack_occupancies(racks, exclude=None, include_reservations=True):
+    """
+    Return a dictionary mapping the PK of each of the given racks to its `RackOccupancy`.
+
+    :param racks: Racks to compute the occupancy of
+    :param exclude: List of device IDs to exclude (useful when moving a device within a rack)
+    :param include_reservations: Whether to load the reservations of the racks as well as their devices
+    """
+    from nautobot.dcim.models import Device, RackReservation
+
+    occupancies = {rack.pk: RackOccupancy(rack.u_height) for rack in racks}
+    if not occupancies:
+        return occupancies
+
+    devices = Device.objects.filter(rack__in=list(occupancies), position__gte=1)
+    if exclude is not None:
+        devices = devices.exclude(pk__in=exclude)
+    for rack_id, position, face, u_height, is_full_depth in devices.values_list(
+        "rack", "position", "face", "device_type__u_height", "device_type__is_full_depth"
+    ):
+        occupancies[rack_id].add_device(position, u_height, face, is_full_depth)
+
+    if include_reservations:
+        for rack_id, units in RackReservation.objects.filter(rack__in=list(occupancies)).values_list("rack", "units"):
+            occupancies[rack_id].add_reservation(units)
+
+    return occupancies
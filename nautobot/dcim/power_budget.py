@@ -0,0 +1,77 @@
+"""
+Rollups of allocated power draw against available power, for many racks, power panels or sites at once.
+
+The power drawn through a PowerFeed is the allocated draw of the PowerPorts cabled to the PowerOutlets of the devices
+whose PowerPorts are cabled to the feed. `Rack.get_power_utilization()` used to follow these `_cable_peer` links with a
+chain of queries per rack; `get_power_utilizations()` instead computes the allocated draw of every feed with two
+queries starting from the feeds, and sums the feeds of each rack, power panel or site in memory.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Sum
+
+from nautobot.utilities.utils import UtilizationData
+
+
+def get_allocated_draw(feeds):
+    """
+    Return a dictionary mapping the PK of each of the given PowerFeeds to the total allocated draw (in VA) of the
+    PowerPorts fed through it, omitting feeds with no such PowerPorts.
+
+    :param feeds: PowerFeed queryset
+    """
+    from nautobot.dcim.models import PowerFeed, PowerOutlet, PowerPort
+
+    # The PowerOutlets of the devices whose PowerPorts are cabled to the feeds, and the feed ultimately feeding each
+    outlets = PowerOutlet.objects.filter(
+        power_port___cable_peer_type=ContentType.objects.get_for_model(PowerFeed),
+        power_port___cable_peer_id__in=feeds.values("pk"),
+    ).order_by()
+    outlet_feeds = dict(outlets.values_list("pk", "power_port___cable_peer_id"))
+    if not outlet_feeds:
+        return {}
+
+    allocated_draw = {}
+    for outlet_id, allocated_draw_total in (
+        PowerPort.objects.filter(
+            _cable_peer_type=ContentType.objects.get_for_model(PowerOutlet),
+            _cable_peer_id__in=outlets.values("pk"),
+        )
+        .order_by()
+        .values("_cable_peer_id")
+        .annotate(allocated_draw_total=Sum("allocated_draw"))
+        .values_list("_cable_peer_id", "allocated_draw_total")
+    ):
+        feed_id = outlet_feeds.get(outlet_id)
+        if feed_id is not None:
+            allocated_draw[feed_id] = allocated_draw.get(feed_id, 0) + (allocated_draw_total or 0)
+    return allocated_draw
+
+
+def get_power_utilizations(feeds, group_by):
+    """
+    Return a dictionary mapping each value of `group_by` among the given PowerFeeds to the `UtilizationData` of its
+    feeds: (numerator=allocated draw, denominator=available power). Groups without any available power have a
+    utilization of (0, 0).
+
+    :param feeds: PowerFeed queryset
+    :param group_by: PowerFeed field to roll the feeds up by, such as "rack", "power_panel" or "power_panel__site"
+    """
+    feed_rows = [row for row in feeds.order_by().values_list("pk", group_by, "available_power") if row[1] is not None]
+
+    # Without any available power every group has a utilization of (0, 0), so the allocated draw is irrelevant
+    if not any(available_power for _, _, available_power in feed_rows):
+        return {key: UtilizationData(numerator=0, denominator=0) for _, key, _ in feed_rows}
+
+    allocated_draw = get_allocated_draw(feeds)
+
+    totals = {}
+    for feed_id, key, available_power in feed_rows:
+        allocated_total, available_total = totals.get(key, (0, 0))
+        totals[key] = (allocated_total + (allocated_draw.get(feed_id) or 0), available_total + (available_power or 0))
+
+    return {
+        key: UtilizationData(numerator=allocated, denominator=available)
+        if available
+        else UtilizationData(numerator=0, denominator=0)
+        for key, (allocated, available) in totals.items()
+    }
@@ -0,0 +1,180 @@
+"""
+Creation of many Devices at once.
+
+`Device.save()` creates a new device with one INSERT, then instantiates its components with one `bulk_create()` per
+component type, so that provisioning hundreds of devices issues thousands of queries one device at a time.
+`bulk_create_devices()` instead validates all of the devices up front, inserts them with a single `bulk_create()`, and
+instantiates the components of all of them with a single `bulk_create()` per component type.
+"""
+import collections
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import transaction
+
+from .occupancy import get_rack_occupancies
+
+
+def instantiate_device_components(devices):
+    """
+    Create the components of the given new Devices as defined by their DeviceTypes, with a single query per component
+    template type and a single `bulk_create()` per component type.
+
+    Returns a dictionary mapping each component model to the list of components created.
+    """
+    from nautobot.dcim.models import (
+        ConsolePort,
+        ConsolePortTemplate,
+        ConsoleServerPort,
+        ConsoleServerPortTemplate,
+        DeviceBay,
+        DeviceBayTemplate,
+        FrontPort,
+        FrontPortTemplate,
+        Interface,
+        InterfaceTemplate,
+        PowerOutlet,
+        PowerOutletTemplate,
+        PowerPort,
+        PowerPortTemplate,
+        RearPort,
+        RearPortTemplate,
+    )
+
+    device_type_ids = {device.device_type_id for device in devices}
+    # PowerOutlets and FrontPorts refer to the PowerPorts and RearPorts created before them, looked up by name
+    power_ports = collections.defaultdict(dict)
+    rear_ports = collections.defaultdict(dict)
+
+    components = {}
+    for template_model, model, related in (
+        (ConsolePortTemplate, ConsolePort, None),
+        (ConsoleServerPortTemplate, ConsoleServerPort, None),
+        (PowerPortTemplate, PowerPort, None),
+        (PowerOutletTemplate, PowerOutlet, "power_port"),
+        (InterfaceTemplate, Interface, None),
+        (RearPortTemplate, RearPort, None),
+        (FrontPortTemplate, FrontPort, "rear_port"),
+        (DeviceBayTemplate, DeviceBay, None),
+    ):
+        templates = template_model.objects.filter(device_type__in=device_type_ids)
+        if related is not None:
+            templates = templates.select_related(related)
+        templates_by_device_type = collections.defaultdict(list)
+        for template in templates:
+            templates_by_device_type[template.device_type_id].append(template)
+
+        instances = []
+        for device in devices:
+            for template in templates_by_device_type[device.device_type_id]:
+                if model is PowerOutlet:
+                    instances.append(template.instantiate(device, power_ports=power_ports[device.pk]))
+                elif model is FrontPort:
+                    instances.append(template.instantiate(device, rear_ports=rear_ports[device.pk]))
+                else:
+                    instances.append(template.instantiate(device))
+        model.objects.bulk_create(instances)
+        components[model] = instances
+
+        for instance in instances:
+            if model is PowerPort:
+                power_ports[instance.device_id][instance.name] = instance
+            elif model is RearPort:
+                rear_ports[instance.device_id][instance.name] = instance
+
+    return components
+
+
+def _validate_devices(devices, full_clean=True):
+    """
+    Return a dictionary mapping the index of each invalid Device among the given new Devices to a ValidationError,
+    checking each Device on its own (if `full_clean` is True) and for conflicts with the other Devices.
+    """
+    errors = {}
+    if full_clean:
+        for i, device in enumerate(devices):
+            try:
+                device.full_clean()
+            except ValidationError as e:
+                errors[i] = e
+
+    # Values which must be unique among the Devices; see `Device.Meta.unique_together` and `Device.validate_unique()`
+    seen = {}
+    for i, device in enumerate(devices):
+        if i in errors:
+            continue
+        keys = []
+        if device.name:
+            keys.append(("name", (device.site_id, device.tenant_id, device.name)))
+        if device.asset_tag is not None:
+            keys.append(("asset_tag", device.asset_tag))
+        if device.virtual_chassis_id is not None and device.vc_position is not None:
+            keys.append(("vc_position", (device.virtual_chassis_id, device.vc_position)))
+        for field_name, key in keys:
+            if (field_name, key) in seen:
+                errors[i] = ValidationError(
+                    {field_name: f"Conflicts with the device at index {seen[(field_name, key)]}."}
+                )
+                break
+        else:
+            for field_name, key in keys:
+                seen[(field_name, key)] = i
+
+    # Rack units may not be occupied by more than one of the Devices, nor by existing devices
+    racks = {device.rack_id: device.rack for device in devices if device.rack_id and device.position}
+    occupancies = get_rack_occupancies(racks.values(), include_reservations=False)
+    for i, device in enumerate(devices):
+        if i in errors or device.rack_id not in racks:
+            continue
+        u_height = device.device_type.u_height
+        face = None if device.device_type.is_full_depth else device.face
+        occupancy = occupancies[device.rack_id]
+        if device.position not in occupancy.get_available_units(u_height=u_height, face=face):
+            errors[i] = ValidationError(
+                {"position": f"U{device.position} is already occupied or does not have sufficient space."}
+            )
+        else:
+            occupancy.add_device(device.position, u_height, device.face, device.device_type.is_full_depth)
+
+    return errors
+
+
+def _get_error_messages(error):
+    """
+    Flatten a ValidationError into a list of messages, each prefixed with the name of the field it applies to.
+    """
+    if not hasattr(error, "error_dict"):
+        return error.messages
+    return [
+        message if field_name == NON_FIELD_ERRORS else f"{field_name}: {message}"
+        for field_name, messages in error.message_dict.items()
+        for message in messages
+    ]
+
+
+def bulk_create_devices(devices, validate=True, request=None):
+    """
+    Create the given new (unsaved) Devices and instantiate their components, with a fixed number of queries.
+
+    All of the Devices are validated before any of them are created; if any is invalid, a ValidationError mapping the
+    index of each invalid Device to its error messages is raised and nothing is created.
+
+    :param devices: List of unsaved Devices
+    :param validate: Whether to call `full_clean()` on each Device; conflicts between the Devices are checked regardless
+    :param request: If given, record ObjectChanges and enqueue webhooks for the new Devices on behalf of this request
+    """
+    from nautobot.dcim.models import Device
+    from nautobot.extras.signals import handle_bulk_created_objects, invalidate_rendered_config_contexts
+
+    devices = list(devices)
+    errors = _validate_devices(devices, full_clean=validate)
+    if errors:
+        raise ValidationError({str(i): _get_error_messages(error) for i, error in sorted(errors.items())})
+
+    with transaction.atomic():
+        Device.objects.bulk_create(devices)
+        instantiate_device_components(devices)
+        if request is not None:
+            handle_bulk_created_objects(request, devices)
+        invalidate_rendered_config_contexts(Device, [device.pk for device in devices])
+
+    return devices
@@ -0,0 +1,160 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Subquery
+from django.db.models.query import ModelIterable
+
+from nautobot.dcim.occupancy import get_rack_occupancies
+from nautobot.dcim.power_budget import get_power_utilizations
+from nautobot.utilities.querysets import RestrictedQuerySet
+from nautobot.utilities.utils import UtilizationData
+
+
+class CablePathQuerySet(RestrictedQuerySet):
+    def traversing(self, obj):
+        """
+        Return the CablePaths which traverse the given object (a Cable or a pass-through port), using the CablePathNode
+        index rather than scanning the `path` of every CablePath.
+        """
+        from nautobot.dcim.models import CablePathNode
+
+        return self.filter(
+            pk__in=Subquery(
+                CablePathNode.objects.filter(node_type=ContentType.objects.get_for_model(obj), node_id=obj.pk).values(
+                    "path"
+                )
+            )
+        )
+
+
+class BatchAnnotationModelIterable(ModelIterable):
+    """
+    Iterable that passes each chunk of loaded objects to the batch annotation functions of its queryset, which set
+    attributes on the objects computed with a fixed number of queries per chunk.
+
+    See `BatchAnnotationQuerySet.batch_annotate()`.
+    """
+
+    chunk_size = 1000
+
+    def __iter__(self):
+        objects = []
+        for obj in super().__iter__():
+            objects.append(obj)
+            if len(objects) >= self.chunk_size:
+                yield from self._annotate(objects)
+                objects = []
+        yield from self._annotate(objects)
+
+    def _annotate(self, objects):
+        if objects:
+            for annotate in self.queryset._batch_annotations:
+                annotate(objects)
+        return objects
+
+
+class BatchAnnotationQuerySet(RestrictedQuerySet):
+    """
+    Queryset which can annotate the objects it loads with values computed in memory for each chunk of objects, where
+    the database cannot compute them efficiently or portably. Such values cannot be filtered or ordered by.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._batch_annotations = ()
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._batch_annotations = self._batch_annotations
+        return clone
+
+    def batch_annotate(self, function):
+        """
+        Call `function` with each chunk of objects loaded by the queryset, as a list.
+
+        The values are typically computed from other models, whose changes don't invalidate the cached results of this
+        queryset, so caching by cacheops is disabled for the queryset.
+        """
+        clone = self.nocache()
+        if function not in clone._batch_annotations:
+            clone._batch_annotations = (*clone._batch_annotations, function)
+        clone._iterable_class = BatchAnnotationModelIterable
+        return clone
+
+
+def _annotate_occupancy(racks):
+    occupancies = get_rack_occupancies(racks)
+    for rack in racks:
+        rack.occupancy = occupancies[rack.pk]
+        rack.utilization_numerator = rack.occupancy.occupied_count
+
+
+def _annotate_power_utilization(objects, group_by):
+    from nautobot.dcim.models import PowerFeed
+
+    utilizations = get_power_utilizations(
+        PowerFeed.objects.filter(**{f"{group_by}__in": [obj.pk for obj in objects]}), group_by
+    )
+    for obj in objects:
+        obj.power_utilization = utilizations.get(obj.pk, UtilizationData(numerator=0, denominator=0))
+
+
+def _annotate_rack_power_utilization(racks):
+    _annotate_power_utilization(racks, "rack")
+
+
+def _annotate_power_panel_power_utilization(power_panels):
+    _annotate_power_utilization(power_panels, "power_panel")
+
+
+def _annotate_site_power_utilization(sites):
+    _annotate_power_utilization(sites, "power_panel__site")
+
+
+class RackQuerySet(BatchAnnotationQuerySet):
+    def annotate_utilization(self):
+        """
+        Annotate each Rack with its `RackOccupancy` as `occupancy`, and with the number of units occupied by devices or
+        reservations as `utilization_numerator`, which is used by `Rack.get_utilization()` instead of querying per Rack.
+
+        Because devices may overlap, the occupied units are counted from the occupancy bitmaps of the Racks as they are
+        loaded, rather than computed by the database; the results can therefore not be filtered or ordered by them.
+        """
+        return self.batch_annotate(_annotate_occupancy)
+
+    def annotate_power_utilization(self):
+        """
+        Annotate each Rack with the `UtilizationData` of its power feeds as `power_utilization`, which is used by
+        `Rack.get_power_utilization()` instead of querying per Rack.
+        """
+        return self.batch_annotate(_annotate_rack_power_utilization)
+
+    def with_available_units(self, u_height=1, face=None, include_reserved=True):
+        """
+        Yield each Rack able to accommodate a device of the given height, with its `available_units` attribute set to
+        the list of units at which the device could be mounted.
+
+        :param u_height: Minimum number of contiguous free units required
+        :param face: Rack face (front or rear) required, or None for a full-depth device
+        :param include_reserved: Whether reserved units are considered occupied
+        """
+        for rack in self.annotate_utilization().iterator():
+            rack.available_units = rack.occupancy.get_available_units(u_height, face, include_reserved)
+            if rack.available_units:
+                yield rack
+
+
+class PowerPanelQuerySet(BatchAnnotationQuerySet):
+    def annotate_power_utilization(self):
+        """
+        Annotate each PowerPanel with the `UtilizationData` of its power feeds as `power_utilization`, which is used by
+        `PowerPanel.get_power_utilization()` instead of querying per PowerPanel.
+        """
+        return self.batch_annotate(_annotate_power_panel_power_utilization)
+
+
+class SiteQuerySet(BatchAnnotationQuerySet):
+    def annotate_power_utilization(self):
+        """
+        Annotate each Site with the `UtilizationData` of the power feeds of its power panels as `power_utilization`,
+        which is used by `Site.get_power_utilization()` instead of querying per Site.
+        """
+        return self.batch_annotate(_annotate_site_power_utilization)
@@ -9,6 +9,7 @@ from django.dispatch import receiver
 from .models import (
     Cable,
     CablePath,
+    CablePathNode,
     Device,
     PathEndpoint,
     PowerPanel,
@@ -39,7 +40,7 @@ def rebuild_paths(obj):
     """
     Rebuild all CablePaths which traverse the specified node
     """
-    cable_paths = CablePath.objects.filter(path__contains=obj)
+    cable_paths = CablePath.objects.traversing(obj)
 
     with transaction.atomic():
         for cp in cable_paths:
@@ -152,7 +153,7 @@ def update_connected_endpoints(instance, created, raw=False, **kwargs):
         # may change in the future.) However, we do need to capture status changes and update
         # any CablePaths accordingly.
         if instance.status != Cable.STATUS_CONNECTED:
-            CablePath.objects.filter(path__contains=instance).update(is_active=False)
+            CablePath.objects.traversing(instance).update(is_active=False)
         else:
             rebuild_paths(instance)
 
@@ -177,7 +178,7 @@ def nullify_connected_endpoints(instance, **kwargs):
         instance.termination_b.save()
 
     # Delete and retrace any dependent cable paths
-    for cablepath in CablePath.objects.filter(path__contains=instance):
+    for cablepath in CablePath.objects.traversing(instance):
         cp = CablePath.from_origin(cablepath.origin)
         if cp:
             CablePath.objects.filter(pk=cablepath.pk).update(
@@ -187,5 +188,7 @@ def nullify_connected_endpoints(instance, **kwargs):
                 is_active=cp.is_active,
                 is_split=cp.is_split,
             )
+            cp.pk = cablepath.pk
+            CablePathNode.objects.rebuild([cp])
         else:
             cablepath.delete()
@@ -11,6 +11,7 @@ from nautobot.utilities.tables import (
     ToggleColumn,
 )
 from .devices import CableTerminationTable
+from .template_code import UTILIZATION_GRAPH
 
 __all__ = (
     "PowerFeedTable",
@@ -32,11 +33,14 @@ class PowerPanelTable(BaseTable):
         url_params={"power_panel_id": "pk"},
         verbose_name="Feeds",
     )
+    get_power_utilization = tables.TemplateColumn(
+        template_code=UTILIZATION_GRAPH, orderable=False, verbose_name="Power"
+    )
     tags = TagColumn(url_name="dcim:powerpanel_list")
 
     class Meta(BaseTable.Meta):
         model = PowerPanel
-        fields = ("pk", "name", "site", "rack_group", "powerfeed_count", "tags")
+        fields = ("pk", "name", "site", "rack_group", "powerfeed_count", "get_power_utilization", "tags")
         default_columns = ("pk", "name", "site", "rack_group", "powerfeed_count")
 
 
@@ -1,4 +1,5 @@
 import json
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.test import override_settings
@@ -8,6 +9,7 @@ from rest_framework import status
 from constance.test import override_config
 
 from nautobot.dcim.choices import (
+    DeviceFaceChoices,
     InterfaceModeChoices,
     InterfaceTypeChoices,
     PortTypeChoices,
@@ -100,6 +102,39 @@ class Mixins:
             self.assertEqual(segment1[1]["label"], cable.label)
             self.assertEqual(segment1[2]["name"], peer_obj.name)
 
+        def test_bulk_trace(self):
+            """
+            Test tracing the attached cables of all device components of a device at once.
+            """
+            obj = self.model.objects.first()
+            peer_device = Device.objects.create(
+                site=Site.objects.first(),
+                device_type=DeviceType.objects.first(),
+                device_role=DeviceRole.objects.first(),
+                name="Peer Device",
+            )
+            if self.peer_termination_type is None:
+                raise NotImplementedError("Test case must set peer_termination_type")
+            peer_obj = self.peer_termination_type.objects.create(device=peer_device, name="Peer Termination")
+            cable = Cable(termination_a=obj, termination_b=peer_obj, label="Cable 1")
+            cable.save()
+
+            self.add_permissions(f"dcim.view_{self.model._meta.model_name}")
+            url = reverse(f"dcim-api:{self.model._meta.model_name}-bulk-trace")
+            response = self.client.get(f"{url}?device_id={obj.device.pk}", **self.header)
+
+            self.assertHttpStatus(response, status.HTTP_200_OK)
+            self.assertEqual(response.data["count"], self.model.objects.filter(device=obj.device).count())
+            traces = {result["id"]: result["trace"] for result in response.data["results"]}
+            self.assertEqual(len(traces[obj.pk]), 1)
+            segment1 = traces[obj.pk][0]
+            self.assertEqual(segment1[0]["name"], obj.name)
+            self.assertEqual(segment1[1]["label"], cable.label)
+            self.assertEqual(segment1[2]["name"], peer_obj.name)
+            for pk, trace in traces.items():
+                if pk != obj.pk:
+                    self.assertEqual(trace, [])
+
 
 class RegionTest(APIViewTestCases.APIViewTestCase):
     model = Region
@@ -495,6 +530,114 @@ class RackTest(APIViewTestCases.APIViewTestCase):
         self.assertEqual(response.get("Content-Type"), "image/svg+xml")
         self.assertIn(b'class="slot" height="22" width="230"', response.content)
 
+    def test_get_rack_elevation_svg_etag(self):
+        """
+        GET a single rack elevation in SVG format conditionally on its ETag.
+        """
+        rack = Rack.objects.first()
+        self.add_permissions("dcim.view_rack", "dcim.view_device")
+        url = "{}?render=svg".format(reverse("dcim-api:rack-elevation", kwargs={"pk": rack.pk}))
+
+        response = self.client.get(url, **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        etag = response["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.header)
+        self.assertHttpStatus(response, status.HTTP_304_NOT_MODIFIED)
+
+        # Installing a device in the rack changes its elevation
+        manufacturer = Manufacturer.objects.create(name="Manufacturer 1", slug="manufacturer-1")
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model="Device Type 1", slug="device-type-1")
+        Device.objects.create(
+            device_type=device_type,
+            device_role=DeviceRole.objects.create(name="Device Role 1", slug="device-role-1", color="ff0000"),
+            site=rack.site,
+            rack=rack,
+            position=1,
+            face=DeviceFaceChoices.FACE_FRONT,
+            name="Device 1",
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn(b"Device 1", response.content)
+
+    def test_get_bulk_rack_elevation_svg(self):
+        """
+        GET the elevations of all racks in SVG format.
+        """
+        self.add_permissions("dcim.view_rack")
+        url = reverse("dcim-api:rack-bulk-elevation")
+
+        response = self.client.get(url, **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], Rack.objects.count())
+        for result in response.data["results"]:
+            single_url = "{}?render=svg".format(reverse("dcim-api:rack-elevation", kwargs={"pk": result["id"]}))
+            single_response = self.client.get(single_url, **self.header)
+            self.assertEqual(single_response["ETag"], result["etag"])
+            self.assertEqual(single_response.content.decode(), result["svg"])
+
+    def test_get_rack_available_units(self):
+        """
+        GET the racks able to accommodate a device of a given height.
+        """
+        rack = Rack.objects.first()
+        manufacturer = Manufacturer.objects.create(name="Manufacturer 1", slug="manufacturer-1")
+        device_type = DeviceType.objects.create(
+            manufacturer=manufacturer, model="Device Type 1", slug="device-type-1", u_height=2, is_full_depth=True
+        )
+        Device.objects.create(
+            device_type=device_type,
+            device_role=DeviceRole.objects.create(name="Device Role 1", slug="device-role-1", color="ff0000"),
+            site=rack.site,
+            rack=rack,
+            position=21,
+            face=DeviceFaceChoices.FACE_FRONT,
+            name="Device 1",
+        )
+        self.add_permissions("dcim.view_rack")
+        url = reverse("dcim-api:rack-available-units")
+
+        response = self.client.get(f"{url}?device_u_height=21", **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        results = {result["id"]: result for result in response.data["results"]}
+        self.assertNotIn(str(rack.pk), results)
+        self.assertEqual(len(results), Rack.objects.count() - 1)
+        for result in results.values():
+            self.assertEqual(result["available_units"], list(range(22, 0, -1)))
+            self.assertEqual(result["max_contiguous_units"], 42)
+
+        response = self.client.get(f"{url}?device_u_height=20&id={rack.pk}", **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["available_units"], [23, 1])
+        self.assertEqual(response.data["results"][0]["max_contiguous_units"], 20)
+
+    def test_get_rack_power_utilization(self):
+        """
+        GET the power utilization of all racks.
+        """
+        rack = Rack.objects.first()
+        power_panel = PowerPanel.objects.create(site=rack.site, name="Power Panel 1")
+        feed = PowerFeed.objects.create(
+            power_panel=power_panel,
+            rack=rack,
+            name="Power Feed 1",
+            status=Status.objects.get_for_model(PowerFeed).get(slug="active"),
+        )
+        self.add_permissions("dcim.view_rack")
+        url = reverse("dcim-api:rack-power-utilization")
+
+        response = self.client.get(url, **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], Rack.objects.count())
+        for result in response.data["results"]:
+            if result["id"] == rack.pk:
+                self.assertEqual(result["allocated_draw"], 0)
+                self.assertEqual(result["available_power"], PowerFeed.objects.get(pk=feed.pk).available_power)
+            else:
+                self.assertEqual(result["available_power"], 0)
+
     @override_settings(RACK_ELEVATION_DEFAULT_UNIT_HEIGHT=27, RACK_ELEVATION_DEFAULT_UNIT_WIDTH=255)
     @override_config(RACK_ELEVATION_DEFAULT_UNIT_HEIGHT=19, RACK_ELEVATION_DEFAULT_UNIT_WIDTH=190)
     def test_get_rack_elevation_svg_settings_overridden(self):
@@ -1202,6 +1345,22 @@ class DeviceTest(APIViewTestCases.APIViewTestCase):
 
         self.assertEqual(response.data["results"][0].get("config_context", {}).get("A"), 1)
 
+    @override_settings(MATERIALIZED_CONFIG_CONTEXTS_ENABLED=True)
+    def test_config_context_not_materialized_in_list_view(self):
+        """
+        Check that config contexts which are not materialized are computed for the whole page rather than per device.
+        """
+        self.add_permissions("dcim.view_device")
+        url = reverse("dcim-api:device-list") + "?slug=device-with-context-data"
+        with mock.patch(
+            "nautobot.extras.querysets.ConfigContextQuerySet.get_for_object", side_effect=AssertionError
+        ) as get_for_object:
+            response = self.client.get(url, **self.header)
+
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0].get("config_context", {}).get("A"), 1)
+        get_for_object.assert_not_called()
+
     def test_config_context_excluded(self):
         """
         Check that config context data can be excluded by passing ?exclude=config_context.
@@ -1230,6 +1389,37 @@ class DeviceTest(APIViewTestCases.APIViewTestCase):
 
         self.assertHttpStatus(response, status.HTTP_400_BAD_REQUEST)
 
+    def test_bulk_create_devices_with_components(self):
+        """
+        Check that devices created in bulk get the components defined by their device type.
+        """
+        device_type = DeviceType.objects.get(slug="device-type-2")
+        InterfaceTemplate.objects.create(device_type=device_type, name="eth0")
+        InterfaceTemplate.objects.create(device_type=device_type, name="eth1")
+
+        self.add_permissions("dcim.add_device")
+        url = reverse("dcim-api:device-list")
+        response = self.client.post(url, self.create_data, format="json", **self.header)
+
+        self.assertHttpStatus(response, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), len(self.create_data))
+        for device in Device.objects.filter(pk__in=[item["id"] for item in response.data]):
+            self.assertEqual(sorted(device.interfaces.values_list("name", flat=True)), ["eth0", "eth1"])
+
+    def test_bulk_create_devices_conflict(self):
+        """
+        Check that no devices are created in bulk if any two of them conflict.
+        """
+        data = [self.create_data[0], self.create_data[1], dict(self.create_data[1])]
+
+        self.add_permissions("dcim.add_device")
+        url = reverse("dcim-api:device-list")
+        response = self.client.post(url, data, format="json", **self.header)
+
+        self.assertHttpStatus(response, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("2", response.data)
+        self.assertEqual(Device.objects.count(), 3)
+
     def test_local_context_schema_validation_pass(self):
         """
         Given a config context schema
@@ -1,5 +1,8 @@
+from io import StringIO
+
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase
 
 from nautobot.circuits.models import Circuit, CircuitTermination, CircuitType, Provider
@@ -22,7 +25,8 @@ from nautobot.dcim.models import (
     Site,
 )
 
-from nautobot.dcim.utils import object_to_path_node
+from nautobot.dcim.tracing import CableGraph
+from nautobot.dcim.utils import compile_path_node, object_to_path_node
 from nautobot.extras.models import Status
 
 
@@ -34,6 +38,7 @@ class CablePathTestCase(TestCase):
         1XX: Test direct connections between different endpoint types
         2XX: Test different cable topologies
         3XX: Test responses to changes in existing objects
+        4XX: Test retracing existing paths in bulk
     """
 
     @classmethod
@@ -136,7 +141,14 @@ class CablePathTestCase(TestCase):
         """
         for part, count in path_parts.items():
             self.assertEqual(CablePath.objects.filter(path__contains=part).count(), count)
+            self.assertEqual(CablePath.objects.traversing(part).count(), count)
         self.assertEqual(CablePath.objects.filter(path__contains=self.dneCable).count(), 0)
+        self.assertEqual(CablePath.objects.traversing(self.dneCable).count(), 0)
+
+        # The node index of each CablePath matches its path
+        for cablepath in CablePath.objects.all():
+            nodes = cablepath.nodes.order_by("position").values_list("node_type", "node_id")
+            self.assertEqual([compile_path_node(*node) for node in nodes], cablepath.path)
 
     def test_101_interface_to_interface(self):
         """
@@ -1476,3 +1488,78 @@ class CablePathTestCase(TestCase):
                 rearport1: 2,
             }
         )
+
+    def test_401_bulk_retrace_paths(self):
+        """
+        [IF1] --C1-- [FP1:1] [RP1] --C3-- [RP2] [FP2:1] --C4-- [IF3]
+        [IF2] --C2-- [FP1:2]
+        [IF4] --C5-- [CT1A] [CT1Z] --C6-- [PP1]
+        """
+        interface1 = Interface.objects.create(device=self.device, name="Interface 1")
+        interface2 = Interface.objects.create(device=self.device, name="Interface 2")
+        interface3 = Interface.objects.create(device=self.device, name="Interface 3")
+        interface4 = Interface.objects.create(device=self.device, name="Interface 4")
+        powerport1 = PowerPort.objects.create(device=self.device, name="Power Port 1")
+        rearport1 = RearPort.objects.create(device=self.device, name="Rear Port 1", positions=4)
+        rearport2 = RearPort.objects.create(device=self.device, name="Rear Port 2", positions=4)
+        frontport1_1 = FrontPort.objects.create(
+            device=self.device, name="Front Port 1:1", rear_port=rearport1, rear_port_position=1
+        )
+        frontport1_2 = FrontPort.objects.create(
+            device=self.device, name="Front Port 1:2", rear_port=rearport1, rear_port_position=2
+        )
+        frontport2_1 = FrontPort.objects.create(
+            device=self.device, name="Front Port 2:1", rear_port=rearport2, rear_port_position=1
+        )
+        circuittermination1 = CircuitTermination.objects.create(circuit=self.circuit, site=self.site, term_side="A")
+        circuittermination2 = CircuitTermination.objects.create(circuit=self.circuit, site=self.site, term_side="Z")
+        Cable(termination_a=interface1, termination_b=frontport1_1, status=self.status).save()
+        Cable(termination_a=interface2, termination_b=frontport1_2, status=self.status).save()
+        Cable(termination_a=rearport1, termination_b=rearport2, status=self.status_planned).save()
+        Cable(termination_a=frontport2_1, termination_b=interface3, status=self.status).save()
+        Cable(termination_a=interface4, termination_b=circuittermination1, status=self.status).save()
+        Cable(termination_a=circuittermination2, termination_b=powerport1, status=self.status).save()
+
+        # Paths traced from the in-memory graph are identical to those traced from the database
+        graph = CableGraph()
+        expected = {}
+        for cablepath in CablePath.objects.all():
+            expected[cablepath.origin_id] = (
+                cablepath.destination_type_id,
+                cablepath.destination_id,
+                cablepath.path,
+                cablepath.is_active,
+                cablepath.is_split,
+            )
+            self.assertEqual(
+                graph.trace(cablepath.origin_type.model_class(), cablepath.origin_id),
+                {
+                    "destination_type_id": cablepath.destination_type_id,
+                    "destination_id": cablepath.destination_id,
+                    "path": cablepath.path,
+                    "is_active": cablepath.is_active,
+                    "is_split": cablepath.is_split,
+                },
+            )
+        self.assertIsNone(graph.trace(PowerPort, PowerPort.objects.create(device=self.device, name="Power Port 2").pk))
+
+        # Missing and incorrect paths are rewritten; correct paths are kept
+        correct_path = CablePath.objects.get(origin_id=interface2.pk)
+        CablePath.objects.get(origin_id=interface1.pk).delete()
+        CablePath.objects.filter(origin_id=interface3.pk).update(path=[], is_active=True)
+        call_command("trace_paths", force=True, no_input=True, workers=1, chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(CablePath.objects.count(), len(expected))
+        for cablepath in CablePath.objects.all():
+            self.assertEqual(
+                expected[cablepath.origin_id],
+                (
+                    cablepath.destination_type_id,
+                    cablepath.destination_id,
+                    cablepath.path,
+                    cablepath.is_active,
+                    cablepath.is_split,
+                ),
+            )
+            self.assertPathIsSet(cablepath.origin_type.get_object_for_this_type(pk=cablepath.origin_id), cablepath)
+        self.assertTrue(CablePath.objects.filter(pk=correct_path.pk).exists())
@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 
@@ -23,17 +24,23 @@ from nautobot.dcim.models import (
     PowerPortTemplate,
     PowerOutlet,
     PowerOutletTemplate,
+    PowerFeed,
     PowerPanel,
     Rack,
     RackGroup,
+    RackReservation,
     RearPort,
     RearPortTemplate,
     Site,
 )
+from nautobot.dcim.provisioning import bulk_create_devices
 from nautobot.extras.models import Status
 from nautobot.tenancy.models import Tenant
 
 
+User = get_user_model()
+
+
 class RackGroupTestCase(TestCase):
     def test_change_rackgroup_site(self):
         """
@@ -189,6 +196,62 @@ class RackTestCase(TestCase):
         for u in rack1_inventory_rear:
             self.assertIsNone(u["device"])
 
+    def test_rack_occupancy(self):
+        """
+        Check the available units and utilization of a rack computed from its occupancy bitmaps.
+        """
+        device_type = self.device_type["ff2048"]
+        full_depth_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer, model="FrameForwarder 4096", slug="ff4096", u_height=2, is_full_depth=True
+        )
+        Device.objects.create(
+            name="TestSwitch1",
+            device_type=device_type,
+            device_role=self.role["Switch"],
+            site=self.site1,
+            rack=self.rack,
+            position=10,
+            face=DeviceFaceChoices.FACE_REAR,
+        )
+        Device.objects.create(
+            name="TestServer1",
+            device_type=full_depth_type,
+            device_role=self.role["Server"],
+            site=self.site1,
+            rack=self.rack,
+            position=41,
+            face=DeviceFaceChoices.FACE_FRONT,
+        )
+        RackReservation.objects.create(
+            rack=self.rack, units=[1, 2], user=User.objects.create(username="test-user"), description="Reserved"
+        )
+
+        all_units = list(range(42, 0, -1))
+        self.assertEqual(self.rack.get_available_units(), [u for u in all_units if u not in (10, 41, 42)])
+        self.assertEqual(
+            self.rack.get_available_units(rack_face=DeviceFaceChoices.FACE_FRONT),
+            [u for u in all_units if u not in (41, 42)],
+        )
+        self.assertEqual(
+            self.rack.get_available_units(u_height=2, rack_face=DeviceFaceChoices.FACE_REAR),
+            [u for u in all_units if u not in (9, 10, 40, 41, 42)],
+        )
+
+        # Occupied units (10, 41, 42) plus reserved units (1, 2)
+        self.assertEqual(self.rack.get_utilization(), (5, 42))
+        rack = Rack.objects.filter(pk=self.rack.pk).annotate_utilization().get()
+        self.assertEqual(rack.utilization_numerator, 5)
+        self.assertEqual(rack.get_utilization(), (5, 42))
+        self.assertEqual(rack.occupancy.get_max_contiguous_free(), 30)
+        self.assertEqual(rack.occupancy.get_max_contiguous_free(include_reserved=True), 30)
+        self.assertEqual(rack.occupancy.get_max_contiguous_free(face=DeviceFaceChoices.FACE_FRONT), 40)
+
+        racks = list(Rack.objects.filter(site=self.site1).with_available_units(u_height=31))
+        self.assertEqual(racks, [])
+        racks = list(Rack.objects.filter(site=self.site1).with_available_units(u_height=30))
+        self.assertEqual(racks, [self.rack])
+        self.assertEqual(racks[0].available_units, [11])
+
     def test_mount_zero_ru(self):
         pdu = Device.objects.create(
             name="TestPDU",
@@ -226,6 +289,66 @@ class RackTestCase(TestCase):
         self.assertEqual(Device.objects.get(pk=device1.pk).site, site_b)
 
 
+class PowerUtilizationTestCase(TestCase):
+    def setUp(self):
+        self.site = Site.objects.create(name="Site 1", slug="site-1")
+        self.rack = Rack.objects.create(
+            name="Rack 1", site=self.site, status=Status.objects.get_for_model(Rack).get(slug="active")
+        )
+        self.power_panel = PowerPanel.objects.create(site=self.site, name="Power Panel 1")
+        feed_status = Status.objects.get_for_model(PowerFeed).get(slug="active")
+        self.feeds = (
+            PowerFeed.objects.create(power_panel=self.power_panel, rack=self.rack, name="Feed A", status=feed_status),
+            PowerFeed.objects.create(power_panel=self.power_panel, rack=self.rack, name="Feed B", status=feed_status),
+            PowerFeed.objects.create(power_panel=self.power_panel, name="Feed C", status=feed_status),
+        )
+
+        manufacturer = Manufacturer.objects.create(name="Manufacturer 1", slug="manufacturer-1")
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model="Device Type 1", slug="device-type-1")
+        device_role = DeviceRole.objects.create(name="Device Role 1", slug="device-role-1")
+        cable_status = Status.objects.get_for_model(Cable).get(slug="connected")
+
+        # A PDU fed by each feed, with servers drawing power from its outlets
+        for i, feed in enumerate(self.feeds, start=1):
+            pdu = Device.objects.create(
+                device_type=device_type, device_role=device_role, site=self.site, rack=self.rack, name=f"PDU {i}"
+            )
+            pdu_port = PowerPort.objects.create(device=pdu, name="Input")
+            Cable(termination_a=pdu_port, termination_b=feed, status=cable_status).save()
+            for j in range(1, 3):
+                outlet = PowerOutlet.objects.create(device=pdu, power_port=pdu_port, name=f"Outlet {j}")
+                server = Device.objects.create(
+                    device_type=device_type, device_role=device_role, site=self.site, name=f"Server {i}-{j}"
+                )
+                server_port = PowerPort.objects.create(device=server, name="PSU", allocated_draw=100 * i)
+                Cable(termination_a=server_port, termination_b=outlet, status=cable_status).save()
+
+    def test_power_utilization(self):
+        available_power = [PowerFeed.objects.get(pk=feed.pk).available_power for feed in self.feeds]
+
+        rack_utilization = (200 + 400, available_power[0] + available_power[1])
+        self.assertEqual(self.rack.get_power_utilization(), rack_utilization)
+        rack = Rack.objects.filter(pk=self.rack.pk).annotate_power_utilization().get()
+        self.assertEqual(rack.power_utilization, rack_utilization)
+
+        panel_utilization = (200 + 400 + 600, sum(available_power))
+        self.assertEqual(self.power_panel.get_power_utilization(), panel_utilization)
+        power_panel = PowerPanel.objects.filter(pk=self.power_panel.pk).annotate_power_utilization().get()
+        self.assertEqual(power_panel.power_utilization, panel_utilization)
+
+        self.assertEqual(self.site.get_power_utilization(), panel_utilization)
+        site = Site.objects.filter(pk=self.site.pk).annotate_power_utilization().get()
+        self.assertEqual(site.power_utilization, panel_utilization)
+
+        # Objects without any power feeds have no power utilization
+        empty_rack = Rack.objects.create(name="Rack 2", site=self.site, status=self.rack.status)
+        with self.assertNumQueries(1):
+            self.assertEqual(empty_rack.get_power_utilization(), (0, 0))
+        racks = {rack.pk: rack for rack in Rack.objects.annotate_power_utilization()}
+        self.assertEqual(racks[empty_rack.pk].power_utilization, (0, 0))
+        self.assertEqual(racks[self.rack.pk].power_utilization, rack_utilization)
+
+
 class DeviceTestCase(TestCase):
     def setUp(self):
 
@@ -391,6 +514,58 @@ class DeviceTestCase(TestCase):
         device2.full_clean()
         device2.save()
 
+    def test_bulk_create_devices(self):
+        """
+        Ensure that all Device components are copied from the DeviceType for Devices created in bulk.
+        """
+        devices = [
+            Device(
+                site=self.site,
+                device_type=self.device_type,
+                device_role=self.device_role,
+                status=self.device_status,
+                name=f"Test Device {i}",
+            )
+            for i in range(1, 4)
+        ]
+        bulk_create_devices(devices)
+
+        for device in devices:
+            pp = PowerPort.objects.get(device=device, name="Power Port 1")
+            PowerOutlet.objects.get(device=device, name="Power Outlet 1", power_port=pp)
+            rp = RearPort.objects.get(device=device, name="Rear Port 1")
+            FrontPort.objects.get(device=device, name="Front Port 1", rear_port=rp)
+            self.assertEqual(device.consoleports.count(), 1)
+            self.assertEqual(device.consoleserverports.count(), 1)
+            self.assertEqual(device.interfaces.count(), 1)
+            self.assertEqual(device.devicebays.count(), 1)
+
+    def test_bulk_create_devices_conflicts(self):
+        """
+        Ensure that Devices created in bulk are validated against each other, and that none is created if any is
+        invalid.
+        """
+        rack = Rack.objects.create(name="Test Rack 1", site=self.site, u_height=10)
+        devices = [
+            Device(
+                site=self.site,
+                rack=rack,
+                position=1,
+                face=DeviceFaceChoices.FACE_FRONT,
+                device_type=self.device_type,
+                device_role=self.device_role,
+                status=self.device_status,
+                name=name,
+            )
+            for name in ("Test Device 1", "Test Device 1", "Test Device 2")
+        ]
+
+        with self.assertRaises(ValidationError) as cm:
+            bulk_create_devices(devices)
+        self.assertEqual(sorted(cm.exception.message_dict), ["1", "2"])
+        self.assertEqual(cm.exception.message_dict["1"], ["name: Conflicts with the device at index 0."])
+        self.assertFalse(Device.objects.exists())
+
 
 class CableTestCase(TestCase):
     def setUp(self):
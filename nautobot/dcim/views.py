@@ -21,6 +21,7 @@ from nautobot.core.views import generic
 from nautobot.extras.views import ObjectChangeLogView, ObjectConfigContextView
 from nautobot.ipam.models import IPAddress, Prefix, Service, VLAN
 from nautobot.ipam.tables import InterfaceIPAddressTable, InterfaceVLANTable
+from nautobot.utilities.config import get_settings_or_config
 from nautobot.utilities.forms import ConfirmationForm
 from nautobot.utilities.paginator import EnhancedPaginator, get_paginate_count
 from nautobot.utilities.permissions import get_permission_for_model
@@ -29,7 +30,8 @@ from nautobot.utilities.views import GetReturnURLMixin, ObjectPermissionRequired
 from nautobot.virtualization.models import VirtualMachine
 from . import filters, forms, tables
 from .choices import DeviceFaceChoices
-from .constants import NONCONNECTABLE_IFACE_TYPES
+from .constants import NONCONNECTABLE_IFACE_TYPES, RACK_ELEVATION_LEGEND_WIDTH_DEFAULT
+from .elevations import render_rack_elevations
 from .models import (
     Cable,
     CablePath,
@@ -378,8 +380,11 @@ class RackRoleBulkDeleteView(generic.BulkDeleteView):
 
 
 class RackListView(generic.ObjectListView):
-    queryset = Rack.objects.prefetch_related("site", "group", "tenant", "role", "devices__device_type").annotate(
-        device_count=count_related(Device, "rack")
+    queryset = (
+        Rack.objects.prefetch_related("site", "group", "tenant", "role")
+        .annotate(device_count=count_related(Device, "rack"))
+        .annotate_utilization()
+        .annotate_power_utilization()
     )
     filterset = filters.RackFilterSet
     filterset_form = forms.RackFilterForm
@@ -419,6 +424,18 @@ class RackElevationListView(generic.ObjectListView):
         if rack_face not in DeviceFaceChoices.values():
             rack_face = DeviceFaceChoices.FACE_FRONT
 
+        # Render the elevations of all racks in the page at once; the SVG embedded for each rack by the template is
+        # then served from the cache by the rack elevation API endpoint, rather than rendered by it one rack at a time.
+        render_rack_elevations(
+            page.object_list,
+            face=rack_face,
+            unit_width=get_settings_or_config("RACK_ELEVATION_DEFAULT_UNIT_WIDTH"),
+            unit_height=get_settings_or_config("RACK_ELEVATION_DEFAULT_UNIT_HEIGHT"),
+            legend_width=RACK_ELEVATION_LEGEND_WIDTH_DEFAULT,
+            user=request.user,
+            base_url=request.build_absolute_uri("/"),
+        )
+
         return render(
             request,
             "dcim/rack_elevation_list.html",
@@ -1541,6 +1558,7 @@ class ConsolePortBulkImportView(generic.BulkImportView):
     queryset = ConsolePort.objects.all()
     model_form = forms.ConsolePortCSVForm
     table = tables.ConsolePortTable
+    bulk_create = True
 
 
 class ConsolePortBulkEditView(generic.BulkEditView):
@@ -1605,6 +1623,7 @@ class ConsoleServerPortBulkImportView(generic.BulkImportView):
     queryset = ConsoleServerPort.objects.all()
     model_form = forms.ConsoleServerPortCSVForm
     table = tables.ConsoleServerPortTable
+    bulk_create = True
 
 
 class ConsoleServerPortBulkEditView(generic.BulkEditView):
@@ -1669,6 +1688,7 @@ class PowerPortBulkImportView(generic.BulkImportView):
     queryset = PowerPort.objects.all()
     model_form = forms.PowerPortCSVForm
     table = tables.PowerPortTable
+    bulk_create = True
 
 
 class PowerPortBulkEditView(generic.BulkEditView):
@@ -1733,6 +1753,7 @@ class PowerOutletBulkImportView(generic.BulkImportView):
     queryset = PowerOutlet.objects.all()
     model_form = forms.PowerOutletCSVForm
     table = tables.PowerOutletTable
+    bulk_create = True
 
 
 class PowerOutletBulkEditView(generic.BulkEditView):
@@ -1817,6 +1838,7 @@ class InterfaceBulkImportView(generic.BulkImportView):
     queryset = Interface.objects.all()
     model_form = forms.InterfaceCSVForm
     table = tables.InterfaceTable
+    bulk_create = True
 
 
 class InterfaceBulkEditView(generic.BulkEditView):
@@ -1881,6 +1903,7 @@ class FrontPortBulkImportView(generic.BulkImportView):
     queryset = FrontPort.objects.all()
     model_form = forms.FrontPortCSVForm
     table = tables.FrontPortTable
+    bulk_create = True
 
 
 class FrontPortBulkEditView(generic.BulkEditView):
@@ -1945,6 +1968,7 @@ class RearPortBulkImportView(generic.BulkImportView):
     queryset = RearPort.objects.all()
     model_form = forms.RearPortCSVForm
     table = tables.RearPortTable
+    bulk_create = True
 
 
 class RearPortBulkEditView(generic.BulkEditView):
@@ -2096,6 +2120,7 @@ class DeviceBayBulkImportView(generic.BulkImportView):
     queryset = DeviceBay.objects.all()
     model_form = forms.DeviceBayCSVForm
     table = tables.DeviceBayTable
+    bulk_create = True
 
 
 class DeviceBayBulkEditView(generic.BulkEditView):
@@ -2318,7 +2343,7 @@ class PathTraceView(generic.ObjectView):
 
         # Otherwise, find all CablePaths which traverse the specified object
         else:
-            related_paths = CablePath.objects.filter(path__contains=instance).prefetch_related("origin")
+            related_paths = CablePath.objects.traversing(instance).prefetch_related("origin")
             # Check for specification of a particular path (when tracing pass-through ports)
             try:
                 path_id = int(request.GET.get("cablepath_id"))
@@ -2829,8 +2854,10 @@ class VirtualChassisBulkDeleteView(generic.BulkDeleteView):
 
 
 class PowerPanelListView(generic.ObjectListView):
-    queryset = PowerPanel.objects.prefetch_related("site", "rack_group").annotate(
-        powerfeed_count=count_related(PowerFeed, "power_panel")
+    queryset = (
+        PowerPanel.objects.prefetch_related("site", "rack_group")
+        .annotate(powerfeed_count=count_related(PowerFeed, "power_panel"))
+        .annotate_power_utilization()
     )
     filterset = filters.PowerPanelFilterSet
     filterset_form = forms.PowerPanelFilterForm
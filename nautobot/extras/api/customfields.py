@@ -1,4 +1,3 @@
-from django.contrib.contenttypes.models import ContentType
 from rest_framework.serializers import SerializerMethodField
 from rest_framework.fields import CreateOnlyDefault, Field
 
@@ -22,8 +21,7 @@ class CustomFieldDefaultValues:
         self.model = serializer_field.parent.Meta.model
 
         # Retrieve the CustomFields for the parent model
-        content_type = ContentType.objects.get_for_model(self.model)
-        fields = CustomField.objects.filter(content_types=content_type)
+        fields = CustomField.objects.get_for_model(self.model)
 
         # Populate the default value for each CustomField
         value = {}
@@ -42,8 +40,7 @@ class CustomFieldsDataField(Field):
         Cache CustomFields assigned to this model to avoid redundant database queries
         """
         if not hasattr(self, "_custom_fields"):
-            content_type = ContentType.objects.get_for_model(self.parent.Meta.model)
-            self._custom_fields = CustomField.objects.filter(content_types=content_type)
+            self._custom_fields = CustomField.objects.get_for_model(self.parent.Meta.model)
         return self._custom_fields
 
     def to_representation(self, obj):
@@ -74,8 +71,7 @@ class CustomFieldModelSerializer(ValidatedModelSerializer):
         if self.instance is not None:
 
             # Retrieve the set of CustomFields which apply to this type of object
-            content_type = ContentType.objects.get_for_model(self.Meta.model)
-            fields = CustomField.objects.filter(content_types=content_type)
+            fields = CustomField.objects.get_for_model(self.Meta.model)
 
             # Populate CustomFieldValues for each instance from database
             if type(self.instance) in (list, tuple):
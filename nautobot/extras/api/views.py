@@ -1,4 +1,5 @@
 from datetime import datetime
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.forms import ValidationError as FormsValidationError
 from django.http import Http404
@@ -99,11 +100,28 @@ class ConfigContextQuerySetMixin:
         Else, return the queryset annotated with config context data
         """
         queryset = super().get_queryset()
-        request = self.get_serializer_context()["request"]
-        if self.brief or "config_context" in request.query_params.get("exclude", []):
+        if not self._include_config_context():
             return queryset
+        if settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED:
+            return queryset.annotate_rendered_config_context()
         return queryset.annotate_config_context_data()
 
+    def paginate_queryset(self, queryset):
+        """
+        Compute the config contexts of the objects of the page which have no up-to-date materialized config context
+        with a constant number of queries, rather than querying them for each object.
+        """
+        page = super().paginate_queryset(queryset)
+        if page is not None and settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED and self._include_config_context():
+            queryset.model.prefetch_config_context(
+                [obj for obj in page if getattr(obj, "rendered_config_context", None) is None], materialized=False
+            )
+        return page
+
+    def _include_config_context(self):
+        request = self.get_serializer_context()["request"]
+        return not (self.brief or "config_context" in request.query_params.get("exclude", []))
+
 
 class ConfigContextViewSet(ModelViewSet):
     queryset = ConfigContext.objects.prefetch_related(
@@ -1,12 +1,14 @@
 import uuid
 from contextlib import contextmanager
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
 from django.db.models.signals import m2m_changed, pre_delete, post_save
 from django.test.client import RequestFactory
 
-from nautobot.extras.signals import _handle_changed_object, _handle_deleted_object
+from nautobot.extras.signals import _handle_changed_object, _handle_deleted_object, ChangeLogBuffer
 from nautobot.utilities.utils import curry
 
 
@@ -16,24 +18,35 @@ def change_logging(request):
     Enable change logging by connecting the appropriate signals to their receivers before code is run, and
     disconnecting them afterward.
 
+    Unless `settings.CHANGELOG_DEFERRED` is disabled, the resulting ObjectChanges are buffered, coalesced per object,
+    and written with a single bulk insert when the block exits (or whenever the buffer grows too large).
+
     :param request: WSGIRequest object with a unique `id` set
     """
+    change_log_buffer = ChangeLogBuffer(request) if settings.CHANGELOG_DEFERRED else None
+
     # Curry signals receivers to pass the current request
-    handle_changed_object = curry(_handle_changed_object, request)
-    handle_deleted_object = curry(_handle_deleted_object, request)
+    handle_changed_object = curry(_handle_changed_object, request, change_log_buffer=change_log_buffer)
+    handle_deleted_object = curry(_handle_deleted_object, request, change_log_buffer=change_log_buffer)
 
     # Connect our receivers to the post_save and post_delete signals.
     post_save.connect(handle_changed_object, dispatch_uid="handle_changed_object")
     m2m_changed.connect(handle_changed_object, dispatch_uid="handle_changed_object")
     pre_delete.connect(handle_deleted_object, dispatch_uid="handle_deleted_object")
 
-    yield
+    try:
+        yield
+
+    finally:
+        # Disconnect change logging signals. This is necessary to avoid recording any errant
+        # changes during test cleanup.
+        post_save.disconnect(handle_changed_object, dispatch_uid="handle_changed_object")
+        m2m_changed.disconnect(handle_changed_object, dispatch_uid="handle_changed_object")
+        pre_delete.disconnect(handle_deleted_object, dispatch_uid="handle_deleted_object")
 
-    # Disconnect change logging signals. This is necessary to avoid recording any errant
-    # changes during test cleanup.
-    post_save.disconnect(handle_changed_object, dispatch_uid="handle_changed_object")
-    m2m_changed.disconnect(handle_changed_object, dispatch_uid="handle_changed_object")
-    pre_delete.disconnect(handle_deleted_object, dispatch_uid="handle_deleted_object")
+        # Write any buffered changes, unless the current transaction has failed and can't be written to
+        if change_log_buffer is not None and not transaction.get_connection().needs_rollback:
+            change_log_buffer.flush()
 
 
 @contextmanager
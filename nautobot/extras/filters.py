@@ -335,10 +335,9 @@ class CustomFieldModelFilterSet(django_filters.FilterSet):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        custom_fields = CustomField.objects.filter(
-            content_types=ContentType.objects.get_for_model(self._meta.model)
-        ).exclude(filter_logic=CustomFieldFilterLogicChoices.FILTER_DISABLED)
-        for cf in custom_fields:
+        for cf in CustomField.objects.get_for_model(self._meta.model):
+            if cf.filter_logic == CustomFieldFilterLogicChoices.FILTER_DISABLED:
+                continue
             self.filters["cf_{}".format(cf.name)] = CustomFieldFilter(field_name=cf.name, custom_field=cf)
 
 
@@ -537,8 +537,8 @@ class CustomFieldModelForm(forms.ModelForm):
 class CustomFieldModelCSVForm(CSVModelForm, CustomFieldModelForm):
     def _append_customfield_fields(self):
 
-        # Append form fields
-        for cf in CustomField.objects.filter(content_types=self.obj_type):
+        # Append form fields (from the cached definitions, as a form is created for each row of imported data)
+        for cf in CustomField.objects.get_for_model(self._meta.model):
             field_name = "cf_{}".format(cf.name)
             self.fields[field_name] = cf.to_form_field(for_csv_import=True)
 
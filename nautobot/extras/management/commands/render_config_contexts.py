@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nautobot.dcim.models import Device
+from nautobot.extras.models import RenderedConfigContext
+from nautobot.virtualization.models import VirtualMachine
+
+
+class Command(BaseCommand):
+    help = "Render the materialized config contexts of all devices and virtual machines, or check their consistency."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report the objects whose materialized config context is missing or out of date.",
+        )
+
+    def handle(self, *args, **options):
+        inconsistent = 0
+        for model in (Device, VirtualMachine):
+            verbose_name_plural = model._meta.verbose_name_plural
+            if options["check"]:
+                pks = RenderedConfigContext.objects.check_consistency(model)
+                for pk in pks:
+                    self.stdout.write(f"Materialized config context of {model._meta.verbose_name} {pk} is out of date")
+                inconsistent += len(pks)
+                self.stdout.write(f"Checked {verbose_name_plural}: {len(pks)} inconsistent")
+            else:
+                count = RenderedConfigContext.objects.render(model)
+                self.stdout.write(self.style.SUCCESS(f"Rendered config contexts of {count} {verbose_name_plural}"))
+
+        if inconsistent:
+            raise CommandError(f"{inconsistent} materialized config contexts are out of date")
@@ -0,0 +1,120 @@
+"""
+In-process cache of the CustomField, ComputedField, Relationship, CustomLink, Status and Webhook definitions of each
+content type, and of the saved GraphQL queries.
+
+These definitions are looked up for every object rendered in a list view, table export or API response, but change very
+rarely. Each process keeps the definitions it has loaded until a definition is changed, which is detected through a
+version counter stored in the Django cache and incremented by signals on the definition models. The shared version is
+checked at most once per request (or once per `VERSION_CHECK_INTERVAL` seconds outside of requests), so rendering a
+page of objects costs no metadata queries once the definitions are cached.
+"""
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+logger = logging.getLogger("nautobot.extras.metadata")
+
+# Cache key of the shared metadata version, incremented every time a definition is changed.
+METADATA_VERSION_CACHE_KEY = "nautobot.extras.metadata.version"
+
+# Maximum number of seconds between checks of the shared version outside of requests
+VERSION_CHECK_INTERVAL = 1
+
+
+class MetadataCache:
+    """
+    Versioned in-process cache of lists of model instances, keyed by the model and an arbitrary key (usually the
+    content type ID the instances apply to).
+
+    Cached instances are shared by every caller in this process and must not be modified.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.version = None
+        self._checked_at = None
+
+    def _check_version(self):
+        """Discard all cached entries if the shared version has changed since they were loaded."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+        version = cache.get(METADATA_VERSION_CACHE_KEY, 0)
+        with self._lock:
+            if version != self.version:
+                if self._entries:
+                    logger.debug(
+                        "Metadata version changed from %s to %s, discarding cached entries", self.version, version
+                    )
+                self._entries = {}
+                self.version = version
+            self._checked_at = now
+
+    def _has_uncommitted_changes(self):
+        """
+        Return True if definitions have been changed by a transaction of this thread which is not yet committed.
+
+        Such changes are not visible to other threads and may still be rolled back, so the cache is bypassed until the
+        transaction ends. This relies on the invalidation callback registered by `changed()` being pending until then.
+        """
+        connection = transaction.get_connection()
+        return any(entry[1] == self.invalidate for entry in connection.run_on_commit)
+
+    def get(self, queryset, *key):
+        """
+        Return the cached list of instances for this key, evaluating the given queryset to load them if needed.
+        """
+        if self._has_uncommitted_changes():
+            return list(queryset)
+
+        self._check_version()
+        key = (queryset.model._meta.label_lower, *key)
+        try:
+            return self._entries[key]
+        except KeyError:
+            pass
+        instances = list(queryset)
+        with self._lock:
+            # Another thread may have invalidated the cache while the queryset was evaluated
+            if self._checked_at is not None:
+                self._entries[key] = instances
+        return instances
+
+    def get_queryset(self, queryset, *key):
+        """
+        Return the given queryset with its results populated from the cache, so that iterating, counting or testing it
+        causes no database query. Chaining further methods such as `filter()` still queries the database as usual.
+        """
+        queryset._result_cache = list(self.get(queryset, *key))
+        queryset._prefetch_done = True
+        return queryset
+
+    def expire(self, **kwargs):
+        """Check the shared version on the next lookup; connected to the start of each request."""
+        self._checked_at = None
+
+    def changed(self):
+        """
+        Invalidate the cache for a definition changed in the current transaction.
+
+        The cache is invalidated immediately, bypassed by this thread until the transaction ends, and invalidated again
+        once it is committed so that no process keeps definitions loaded from the previous state in the meantime.
+        """
+        self.invalidate()
+        transaction.on_commit(self.invalidate)
+
+    def invalidate(self, **kwargs):
+        """Discard the cached entries and increment the shared version, notifying other processes of the change."""
+        with self._lock:
+            self._entries = {}
+            self._checked_at = None
+        cache.add(METADATA_VERSION_CACHE_KEY, 0, timeout=None)
+        cache.incr(METADATA_VERSION_CACHE_KEY)
+
+
+metadata_cache = MetadataCache()
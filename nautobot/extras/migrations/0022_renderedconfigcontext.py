@@ -0,0 +1,40 @@
+from django.db import migrations, models
+import django.core.serializers.json
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("extras", "0021_customfield_changelog_data"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RenderedConfigContext",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("object_id", models.UUIDField()),
+                ("data", models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ("stale", models.BooleanField(default=False)),
+                ("version", models.PositiveIntegerField(default=0)),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="contenttypes.contenttype"
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("content_type", "object_id")},
+            },
+        ),
+    ]
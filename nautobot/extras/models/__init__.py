@@ -16,6 +16,7 @@ from .models import (
     Job,
     JobLogEntry,
     JobResult,
+    RenderedConfigContext,
     ScheduledJob,
     ScheduledJobs,
     Webhook,
@@ -48,6 +49,7 @@ __all__ = (
     "Relationship",
     "RelationshipModel",
     "RelationshipAssociation",
+    "RenderedConfigContext",
     "ScheduledJob",
     "ScheduledJobs",
     "Secret",
@@ -14,6 +14,7 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 
 from nautobot.extras.choices import CustomFieldFilterLogicChoices, CustomFieldTypeChoices
+from nautobot.extras.metadata import metadata_cache
 from nautobot.extras.models import ChangeLoggedModel, ObjectChange
 from nautobot.extras.tasks import delete_custom_field_data, update_custom_field_choice_data
 from nautobot.extras.utils import FeatureQuery, extras_features
@@ -30,7 +31,7 @@ from nautobot.utilities.forms import (
 )
 from nautobot.utilities.querysets import RestrictedQuerySet
 from nautobot.utilities.templatetags.helpers import render_markdown
-from nautobot.utilities.utils import render_jinja2, serialize_object
+from nautobot.utilities.utils import render_jinja2, render_jinja2_many, serialize_object
 from nautobot.utilities.validators import validate_regex
 
 logger = logging.getLogger(__name__)
@@ -44,7 +45,7 @@ class ComputedFieldManager(models.Manager.from_queryset(RestrictedQuerySet)):
         Return all ComputedFields assigned to the given model.
         """
         content_type = ContentType.objects.get_for_model(model._meta.concrete_model)
-        return self.get_queryset().filter(content_type=content_type)
+        return metadata_cache.get_queryset(self.get_queryset().filter(content_type=content_type), content_type.pk)
 
 
 @extras_features("graphql")
@@ -97,6 +98,17 @@ class ComputedField(BaseModel, ChangeLoggedModel):
             logger.warning("Failed to render computed field %s: %s", self.slug, exc)
             return self.fallback_value
 
+    def render_many(self, objects):
+        """
+        Render this field for each of a list of objects, compiling its template only once. Return the list of rendered
+        values.
+        """
+        try:
+            return render_jinja2_many(self.template, [{"obj": obj} for obj in objects])
+        except Exception:
+            # Render each object individually, substituting the fallback value for those which fail
+            return [self.render(context={"obj": obj}) for obj in objects]
+
 
 class CustomFieldModel(models.Model):
     """
@@ -162,9 +174,8 @@ class CustomFieldModel(models.Model):
         Get a computed field for this model, lookup via slug.
         Returns the template of this field if render is False, otherwise returns the rendered value.
         """
-        try:
-            computed_field = ComputedField.objects.get_for_model(self).get(slug=slug)
-        except ComputedField.DoesNotExist:
+        computed_field = next((cf for cf in ComputedField.objects.get_for_model(self) if cf.slug == slug), None)
+        if computed_field is None:
             logger.warning("Computed Field with slug %s does not exist for model %s", slug, self._meta.verbose_name)
             return None
         if render:
@@ -193,7 +204,7 @@ class CustomFieldManager(models.Manager.from_queryset(RestrictedQuerySet)):
         Return all CustomFields assigned to the given model.
         """
         content_type = ContentType.objects.get_for_model(model._meta.concrete_model)
-        return self.get_queryset().filter(content_types=content_type)
+        return metadata_cache.get_queryset(self.get_queryset().filter(content_types=content_type), content_type.pk)
 
 
 @extras_features("webhooks")
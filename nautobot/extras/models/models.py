@@ -1,3 +1,4 @@
+import itertools
 import json
 import logging
 import uuid
@@ -14,7 +15,7 @@ from django.core.serializers.json import DjangoJSONEncoder
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import signals
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.urls import reverse
 from django.utils import timezone
 from django_celery_beat.clockedschedule import clocked
@@ -45,12 +46,18 @@ from nautobot.extras.constants import (
     JOB_LOG_MAX_GROUPING_LENGTH,
     JOB_LOG_MAX_LOG_OBJECT_LENGTH,
 )
+from nautobot.extras.metadata import metadata_cache
 from nautobot.extras.models import ChangeLoggedModel
 from nautobot.extras.models.customfields import CustomFieldModel
 from nautobot.extras.models.relationships import RelationshipModel
-from nautobot.extras.querysets import ConfigContextQuerySet, ScheduledJobExtendedQuerySet
+from nautobot.extras.querysets import (
+    ConfigContextQuerySet,
+    RenderedConfigContextQuerySet,
+    ScheduledJobExtendedQuerySet,
+)
 from nautobot.extras.utils import extras_features, FeatureQuery, image_upload
-from nautobot.utilities.utils import deepmerge, render_jinja2
+from nautobot.utilities.querysets import RestrictedQuerySet
+from nautobot.utilities.utils import deepmerge, IteratorQuerySet, render_jinja2, render_jinja2_stream
 
 
 # The JOB_LOGS variable is used to tell the JobLogEntry model the database to store to.
@@ -168,6 +175,32 @@ class ConfigContext(BaseModel, ChangeLoggedModel, ConfigContextSchemaValidationM
             raise ValidationError({"name": "A ConfigContext with this name already exists."})
 
 
+class RenderedConfigContext(BaseModel):
+    """
+    The rendered configuration context of a device or virtual machine, materialized when
+    `settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED` is True so that reading it is a single indexed lookup.
+
+    Rows are marked as stale by signals whenever anything the rendered data depends on changes, and rendered again by
+    a background task. Stale rows are never read.
+    """
+
+    content_type = models.ForeignKey(to=ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id = models.UUIDField()
+    data = models.JSONField(encoder=DjangoJSONEncoder, default=dict)
+    stale = models.BooleanField(default=False)
+    # Incremented every time the row is marked as stale
+    version = models.PositiveIntegerField(default=0)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    objects = RenderedConfigContextQuerySet.as_manager()
+
+    class Meta:
+        unique_together = [["content_type", "object_id"]]
+
+    def __str__(self):
+        return f"Rendered config context of {self.content_type} {self.object_id}"
+
+
 class ConfigContextModel(models.Model, ConfigContextSchemaValidationMixin):
     """
     A model which includes local configuration context data. This local data will override any inherited data from
@@ -208,10 +241,58 @@ class ConfigContextModel(models.Model, ConfigContextSchemaValidationMixin):
         """
         Return the rendered configuration context for a device or VM.
         """
+        # Already computed by prefetch_config_context()
+        if hasattr(self, "_config_context"):
+            return self._config_context
+
+        # Annotated by ConfigContextModelQuerySet.annotate_rendered_config_context()
+        if getattr(self, "rendered_config_context", None) is not None:
+            return self.rendered_config_context
+
+        if settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED:
+            rendered = RenderedConfigContext.objects.get_for_objects([self])
+            if self.pk in rendered:
+                return rendered[self.pk]
 
         # always manually query for config contexts
         config_context_data = ConfigContext.objects.get_for_object(self).values_list("data", flat=True)
 
+        return self._merge_config_context(config_context_data)
+
+    @classmethod
+    def prefetch_config_context(cls, objects, materialized=True):
+        """
+        Compute the rendered configuration context of each of the given objects with a constant number of queries, so
+        that calling `get_config_context()` on any of them requires no further queries.
+
+        Unless `materialized` is False, up-to-date materialized config contexts are used where available.
+        """
+        objects = list(objects)
+        if materialized and settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED:
+            rendered = RenderedConfigContext.objects.get_for_objects(objects)
+            for obj in objects:
+                if obj.pk in rendered:
+                    obj._config_context = rendered[obj.pk]
+            cls.prefetch_config_context([obj for obj in objects if obj.pk not in rendered], materialized=False)
+            return objects
+
+        config_contexts = ConfigContext.objects.get_for_objects(objects)
+
+        # Load any deferred local context data at once rather than for each object
+        deferred = [obj.pk for obj in objects if "local_context_data" in obj.get_deferred_fields()]
+        local_context_data = {}
+        if deferred:
+            local_context_data = dict(cls.objects.filter(pk__in=deferred).values_list("pk", "local_context_data"))
+
+        for obj in objects:
+            if obj.pk in local_context_data:
+                obj.local_context_data = local_context_data[obj.pk]
+            obj._config_context = obj._merge_config_context(
+                config_context.data for config_context in config_contexts[obj.pk]
+            )
+        return objects
+
+    def _merge_config_context(self, config_context_data):
         # Compile all config data, overwriting lower-weight values with higher-weight values where a collision occurs
         data = OrderedDict()
         for context in config_context_data:
@@ -306,6 +387,15 @@ class ConfigContextSchema(OrganizationalModel):
 #
 
 
+class CustomLinkManager(models.Manager.from_queryset(RestrictedQuerySet)):
+    def get_for_model(self, model):
+        """
+        Return all CustomLinks assigned to the given model.
+        """
+        content_type = ContentType.objects.get_for_model(model._meta.concrete_model)
+        return metadata_cache.get_queryset(self.get_queryset().filter(content_type=content_type), content_type.pk)
+
+
 @extras_features("graphql")
 class CustomLink(BaseModel, ChangeLoggedModel):
     """
@@ -342,6 +432,8 @@ class CustomLink(BaseModel, ChangeLoggedModel):
     )
     new_window = models.BooleanField(help_text="Force link to open in a new window")
 
+    objects = CustomLinkManager()
+
     class Meta:
         ordering = ["group_name", "weight", "name"]
 
@@ -412,23 +504,39 @@ class ExportTemplate(BaseModel, ChangeLoggedModel, RelationshipModel):
         """
         Render the contents of the template.
         """
-        context = {"queryset": queryset}
-        output = render_jinja2(self.template_code, context)
+        return "".join(self.render_stream(queryset))
 
-        # Replace CRLF-style line terminators
-        output = output.replace("\r\n", "\n")
+    def render_stream(self, queryset):
+        """
+        Render the contents of the template, yielding the output in chunks as it is generated.
 
-        return output
+        Iterating over `queryset` in the template fetches the objects (and their prefetched related objects) in chunks,
+        rather than loading every object into memory at once.
+        """
+        context = {"queryset": IteratorQuerySet(queryset)}
+        pending = ""
+        for chunk in render_jinja2_stream(self.template_code, context):
+            # Replace CRLF-style line terminators, holding back a trailing CR which may be followed by a LF
+            chunk = (pending + chunk).replace("\r\n", "\n")
+            pending = "\r" if chunk.endswith("\r") else ""
+            if pending:
+                chunk = chunk[:-1]
+            yield chunk
+        if pending:
+            yield pending
 
     def render_to_response(self, queryset):
         """
-        Render the template to an HTTP response, delivered as a named file attachment
+        Render the template to a streaming HTTP response, delivered as a named file attachment
         """
-        output = self.render(queryset)
+        output = self.render_stream(queryset)
         mime_type = "text/plain" if not self.mime_type else self.mime_type
 
+        # Render the first chunk now so that errors in the template are raised before the response is returned
+        first_chunk = next(output, "")
+
         # Build the response
-        response = HttpResponse(output, content_type=mime_type)
+        response = StreamingHttpResponse(itertools.chain([first_chunk], output), content_type=mime_type)
         filename = "nautobot_{}{}".format(
             queryset.model._meta.verbose_name_plural,
             ".{}".format(self.file_extension) if self.file_extension else "",
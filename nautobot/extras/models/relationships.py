@@ -10,6 +10,7 @@ from django.db import models
 from django.db.models import Q
 
 from nautobot.extras.choices import RelationshipTypeChoices, RelationshipSideChoices
+from nautobot.extras.metadata import metadata_cache
 from nautobot.extras.utils import FeatureQuery
 from nautobot.extras.models import ChangeLoggedModel
 from nautobot.core.fields import AutoSlugField
@@ -201,8 +202,12 @@ class RelationshipManager(models.Manager.from_queryset(RestrictedQuerySet)):
         """
         content_type = ContentType.objects.get_for_model(model._meta.concrete_model)
         return (
-            self.get_queryset().filter(source_type=content_type),
-            self.get_queryset().filter(destination_type=content_type),
+            metadata_cache.get_queryset(
+                self.get_queryset().filter(source_type=content_type), "source", content_type.pk
+            ),
+            metadata_cache.get_queryset(
+                self.get_queryset().filter(destination_type=content_type), "destination", content_type.pk
+            ),
         )
 
 
@@ -7,6 +7,7 @@ from django.utils.encoding import force_str
 from django.utils.hashable import make_hashable
 
 from nautobot.extras.utils import extras_features, FeatureQuery
+from nautobot.extras.metadata import metadata_cache
 from nautobot.extras.models import ChangeLoggedModel
 from nautobot.extras.models.customfields import CustomFieldModel
 from nautobot.extras.models.relationships import RelationshipModel
@@ -26,7 +27,11 @@ class StatusQuerySet(RestrictedQuerySet):
         Return all `Status` assigned to the given model.
         """
         content_type = ContentType.objects.get_for_model(model._meta.concrete_model)
-        return self.filter(content_types=content_type)
+        queryset = self.filter(content_types=content_type)
+        if self.query.has_filters():
+            # Only the unfiltered set of statuses is cached
+            return queryset
+        return metadata_cache.get_queryset(queryset, content_type.pk)
 
 
 @extras_features(
@@ -1,4 +1,8 @@
-from django.db.models import OuterRef, Subquery, Q
+from itertools import islice
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, OuterRef, Subquery, Q
+from django.utils import timezone
 from django_celery_beat.managers import ExtendedQuerySet
 
 from nautobot.extras.models.tags import TaggedItem
@@ -55,6 +59,115 @@ class ConfigContextQuerySet(RestrictedQuerySet):
 
         return queryset
 
+    def get_for_objects(self, objects):
+        """
+        Return a dictionary mapping the PK of each of the given objects (all devices or all virtual machines) to the
+        list of its applicable ConfigContexts, ordered by weight and name, as `get_for_object()` would.
+
+        Rather than querying the ConfigContexts applicable to each object, the active ConfigContexts and their
+        assignments are loaded once and matched against the objects in Python, so the number of queries is constant
+        regardless of the number of objects.
+        """
+        objects = list(objects)
+        if not objects:
+            return {}
+        model = objects[0]._meta.model
+
+        # `site` and `device_role` for Device; `cluster__site` and `role` for VirtualMachine
+        if model._meta.model_name == "device":
+            site_field, role_field = "site", "device_role"
+        else:
+            site_field, role_field = "cluster__site", "role"
+        fields = {
+            "_site": site_field,
+            "_role": role_field,
+            "_platform": "platform",
+            "_cluster": "cluster",
+            "_cluster_group": "cluster__group",
+            "_tenant": "tenant",
+            "_tenant_group": "tenant__group",
+            "_region_tree_id": f"{site_field}__region__tree_id",
+            "_region_lft": f"{site_field}__region__lft",
+            "_region_rght": f"{site_field}__region__rght",
+        }
+        if model._meta.model_name == "device":
+            fields["_device_type"] = "device_type"
+        pks = [obj.pk for obj in objects]
+        attributes = {
+            values.pop("pk"): values
+            for values in model.objects.filter(pk__in=pks).values(
+                "pk", **{name: F(field) for name, field in fields.items()}
+            )
+        }
+        object_tags = {pk: set() for pk in pks}
+        for object_id, tag_id in TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(model), object_id__in=pks
+        ).values_list("object_id", "tag_id"):
+            object_tags[object_id].add(tag_id)
+
+        config_contexts = list(
+            self.filter(is_active=True)
+            .order_by("weight", "name")
+            .prefetch_related(
+                "regions",
+                "sites",
+                "roles",
+                "device_types",
+                "platforms",
+                "cluster_groups",
+                "clusters",
+                "tenant_groups",
+                "tenants",
+                "tags",
+            )
+        )
+        assignments = [
+            (
+                config_context,
+                {
+                    "_site": {site.pk for site in config_context.sites.all()},
+                    "_role": {role.pk for role in config_context.roles.all()},
+                    "_device_type": {device_type.pk for device_type in config_context.device_types.all()},
+                    "_platform": {platform.pk for platform in config_context.platforms.all()},
+                    "_cluster_group": {group.pk for group in config_context.cluster_groups.all()},
+                    "_cluster": {cluster.pk for cluster in config_context.clusters.all()},
+                    "_tenant_group": {group.pk for group in config_context.tenant_groups.all()},
+                    "_tenant": {tenant.pk for tenant in config_context.tenants.all()},
+                },
+                [(region.tree_id, region.lft, region.rght) for region in config_context.regions.all()],
+                {tag.pk for tag in config_context.tags.all()},
+            )
+            for config_context in config_contexts
+        ]
+
+        def matches(values, tags, filters, regions, context_tags):
+            # An empty assignment matches any object, as with `Q(<field>=None)` in `get_for_object()`
+            for name, assigned in filters.items():
+                if assigned and values.get(name) not in assigned:
+                    return False
+            # Match against the directly assigned region as well as any parent regions
+            if regions and not any(
+                tree_id == values["_region_tree_id"] and lft <= values["_region_lft"] and rght >= values["_region_rght"]
+                for tree_id, lft, rght in regions
+            ):
+                return False
+            if context_tags and not context_tags & tags:
+                return False
+            return True
+
+        result = {}
+        for pk in pks:
+            values = attributes.get(pk)
+            if values is None:
+                result[pk] = []
+                continue
+            result[pk] = [
+                config_context
+                for config_context, filters, regions, context_tags in assignments
+                if matches(values, object_tags[pk], filters, regions, context_tags)
+            ]
+        return result
+
 
 class ConfigContextModelQuerySet(RestrictedQuerySet):
     """
@@ -85,6 +198,75 @@ class ConfigContextModelQuerySet(RestrictedQuerySet):
             )
         ).distinct()
 
+    def annotate_rendered_config_context(self):
+        """
+        Attach the up-to-date materialized config context of each object, if any, as `rendered_config_context`.
+        """
+        from nautobot.extras.models import RenderedConfigContext
+
+        return self.annotate(
+            rendered_config_context=Subquery(
+                RenderedConfigContext.objects.filter(
+                    content_type=ContentType.objects.get_for_model(self.model),
+                    object_id=OuterRef("pk"),
+                    stale=False,
+                ).values("data")[:1]
+            )
+        )
+
+    def get_for_config_context(self, config_context):
+        """
+        Return the objects to which the assignments of the given ConfigContext apply, regardless of whether it is
+        active. Assignments to device types are ignored for virtual machines, so the result may include objects to
+        which the ConfigContext does not apply, but never omits any to which it does.
+        """
+        # `site` and `device_role` for Device; `cluster__site` and `role` for VirtualMachine
+        if self.model._meta.model_name == "device":
+            site_field, role_field = "site", "device_role"
+        else:
+            site_field, role_field = "cluster__site", "role"
+        fields = {
+            "sites": site_field,
+            "roles": role_field,
+            "platforms": "platform",
+            "cluster_groups": "cluster__group",
+            "clusters": "cluster",
+            "tenant_groups": "tenant__group",
+            "tenants": "tenant",
+        }
+        if self.model._meta.model_name == "device":
+            fields["device_types"] = "device_type"
+
+        queryset = self.all()
+        # An empty assignment matches any object
+        for assignment, field in fields.items():
+            pks = list(getattr(config_context, assignment).values_list("pk", flat=True))
+            if pks:
+                queryset = queryset.filter(**{f"{field}__in": pks})
+
+        # Match against the assigned regions as well as any of their child regions
+        region_query = Q()
+        for tree_id, lft, rght in config_context.regions.values_list("tree_id", "lft", "rght"):
+            region_query |= Q(
+                **{
+                    f"{site_field}__region__tree_id": tree_id,
+                    f"{site_field}__region__lft__gte": lft,
+                    f"{site_field}__region__rght__lte": rght,
+                }
+            )
+        if region_query:
+            queryset = queryset.filter(region_query)
+
+        tag_pks = list(config_context.tags.values_list("pk", flat=True))
+        if tag_pks:
+            queryset = queryset.filter(
+                pk__in=TaggedItem.objects.filter(
+                    content_type=ContentType.objects.get_for_model(self.model), tag_id__in=tag_pks
+                ).values("object_id")
+            )
+
+        return queryset
+
     def _get_config_context_filters(self):
         # Construct the set of Q objects for the specific object types
         tag_query_filters = {
@@ -130,6 +312,117 @@ class ConfigContextModelQuerySet(RestrictedQuerySet):
         return base_query
 
 
+class RenderedConfigContextQuerySet(RestrictedQuerySet):
+    """
+    QuerySet of the materialized config contexts of devices and virtual machines.
+    """
+
+    # Number of objects rendered at a time
+    render_chunk_size = 500
+
+    def get_for_objects(self, objects):
+        """
+        Return a dictionary mapping the PK of each of the given objects (all of the same model) to its rendered config
+        context, for those whose materialized config context is up to date.
+        """
+        objects = list(objects)
+        if not objects:
+            return {}
+        return dict(
+            self.filter(
+                content_type=ContentType.objects.get_for_model(objects[0]._meta.model),
+                object_id__in=[obj.pk for obj in objects],
+                stale=False,
+            ).values_list("object_id", "data")
+        )
+
+    def invalidate(self, model=None, object_ids=None):
+        """
+        Mark the materialized config contexts of the given objects (all objects of `model`, or all objects if no model
+        is given) as stale, so that they are no longer read until they are rendered again.
+
+        If `object_ids` are given, a stale row is created for objects which have none, so that a rendering in progress
+        for these objects can not store data computed before this change.
+        """
+        queryset = self.all()
+        if model is not None:
+            content_type = ContentType.objects.get_for_model(model)
+            queryset = queryset.filter(content_type=content_type)
+            if object_ids is not None:
+                object_ids = list(object_ids)
+                self.bulk_create(
+                    [self.model(content_type=content_type, object_id=pk, stale=True) for pk in object_ids],
+                    ignore_conflicts=True,
+                )
+                queryset = queryset.filter(object_id__in=object_ids)
+        return queryset.update(stale=True, version=F("version") + 1)
+
+    def render(self, model, object_ids=None):
+        """
+        Render and store the config contexts of the given objects of `model` (all of them by default), returning the
+        number of config contexts stored.
+
+        Rows which are marked as stale again while rendering are left stale, to be rendered by the next run.
+        """
+        content_type = ContentType.objects.get_for_model(model)
+        queryset = model.objects.all()
+        if object_ids is not None:
+            queryset = queryset.filter(pk__in=object_ids)
+
+        count = 0
+        pks = queryset.order_by().values_list("pk", flat=True).iterator()
+        while True:
+            chunk = list(islice(pks, self.render_chunk_size))
+            if not chunk:
+                return count
+
+            # Ensure each object has a row, so that any change made while rendering marks it as stale
+            self.bulk_create(
+                [self.model(content_type=content_type, object_id=pk, stale=True) for pk in chunk],
+                ignore_conflicts=True,
+            )
+            versions = dict(
+                self.filter(content_type=content_type, object_id__in=chunk).values_list("object_id", "version")
+            )
+            for obj in model.prefetch_config_context(model.objects.filter(pk__in=chunk), materialized=False):
+                count += self.filter(content_type=content_type, object_id=obj.pk, version=versions[obj.pk]).update(
+                    data=obj.get_config_context(), stale=False, last_updated=timezone.now()
+                )
+
+    def render_stale(self):
+        """
+        Render the stale config contexts of all devices and virtual machines, returning the number stored.
+        """
+        count = 0
+        for content_type_id in self.filter(stale=True).values_list("content_type", flat=True).distinct():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            object_ids = self.filter(content_type_id=content_type_id, stale=True).values_list("object_id", flat=True)
+            count += self.render(model, object_ids=list(object_ids))
+        return count
+
+    def check_consistency(self, model):
+        """
+        Return the list of PKs of the objects of `model` whose materialized config context is missing or differs from
+        their current config context. Stale config contexts, which are not read, are not reported.
+        """
+        inconsistent = []
+        pks = model.objects.order_by().values_list("pk", flat=True).iterator()
+        while True:
+            chunk = list(islice(pks, self.render_chunk_size))
+            if not chunk:
+                return inconsistent
+            rows = dict(
+                self.filter(content_type=ContentType.objects.get_for_model(model), object_id__in=chunk).values_list(
+                    "object_id", "stale"
+                )
+            )
+            objects = list(model.objects.filter(pk__in=chunk))
+            stored = self.get_for_objects(objects)
+            for obj in model.prefetch_config_context(objects, materialized=False):
+                if obj.pk not in rows or (not rows[obj.pk] and stored.get(obj.pk) != obj.get_config_context()):
+                    inconsistent.append(obj.pk)
+
+
 class ScheduledJobExtendedQuerySet(RestrictedQuerySet, ExtendedQuerySet):
     """
     Base queryset used for the ScheduledJob class
@@ -1,3 +1,4 @@
+import collections
 import os
 import random
 import shutil
@@ -6,19 +7,37 @@ import logging
 from datetime import timedelta
 
 from cacheops.signals import cache_invalidated, cache_read
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.signals import request_started
 from django.db import transaction
-from django.db.models.signals import m2m_changed, pre_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from django_prometheus.models import model_deletes, model_inserts, model_updates
 from prometheus_client import Counter
 
-from nautobot.extras.tasks import delete_custom_field_data, provision_field
+from nautobot.extras.tasks import delete_custom_field_data, provision_field, render_config_contexts
 from nautobot.utilities.config import get_settings_or_config
 from .choices import JobResultStatusChoices, ObjectChangeActionChoices
-from .models import CustomField, GitRepository, JobResult, ObjectChange
-from .webhooks import enqueue_webhooks
+from .metadata import metadata_cache
+from .models import (
+    ComputedField,
+    ConfigContext,
+    CustomField,
+    CustomLink,
+    GitRepository,
+    GraphQLQuery,
+    JobResult,
+    ObjectChange,
+    Relationship,
+    RenderedConfigContext,
+    Status,
+    TaggedItem,
+    Webhook,
+)
+from .registry import registry
+from .webhooks import enqueue_bulk_webhooks, enqueue_webhook_groups, enqueue_webhooks, get_webhook_deliveries
 
 logger = logging.getLogger("nautobot.extras.signals")
 
@@ -41,40 +60,243 @@ def _get_user_if_authenticated(request, objectchange):
         logger.warning(f"Unable to retrieve the user while creating the changelog for {objectchange.changed_object}")
 
 
-def _handle_changed_object(request, sender, instance, **kwargs):
+def _prepare_objectchange(request, objectchange):
     """
-    Fires when an object is created or updated.
+    Associate an ObjectChange with the user and ID of the request, and populate the static fields which
+    `ObjectChange.save()` would otherwise fill in, so that it can also be inserted with `bulk_create()`.
     """
-    m2m_changed = False
+    objectchange.user = _get_user_if_authenticated(request, objectchange)
+    objectchange.user_name = objectchange.user.username if objectchange.user else "Undefined"
+    objectchange.request_id = request.id
+    return objectchange
 
-    # Determine the type of change being made
+
+def _get_change_action(**kwargs):
+    """
+    Return the ObjectChange action represented by a `post_save` or `m2m_changed` signal, and whether it is a
+    many-to-many change, or `(None, False)` if the signal does not represent a change.
+    """
     if kwargs.get("created"):
-        action = ObjectChangeActionChoices.ACTION_CREATE
+        return ObjectChangeActionChoices.ACTION_CREATE, False
     elif "created" in kwargs:
-        action = ObjectChangeActionChoices.ACTION_UPDATE
+        return ObjectChangeActionChoices.ACTION_UPDATE, False
     elif kwargs.get("action") in ["post_add", "post_remove"] and kwargs["pk_set"]:
         # m2m_changed with objects added or removed
-        m2m_changed = True
-        action = ObjectChangeActionChoices.ACTION_UPDATE
-    else:
-        return
+        return ObjectChangeActionChoices.ACTION_UPDATE, True
+    return None, False
+
+
+def _purge_expired_changes():
+    """
+    Housekeeping: 0.1% chance of clearing out expired ObjectChanges
+    """
+    changelog_retention = get_settings_or_config("CHANGELOG_RETENTION")
+    if changelog_retention and random.randint(1, 1000) == 1:
+        cutoff = timezone.now() - timedelta(days=changelog_retention)
+        ObjectChange.objects.filter(time__lt=cutoff).delete()
 
-    # Record an ObjectChange if applicable
-    if hasattr(instance, "to_objectchange"):
-        if m2m_changed:
-            ObjectChange.objects.filter(
-                changed_object_type=ContentType.objects.get_for_model(instance),
-                changed_object_id=instance.pk,
-                request_id=request.id,
-            ).update(object_data=instance.to_objectchange(action).object_data)
+
+class ChangeLogBuffer:
+    """
+    Buffer of the ObjectChanges (and webhooks) for a single request, used by the `change_logging` context manager
+    unless `settings.CHANGELOG_DEFERRED` is disabled.
+
+    Multiple saves and many-to-many changes of the same object are coalesced into a single record, which is only
+    serialized when the buffer is flushed so that it reflects the final state of the object. Deletions (and their
+    webhook payloads) are serialized right away, while the object still exists. All buffered ObjectChanges are written
+    with a single `bulk_create()`, and all webhooks are enqueued as a single task.
+
+    The outcome of each change is followed through an on_commit callback, so that changes made within a transaction (or
+    savepoint) that was since rolled back are discarded when flushing.
+    """
+
+    # Flush automatically once this many records are pending, to bound memory use by long-running jobs
+    max_size = 1000
+
+    def __init__(self, request):
+        self.request = request
+        # Records in the order of their first change, as [instance, action, objectchange, outcomes, deliveries],
+        # where outcomes are the outcomes of the record's changes as tracked by `_track_outcome()`, and deliveries are
+        # the webhook deliveries already serialized (if any)
+        self.records = []
+        # Records for objects created or updated, but not yet serialized, keyed by (model, pk)
+        self.pending = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def _is_recorded(instance):
+        """
+        Whether changes to `instance` result in an ObjectChange or a webhook.
+        """
+        app_label = instance._meta.app_label
+        model_name = instance._meta.model_name
+        return hasattr(instance, "to_objectchange") or model_name in registry["model_features"]["webhooks"].get(
+            app_label, []
+        )
+
+    def add_change(self, instance, action):
+        """
+        Record the creation or update of `instance`, coalescing it with any pending record of the same object.
+        """
+        if not self._is_recorded(instance):
+            return
+
+        key = (instance._meta.model, instance.pk)
+        record = self.pending.get(key)
+        if record is None:
+            record = [instance, action, None, [], None]
+            self.pending[key] = record
+            self.records.append(record)
         else:
-            objectchange = instance.to_objectchange(action)
-            objectchange.user = _get_user_if_authenticated(request, objectchange)
-            objectchange.request_id = request.id
-            objectchange.save()
+            # Serialize the latest instance when flushing; a creation followed by updates remains a creation
+            record[0] = instance
+        self._track_outcome(record)
+
+        if len(self.records) >= self.max_size:
+            self.flush()
+
+    def add_deletion(self, instance):
+        """
+        Record the deletion of `instance`, serializing it (and any pending record of the same object) immediately.
+        """
+        if not self._is_recorded(instance):
+            return
+
+        user, request_id = self.request.user, self.request.id
+        record = self.pending.pop((instance._meta.model, instance.pk), None)
+        if record is not None:
+            if hasattr(instance, "to_objectchange"):
+                record[2] = _prepare_objectchange(self.request, record[0].to_objectchange(record[1]))
+            record[4] = get_webhook_deliveries([record[0]], user, request_id, record[1])
+
+        action = ObjectChangeActionChoices.ACTION_DELETE
+        objectchange = None
+        if hasattr(instance, "to_objectchange"):
+            objectchange = _prepare_objectchange(self.request, instance.to_objectchange(action))
+        deliveries = get_webhook_deliveries([instance], user, request_id, action)
+        record = [instance, action, objectchange, [], deliveries]
+        self.records.append(record)
+        self._track_outcome(record)
+
+        if len(self.records) >= self.max_size:
+            self.flush()
+
+    @staticmethod
+    def _track_outcome(record):
+        """
+        Follow the outcome of the transaction in which a change to the object of `record` was just made, through an
+        on_commit callback which marks it as committed. Outside of a transaction, the callback is run right away.
+        """
+        instance = record[0]
+        connection = transaction.get_connection(instance._state.db)
+        hooks = connection.run_on_commit
+
+        if record[3] and connection.in_atomic_block:
+            # The last change already tracked in the same transaction and savepoint shares the fate of this one
+            last_connection, last_callback, index, committed = record[3][-1]
+            if (
+                last_connection is connection
+                and not committed
+                and index < len(hooks)
+                and hooks[index][1] is last_callback
+                and hooks[index][0] == set(connection.savepoint_ids)
+            ):
+                return
+
+        outcome = [connection, None, len(hooks), False]
+
+        def on_commit():
+            outcome[3] = True
+
+        outcome[1] = on_commit
+        record[3].append(outcome)
+        transaction.on_commit(on_commit, using=instance._state.db)
+
+    def _get_committed_records(self):
+        """
+        Return the buffered records with at least one change which was not rolled back, i.e. which was either committed
+        or is still awaiting the commit of an open transaction (and savepoint).
+        """
+        registered = {}
+
+        def is_rolled_back(outcome):
+            connection, callback, _, committed = outcome
+            if committed:
+                return False
+            if connection not in registered:
+                in_transaction = connection.in_atomic_block
+                registered[connection] = {id(hook[1]) for hook in connection.run_on_commit} if in_transaction else set()
+            # A rolled back transaction or savepoint discards its on_commit callbacks
+            return id(callback) not in registered[connection]
+
+        return [record for record in self.records if not all(is_rolled_back(outcome) for outcome in record[3])]
+
+    def flush(self):
+        """
+        Write all buffered ObjectChanges with a single `bulk_create()`, enqueue webhooks for all of the buffered changes
+        as a single task, and empty the buffer.
+        """
+        if not self.records:
+            return
+
+        records = self._get_committed_records()
+        self.records = []
+        self.pending = {}
+
+        objectchanges = []
+        webhook_instances = collections.defaultdict(list)
+        webhook_deliveries = []
+        for instance, action, objectchange, _, deliveries in records:
+            if objectchange is None and hasattr(instance, "to_objectchange"):
+                objectchange = _prepare_objectchange(self.request, instance.to_objectchange(action))
+            if objectchange is not None:
+                objectchanges.append(objectchange)
+            # Webhook payloads of deleted objects were serialized while the object still existed
+            if deliveries is not None:
+                webhook_deliveries.extend(deliveries)
+            else:
+                webhook_instances[(instance._meta.model, action)].append(instance)
+
+        ObjectChange.objects.bulk_create(objectchanges)
+
+        groups = [(instances, action) for (_, action), instances in webhook_instances.items()]
+        enqueue_webhook_groups(groups, self.request.user, self.request.id, deliveries=webhook_deliveries)
+
+        _purge_expired_changes()
+
+
+def _handle_changed_object(request, sender, instance, change_log_buffer=None, **kwargs):
+    """
+    Fires when an object is created or updated.
+    """
+    # Determine the type of change being made
+    action, m2m_changed = _get_change_action(**kwargs)
+    if action is None:
+        return
 
-    # Enqueue webhooks
-    enqueue_webhooks(instance, request.user, request.id, action)
+    if change_log_buffer is not None:
+        # Defer recording the ObjectChange and enqueueing webhooks until the buffer is flushed
+        change_log_buffer.add_change(instance, action)
+
+    else:
+        # Record an ObjectChange if applicable
+        if hasattr(instance, "to_objectchange"):
+            if m2m_changed:
+                ObjectChange.objects.filter(
+                    changed_object_type=ContentType.objects.get_for_model(instance),
+                    changed_object_id=instance.pk,
+                    request_id=request.id,
+                ).update(object_data=instance.to_objectchange(action).object_data)
+            else:
+                objectchange = instance.to_objectchange(action)
+                objectchange.user = _get_user_if_authenticated(request, objectchange)
+                objectchange.request_id = request.id
+                objectchange.save()
+
+        # Enqueue webhooks
+        enqueue_webhooks(instance, request.user, request.id, action)
 
     # Increment metric counters
     if action == ObjectChangeActionChoices.ACTION_CREATE:
@@ -82,31 +304,252 @@ def _handle_changed_object(request, sender, instance, **kwargs):
     elif action == ObjectChangeActionChoices.ACTION_UPDATE:
         model_updates.labels(instance._meta.model_name).inc()
 
-    # Housekeeping: 0.1% chance of clearing out expired ObjectChanges
-    changelog_retention = get_settings_or_config("CHANGELOG_RETENTION")
-    if changelog_retention and random.randint(1, 1000) == 1:
-        cutoff = timezone.now() - timedelta(days=changelog_retention)
-        ObjectChange.objects.filter(time__lt=cutoff).delete()
+    if change_log_buffer is None:
+        _purge_expired_changes()
 
 
-def _handle_deleted_object(request, sender, instance, **kwargs):
+def handle_bulk_created_objects(request, instances):
     """
-    Fires when an object is deleted.
+    Record ObjectChanges, enqueue webhooks, and increment metric counters for a list of objects of the same model that
+    were created with `bulk_create()`, which does not send the signals handled by `_handle_changed_object()`.
+
+    The ObjectChanges are likewise inserted with a single `bulk_create()`.
     """
-    # Record an ObjectChange if applicable
-    if hasattr(instance, "to_objectchange"):
-        objectchange = instance.to_objectchange(ObjectChangeActionChoices.ACTION_DELETE)
-        objectchange.user = _get_user_if_authenticated(request, objectchange)
-        objectchange.request_id = request.id
-        objectchange.save()
+    if not instances:
+        return
+
+    action = ObjectChangeActionChoices.ACTION_CREATE
+    model = instances[0].__class__
+
+    # Record an ObjectChange for each object if applicable
+    if hasattr(model, "to_objectchange"):
+        ObjectChange.objects.bulk_create(
+            [_prepare_objectchange(request, instance.to_objectchange(action)) for instance in instances]
+        )
 
     # Enqueue webhooks
-    enqueue_webhooks(instance, request.user, request.id, ObjectChangeActionChoices.ACTION_DELETE)
+    enqueue_bulk_webhooks(instances, request.user, request.id, action)
+
+    # Increment metric counters
+    model_inserts.labels(model._meta.model_name).inc(len(instances))
+
+
+def _handle_deleted_object(request, sender, instance, change_log_buffer=None, **kwargs):
+    """
+    Fires when an object is deleted.
+    """
+    if change_log_buffer is not None:
+        # The ObjectChange and webhook payloads are serialized now, but only written and enqueued when the buffer is
+        # flushed
+        change_log_buffer.add_deletion(instance)
+
+    else:
+        # Record an ObjectChange if applicable
+        if hasattr(instance, "to_objectchange"):
+            objectchange = instance.to_objectchange(ObjectChangeActionChoices.ACTION_DELETE)
+            objectchange.user = _get_user_if_authenticated(request, objectchange)
+            objectchange.request_id = request.id
+            objectchange.save()
+
+        # Enqueue webhooks
+        enqueue_webhooks(instance, request.user, request.id, ObjectChangeActionChoices.ACTION_DELETE)
 
     # Increment metric counters
     model_deletes.labels(instance._meta.model_name).inc()
 
 
+def invalidate_metadata_cache(**kwargs):
+    """
+    Discard the cached CustomField, ComputedField, Relationship, CustomLink, Status, Webhook and GraphQLQuery definitions
+    of every process when one of them is changed.
+    """
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+
+    metadata_cache.changed()
+
+
+for model in (ComputedField, CustomField, CustomLink, GraphQLQuery, Relationship, Status, Webhook):
+    post_save.connect(invalidate_metadata_cache, sender=model)
+    post_delete.connect(invalidate_metadata_cache, sender=model)
+for model in (CustomField, Status, Webhook):
+    m2m_changed.connect(invalidate_metadata_cache, sender=model.content_types.through)
+
+# Check whether other processes have changed any definitions once at the start of each request
+request_started.connect(metadata_cache.expire)
+
+
+#
+# Materialized config contexts
+#
+
+
+def _enqueue_render_config_contexts():
+    """Render the stale config contexts in the background once the current transaction is committed."""
+    connection = transaction.get_connection()
+    # Only enqueue a single task per transaction
+    if any(entry[1] == _render_config_contexts for entry in connection.run_on_commit):
+        return
+    transaction.on_commit(_render_config_contexts)
+
+
+def _render_config_contexts():
+    render_config_contexts.delay()
+
+
+def invalidate_rendered_config_contexts(model=None, object_ids=None):
+    """Mark the given materialized config contexts as stale, and render them again in the background."""
+    if not settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED:
+        return
+    RenderedConfigContext.objects.invalidate(model=model, object_ids=object_ids)
+    _enqueue_render_config_contexts()
+
+
+def handle_config_context_change(**kwargs):
+    """
+    Invalidate all materialized config contexts when any object which can be removed from devices and virtual machines
+    without signals (through `on_delete=SET_NULL`) is deleted.
+    """
+    invalidate_rendered_config_contexts()
+
+
+def invalidate_config_context_objects(config_context):
+    """Invalidate the materialized config contexts of the objects to which a ConfigContext is assigned."""
+    if not settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED:
+        return
+    from nautobot.dcim.models import Device  # avoiding circular import
+    from nautobot.virtualization.models import VirtualMachine  # avoiding circular import
+
+    for model in (Device, VirtualMachine):
+        invalidate_rendered_config_contexts(
+            model, model.objects.get_for_config_context(config_context).values_list("pk", flat=True)
+        )
+
+
+def _invalidate_created_config_context_objects(pk):
+    config_context = ConfigContext.objects.filter(pk=pk).first()
+    if config_context is not None:
+        invalidate_config_context_objects(config_context)
+
+
+def handle_config_context_save(sender, instance, created, **kwargs):
+    """
+    Invalidate the materialized config contexts of the objects to which a saved ConfigContext is assigned.
+
+    The assignments of a new ConfigContext are only set after it is created, so its objects are determined once the
+    transaction is committed.
+    """
+    if not settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED:
+        return
+    if created:
+        instance._created_in_transaction = True
+        transaction.on_commit(lambda: _invalidate_created_config_context_objects(instance.pk))
+        return
+    invalidate_config_context_objects(instance)
+
+
+def handle_config_context_delete(sender, instance, **kwargs):
+    """Invalidate the materialized config contexts of the objects to which a ConfigContext was assigned."""
+    invalidate_config_context_objects(instance)
+
+
+def handle_config_context_assignment_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidate the materialized config contexts of the objects to which a ConfigContext applies, both before and after
+    its assignments change.
+    """
+    if not settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED:
+        return
+    if not reverse:
+        # The objects a new ConfigContext applied to before its assignments were set were never visible to rendering
+        if not (action.startswith("pre_") and getattr(instance, "_created_in_transaction", False)):
+            invalidate_config_context_objects(instance)
+    elif pk_set is None:
+        invalidate_rendered_config_contexts()
+    else:
+        for config_context in ConfigContext.objects.filter(pk__in=pk_set):
+            invalidate_config_context_objects(config_context)
+
+
+def handle_config_context_object_change(sender, instance, **kwargs):
+    """Invalidate the materialized config context of a device or virtual machine when it or its tags change."""
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+    if sender is TaggedItem:
+        if not hasattr(instance, "get_config_context") or kwargs.get("reverse"):
+            return
+        sender = instance._meta.model
+    invalidate_rendered_config_contexts(sender, [instance.pk])
+
+
+def handle_config_context_object_delete(sender, instance, **kwargs):
+    """Delete the materialized config context of a deleted device or virtual machine."""
+    if not settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED:
+        return
+    RenderedConfigContext.objects.filter(
+        content_type=ContentType.objects.get_for_model(sender), object_id=instance.pk
+    ).delete()
+
+
+def handle_config_context_related_change(sender, instance, **kwargs):
+    """
+    Invalidate the materialized config contexts of the devices and virtual machines assigned to a site, cluster or
+    tenant when it is saved, or of all devices and virtual machines when a region is saved, as any of these may change
+    which ConfigContexts apply to them.
+    """
+    if not settings.MATERIALIZED_CONFIG_CONTEXTS_ENABLED:
+        return
+    from nautobot.dcim.models import Device  # avoiding circular import
+    from nautobot.virtualization.models import VirtualMachine  # avoiding circular import
+
+    model_name = sender._meta.model_name
+    if model_name == "region":
+        invalidate_rendered_config_contexts()
+        return
+    vm_filter = {"cluster__site": instance} if model_name == "site" else {model_name: instance}
+    invalidate_rendered_config_contexts(
+        Device, Device.objects.filter(**{model_name: instance}).values_list("pk", flat=True)
+    )
+    invalidate_rendered_config_contexts(
+        VirtualMachine, VirtualMachine.objects.filter(**vm_filter).values_list("pk", flat=True)
+    )
+
+
+post_save.connect(handle_config_context_save, sender=ConfigContext)
+pre_delete.connect(handle_config_context_delete, sender=ConfigContext)
+for field_name in (
+    "regions",
+    "sites",
+    "roles",
+    "device_types",
+    "platforms",
+    "cluster_groups",
+    "clusters",
+    "tenant_groups",
+    "tenants",
+    "tags",
+):
+    m2m_changed.connect(handle_config_context_assignment_change, sender=getattr(ConfigContext, field_name).through)
+for model in ("dcim.Device", "virtualization.VirtualMachine"):
+    post_save.connect(handle_config_context_object_change, sender=model)
+    post_delete.connect(handle_config_context_object_delete, sender=model)
+m2m_changed.connect(handle_config_context_object_change, sender=TaggedItem)
+for model in ("dcim.Region", "dcim.Site", "tenancy.Tenant", "virtualization.Cluster"):
+    post_save.connect(handle_config_context_related_change, sender=model)
+for model in (
+    "dcim.DeviceRole",
+    "dcim.Platform",
+    "dcim.Region",
+    "dcim.Site",
+    "extras.Tag",
+    "tenancy.Tenant",
+    "tenancy.TenantGroup",
+    "virtualization.Cluster",
+    "virtualization.ClusterGroup",
+):
+    post_delete.connect(handle_config_context_change, sender=model)
+
+
 #
 # Custom fields
 #
@@ -1,10 +1,16 @@
+import collections
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
+from urllib.parse import urlsplit
 
 import requests
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from jinja2.exceptions import TemplateError
+from prometheus_client import Counter
+from requests.adapters import HTTPAdapter
 
 from nautobot.core.celery import nautobot_task
 from nautobot.extras.choices import CustomFieldTypeChoices, ObjectChangeActionChoices
@@ -97,15 +103,55 @@ def provision_field(field_id, content_type_pk_set):
                 obj.save()
 
 
-@nautobot_task
-def process_webhook(webhook_pk, data, model_name, event, timestamp, username, request_id):
+#
+# Webhooks
+#
+
+webhook_delivered = Counter("webhook_delivered", "Number of webhook requests delivered", ["endpoint"])
+webhook_failed = Counter("webhook_failed", "Number of webhook requests which failed", ["endpoint"])
+webhook_retried = Counter("webhook_retried", "Number of webhook requests scheduled for retry", ["endpoint"])
+
+# Pooled HTTP sessions and concurrency limits of each webhook endpoint, shared by all tasks run in this worker process
+_endpoint_lock = threading.Lock()
+# {(endpoint, verify): session}
+_endpoint_sessions = {}
+# {endpoint: semaphore}
+_endpoint_semaphores = {}
+
+
+def _get_endpoint(url):
+    """Return the endpoint (scheme and network location) of a URL, e.g. "https://example.com:8443"."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _get_endpoint_session(endpoint, verify):
     """
-    Make a POST request to the defined Webhook
+    Return the `(session, semaphore)` used to send requests to this endpoint with the given TLS verification setting
+    (as passed to `requests`), creating them if needed.
+
+    Each endpoint gets a `requests.Session` per verification setting, which keeps up to
+    `WEBHOOK_MAX_CONNECTIONS_PER_ENDPOINT` connections alive between requests (and tasks), and a semaphore limiting the
+    number of requests sent to it concurrently. Sessions are never shared between verification settings, as a pooled
+    connection may be reused without regard to the `verify` argument of later requests.
     """
-    from nautobot.extras.models import Webhook  # avoiding circular import
+    with _endpoint_lock:
+        key = (endpoint, verify)
+        if key not in _endpoint_sessions:
+            max_connections = settings.WEBHOOK_MAX_CONNECTIONS_PER_ENDPOINT
+            session = requests.Session()
+            session.verify = verify
+            session.mount(endpoint, HTTPAdapter(pool_connections=1, pool_maxsize=max_connections))
+            _endpoint_sessions[key] = session
+        if endpoint not in _endpoint_semaphores:
+            _endpoint_semaphores[endpoint] = threading.BoundedSemaphore(settings.WEBHOOK_MAX_CONNECTIONS_PER_ENDPOINT)
+        return _endpoint_sessions[key], _endpoint_semaphores[endpoint]
 
-    webhook = Webhook.objects.get(pk=webhook_pk)
 
+def _prepare_webhook_request(webhook, data, model_name, event, timestamp, username, request_id):
+    """
+    Render the headers and body of the given Webhook for an object and return the prepared HTTP request.
+    """
     context = {
         "event": dict(ObjectChangeActionChoices)[event].lower(),
         "timestamp": timestamp,
@@ -151,20 +197,118 @@ def process_webhook(webhook_pk, data, model_name, event, timestamp, username, re
     if webhook.secret != "":
         prepared_request.headers["X-Hook-Signature"] = generate_signature(prepared_request.body, webhook.secret)
 
-    # Send the request
-    with requests.Session() as session:
-        session.verify = webhook.ssl_verification
-        if webhook.ca_file_path:
-            session.verify = webhook.ca_file_path
-        response = session.send(prepared_request, proxies=settings.HTTP_PROXIES)
+    return prepared_request
+
+
+def _send_webhook(webhook, *args):
+    """
+    Send the request of a Webhook for an object through the pooled session of its endpoint.
+
+    `args` are the arguments of `_prepare_webhook_request()` following the webhook. Raises a `RequestException` if the
+    request could not be sent or was not successful.
+    """
+    prepared_request = _prepare_webhook_request(webhook, *args)
+    endpoint = _get_endpoint(webhook.payload_url)
+    verify = webhook.ca_file_path or webhook.ssl_verification
+    session, semaphore = _get_endpoint_session(endpoint, verify)
+
+    with semaphore:
+        try:
+            response = session.send(prepared_request, proxies=settings.HTTP_PROXIES, verify=verify)
+        except requests.exceptions.RequestException:
+            webhook_failed.labels(endpoint).inc()
+            raise
 
     if response.ok:
         logger.info("Request succeeded; response status %s", response.status_code)
+        webhook_delivered.labels(endpoint).inc()
         return "Status {} returned, webhook successfully processed.".format(response.status_code)
     else:
         logger.warning("Request failed; response status %s: %s", response.status_code, response.content)
+        webhook_failed.labels(endpoint).inc()
         raise requests.exceptions.RequestException(
             "Status {} returned with content '{}', webhook FAILED to process.".format(
                 response.status_code, response.content
             )
         )
+
+
+@nautobot_task
+def render_config_contexts():
+    """
+    Render the materialized config contexts which have been marked as stale.
+    """
+    from nautobot.extras.models import RenderedConfigContext  # avoiding circular import
+
+    count = RenderedConfigContext.objects.render_stale()
+    logger.debug("Rendered %d config contexts", count)
+    return count
+
+
+@nautobot_task
+def process_webhook(webhook_pk, data, model_name, event, timestamp, username, request_id):
+    """
+    Make a POST request to the defined Webhook
+    """
+    from nautobot.extras.models import Webhook  # avoiding circular import
+
+    webhook = Webhook.objects.get(pk=webhook_pk)
+
+    return _send_webhook(webhook, data, model_name, event, timestamp, username, request_id)
+
+
+@nautobot_task
+def process_webhooks(deliveries, attempt=0):
+    """
+    Send a batch of webhook requests, each delivery being a list of the arguments of `process_webhook()`.
+
+    Requests to different endpoints are sent concurrently (within the limit of `WEBHOOK_MAX_CONNECTIONS_PER_ENDPOINT`
+    concurrent requests per endpoint), while requests to the same endpoint are sent in order. Deliveries which fail
+    are retried by a new task with exponential backoff, up to `WEBHOOK_RETRY_LIMIT` times.
+    """
+    from nautobot.extras.models import Webhook  # avoiding circular import
+
+    # Webhook PKs arrive as strings once the task arguments have been serialized
+    webhooks = {
+        str(pk): webhook for pk, webhook in Webhook.objects.in_bulk({delivery[0] for delivery in deliveries}).items()
+    }
+
+    endpoints = collections.defaultdict(list)
+    for delivery in deliveries:
+        webhook = webhooks.get(str(delivery[0]))
+        if webhook is None:
+            logger.warning("Webhook %s no longer exists, skipping delivery", delivery[0])
+            continue
+        endpoints[_get_endpoint(webhook.payload_url)].append((webhook, delivery))
+
+    def send(endpoint_deliveries):
+        failed = []
+        for webhook, delivery in endpoint_deliveries:
+            try:
+                _send_webhook(webhook, *delivery[1:])
+            except (TemplateError, ValueError):
+                # Rendering errors are already logged, and retrying will not fix them
+                webhook_failed.labels(_get_endpoint(webhook.payload_url)).inc()
+            except requests.exceptions.RequestException as e:
+                logger.error("Error sending webhook %s: %s", webhook, e)
+                failed.append(delivery)
+        return failed
+
+    failed = []
+    if endpoints:
+        max_workers = min(len(endpoints), settings.WEBHOOK_MAX_CONCURRENT_ENDPOINTS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for endpoint_failed in executor.map(send, endpoints.values()):
+                failed.extend(endpoint_failed)
+
+    if failed:
+        if attempt < settings.WEBHOOK_RETRY_LIMIT:
+            countdown = settings.WEBHOOK_RETRY_BACKOFF * 2 ** attempt
+            logger.info("Retrying %d failed webhook requests in %s seconds", len(failed), countdown)
+            for delivery in failed:
+                webhook_retried.labels(_get_endpoint(webhooks[str(delivery[0])].payload_url)).inc()
+            process_webhooks.apply_async(args=[failed], kwargs={"attempt": attempt + 1}, countdown=countdown)
+        else:
+            logger.error("Giving up on %d failed webhook requests after %d attempts", len(failed), attempt + 1)
+
+    return "{} of {} webhook requests successfully processed.".format(len(deliveries) - len(failed), len(deliveries))
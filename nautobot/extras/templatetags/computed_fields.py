@@ -1,5 +1,4 @@
 from django import template
-from django.contrib.contenttypes.models import ContentType
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
 
@@ -14,8 +13,7 @@ def has_computed_fields(context, obj):
     """
     Return a boolean value indicating if an object's content type has associated computed fields.
     """
-    content_type = ContentType.objects.get_for_model(obj)
-    return ComputedField.objects.filter(content_type=content_type).exists()
+    return ComputedField.objects.get_for_model(obj).exists()
 
 
 @register.simple_tag(takes_context=True)
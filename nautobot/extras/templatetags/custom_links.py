@@ -1,7 +1,6 @@
 from collections import OrderedDict
 
 from django import template
-from django.contrib.contenttypes.models import ContentType
 from django.utils.safestring import mark_safe
 
 from nautobot.extras.models import CustomLink
@@ -27,8 +26,7 @@ def custom_links(context, obj):
     """
     Render all applicable links for the given object.
     """
-    content_type = ContentType.objects.get_for_model(obj)
-    custom_links = CustomLink.objects.filter(content_type=content_type)
+    custom_links = CustomLink.objects.get_for_model(obj)
     if not custom_links:
         return ""
 
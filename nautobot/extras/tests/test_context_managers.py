@@ -1,12 +1,13 @@
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.db import transaction
+from django.test import override_settings, TestCase
 
 from nautobot.core.celery import app
 from nautobot.dcim.models import Site
 from nautobot.extras.choices import ObjectChangeActionChoices
 from nautobot.extras.context_managers import web_request_context
-from nautobot.extras.models import ObjectChange, Webhook
+from nautobot.extras.models import ObjectChange, Tag, Webhook
 
 
 # Use the proper swappable User model
@@ -65,6 +66,73 @@ class WebRequestContextTestCase(TestCase):
         self.assertEqual(oc_list[0].changed_object, site)
         self.assertEqual(oc_list[0].action, ObjectChangeActionChoices.ACTION_CREATE)
 
+    def test_change_log_coalesced(self):
+
+        with web_request_context(self.user):
+            site = Site(name="Test Site 1")
+            site.save()
+            site.description = "Updated"
+            site.save()
+            Tag.objects.create(name="Tag 1", slug="tag-1")
+            site.tags.set("Tag 1")
+
+            # Nothing is written until the context exits
+            self.assertEqual(ObjectChange.objects.count(), 0)
+
+        oc_list = ObjectChange.objects.filter(
+            changed_object_type=ContentType.objects.get_for_model(Site),
+            changed_object_id=site.pk,
+        )
+        self.assertEqual(len(oc_list), 1)
+        self.assertEqual(oc_list[0].action, ObjectChangeActionChoices.ACTION_CREATE)
+        self.assertEqual(oc_list[0].user_name, self.user.username)
+        self.assertEqual(oc_list[0].object_data["description"], "Updated")
+        self.assertEqual(oc_list[0].object_data["tags"], ["Tag 1"])
+
+    def test_change_log_rolled_back(self):
+
+        site = Site.objects.create(name="Test Site 1")
+        with web_request_context(self.user):
+            Site.objects.create(name="Test Site 2")
+            try:
+                with transaction.atomic():
+                    Site.objects.create(name="Test Site 3")
+                    site.description = "Reverted"
+                    site.save()
+                    raise ValueError
+            except ValueError:
+                pass
+
+        self.assertEqual(
+            list(ObjectChange.objects.values_list("object_repr", "action")),
+            [("Test Site 2", ObjectChangeActionChoices.ACTION_CREATE)],
+        )
+
+    def test_change_log_deletion_rolled_back(self):
+
+        site = Site.objects.create(name="Test Site 1")
+        with web_request_context(self.user):
+            try:
+                with transaction.atomic():
+                    site.delete()
+                    raise ValueError
+            except ValueError:
+                pass
+            Site.objects.create(name="Test Site 2")
+
+        self.assertEqual(
+            list(ObjectChange.objects.values_list("object_repr", "action")),
+            [("Test Site 2", ObjectChangeActionChoices.ACTION_CREATE)],
+        )
+
+    @override_settings(CHANGELOG_DEFERRED=False)
+    def test_change_log_immediate(self):
+
+        with web_request_context(self.user):
+            site = Site(name="Test Site 1")
+            site.save()
+            self.assertEqual(ObjectChange.objects.get(changed_object_id=site.pk).object_data["name"], "Test Site 1")
+
     def test_change_webhook_enqueued(self):
         """Test that the webhook resides on the queue"""
         # TODO(john): come back to this with a way to actually do it without a running worker
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
@@ -11,7 +13,7 @@ from nautobot.dcim.models import Site, Rack, Device
 from nautobot.dcim.tables import SiteTable
 from nautobot.extras.choices import CustomFieldTypeChoices, CustomFieldFilterLogicChoices
 from nautobot.extras.models import ComputedField, CustomField, CustomFieldChoice, Status
-from nautobot.utilities.tables import CustomFieldColumn
+from nautobot.utilities.tables import ComputedFieldColumn, CustomFieldColumn
 from nautobot.utilities.testing import APITestCase, CeleryTestCase, TestCase
 from nautobot.virtualization.models import VirtualMachine
 
@@ -1423,3 +1425,42 @@ class CustomFieldTableTest(TestCase):
 
             rendered_value = bound_row.get_cell(internal_col_name)
             self.assertEqual(rendered_value, col_expected_value)
+
+
+class ComputedFieldTableTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.computed_field = ComputedField.objects.create(
+            content_type=ContentType.objects.get_for_model(Site),
+            slug="site_label",
+            label="Site Label",
+            template="{{ obj.slug }}-label",
+        )
+        active = Status.objects.get_for_model(Site).get(slug="active")
+        for i in range(3):
+            Site.objects.create(name=f"Site {i}", slug=f"site-{i}", status=active)
+
+    def test_computed_field_table_render(self):
+        site_table = SiteTable(Site.objects.order_by("name"))
+        self.assertIsInstance(site_table.base_columns.get("cpf_site_label"), ComputedFieldColumn)
+
+        with mock.patch.object(
+            ComputedField, "render_many", autospec=True, side_effect=ComputedField.render_many
+        ) as render_many:
+            rendered_values = [row.get_cell("cpf_site_label") for row in site_table.rows]
+        self.assertEqual(rendered_values, ["site-0-label", "site-1-label", "site-2-label"])
+        # The computed field is rendered for all rows at once
+        render_many.assert_called_once()
+
+    def test_computed_field_csv_export(self):
+        self.add_permissions("dcim.view_site")
+        with mock.patch.object(
+            ComputedField, "render_many", autospec=True, side_effect=ComputedField.render_many
+        ) as render_many:
+            response = self.client.get(f"{reverse('dcim:site_list')}?export")
+            lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].endswith(",site_label"))
+        self.assertEqual(
+            sorted(line.rsplit(",", 1)[1] for line in lines[1:]), ["site-0-label", "site-1-label", "site-2-label"]
+        )
+        render_many.assert_called_once()
@@ -0,0 +1,81 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from nautobot.dcim.models import Site
+from nautobot.extras.metadata import metadata_cache
+from nautobot.extras.models import ComputedField, CustomLink, Relationship
+from nautobot.utilities.testing import TransactionTestCase
+
+
+class MetadataCacheTest(TransactionTestCase):
+    """
+    Note: This is a TransactionTestCase, rather than a TestCase, because definitions changed by a transaction which is
+    not yet committed (such as the one wrapping each TestCase) are never cached.
+    """
+
+    def setUp(self):
+        self.site_ct = ContentType.objects.get_for_model(Site)
+        self.computed_field = ComputedField.objects.create(
+            content_type=self.site_ct, label="Computed Field 1", template="{{ obj.name }}"
+        )
+        self.custom_link = CustomLink.objects.create(
+            content_type=self.site_ct, name="Link 1", text="Link 1", target_url="http://example.com/", new_window=False
+        )
+
+    def tearDown(self):
+        # The database is flushed without sending any signals
+        metadata_cache.invalidate()
+        super().tearDown()
+
+    def test_get_for_model_cached(self):
+        site = Site(name="Site 1", slug="site-1")
+        for _ in range(2):
+            list(ComputedField.objects.get_for_model(Site))
+            list(CustomLink.objects.get_for_model(Site))
+            src_relationships, dst_relationships = Relationship.objects.get_for_model(Site)
+            list(src_relationships), list(dst_relationships)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list(ComputedField.objects.get_for_model(Site)), [self.computed_field])
+            self.assertTrue(ComputedField.objects.get_for_model(Site).exists())
+            self.assertEqual(site.get_computed_field("computed-field-1"), "Site 1")
+            self.assertEqual(list(CustomLink.objects.get_for_model(site)), [self.custom_link])
+            self.assertEqual(CustomLink.objects.get_for_model(Site).count(), 1)
+            src_relationships, dst_relationships = Relationship.objects.get_for_model(Site)
+            self.assertEqual(list(src_relationships) + list(dst_relationships), [])
+
+        # Chaining still queries the database
+        self.assertFalse(CustomLink.objects.get_for_model(Site).filter(name="Link 2").exists())
+
+    def test_invalidated_on_change(self):
+        list(CustomLink.objects.get_for_model(Site))
+
+        custom_link = CustomLink.objects.create(
+            content_type=self.site_ct, name="Link 2", text="Link 2", target_url="http://example.com/", new_window=False
+        )
+        self.assertEqual(list(CustomLink.objects.get_for_model(Site)), [self.custom_link, custom_link])
+
+        custom_link.delete()
+        self.assertEqual(list(CustomLink.objects.get_for_model(Site)), [self.custom_link])
+
+    def test_uncommitted_changes_not_cached(self):
+        list(CustomLink.objects.get_for_model(Site))
+
+        try:
+            with transaction.atomic():
+                CustomLink.objects.create(
+                    content_type=self.site_ct,
+                    name="Link 2",
+                    text="Link 2",
+                    target_url="http://example.com/",
+                    new_window=False,
+                )
+                self.assertEqual(CustomLink.objects.get_for_model(Site).count(), 2)
+                self.assertEqual(CustomLink.objects.get_for_model(Site).count(), 2)
+                raise RuntimeError("Roll back")
+        except RuntimeError:
+            pass
+
+        self.assertEqual(list(CustomLink.objects.get_for_model(Site)), [self.custom_link])
+        with self.assertNumQueries(0):
+            self.assertEqual(list(CustomLink.objects.get_for_model(Site)), [self.custom_link])
@@ -9,6 +9,7 @@ from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.models import ProtectedError
 from django.db.utils import IntegrityError
+from django.test import override_settings
 
 from nautobot.dcim.models import (
     Device,
@@ -31,6 +32,7 @@ from nautobot.extras.models import (
     GitRepository,
     JobLogEntry,
     JobResult,
+    RenderedConfigContext,
     Secret,
     SecretsGroup,
     SecretsGroupAssociation,
@@ -93,6 +95,14 @@ class ComputedFieldTest(TestCase):
         rendered_value = self.bad_computed_field.render(context={"obj": self.site1})
         self.assertEqual(rendered_value, self.bad_computed_field.fallback_value)
 
+    def test_render_many_method(self):
+        site2 = Site.objects.create(name="LAX")
+        rendered_values = self.good_computed_field.render_many([self.site1, site2])
+        self.assertEqual(rendered_values, ["NYC is awesome!", "LAX is awesome!"])
+
+        rendered_values = self.bad_computed_field.render_many([self.site1, site2])
+        self.assertEqual(rendered_values, [self.bad_computed_field.fallback_value] * 2)
+
 
 class ConfigContextTest(TestCase):
     """
@@ -299,6 +309,191 @@ class ConfigContextTest(TestCase):
         self.assertEqual(ConfigContext.objects.get_for_object(device).count(), 2)
         self.assertEqual(device.get_config_context(), annotated_queryset[0].get_config_context())
 
+    def test_get_for_objects_same_as_get_for_object(self):
+        child_region = Region.objects.create(name="Child Region", parent=self.region)
+        child_site = Site.objects.create(name="Site-2", slug="site-2", region=child_region)
+        region_context = ConfigContext.objects.create(name="region", weight=100, data={"region": 1, "a": 1})
+        region_context.regions.add(self.region)
+        child_region_context = ConfigContext.objects.create(name="child region", weight=90, data={"a": 2})
+        child_region_context.regions.add(child_region)
+        site_context = ConfigContext.objects.create(name="site", weight=100, data={"site": 1})
+        site_context.sites.add(self.site)
+        tenant_group_context = ConfigContext.objects.create(name="tenant group", weight=100, data={"tenant_group": 1})
+        tenant_group_context.tenant_groups.add(self.tenantgroup)
+        tag_context = ConfigContext.objects.create(name="tag", weight=100, data={"tag": 1})
+        tag_context.tags.add(self.tag, self.tag2)
+        ConfigContext.objects.create(name="inactive", weight=200, data={"a": 3}, is_active=False)
+        ConfigContext.objects.create(name="global", weight=50, data={"a": 4})
+
+        device2 = Device.objects.create(
+            name="Device 2",
+            site=child_site,
+            tenant=self.tenant,
+            device_role=self.devicerole,
+            device_type=self.devicetype,
+            local_context_data={"local": 1},
+        )
+        device2.tags.add(self.tag, self.tag2)
+
+        devices = list(Device.objects.all())
+        config_contexts = ConfigContext.objects.get_for_objects(devices)
+        for device in devices:
+            self.assertEqual(config_contexts[device.pk], list(ConfigContext.objects.get_for_object(device)))
+
+        expected = {device.pk: device.get_config_context() for device in devices}
+        devices = Device.objects.all()
+        # Devices, their attributes and tags, ConfigContexts and their 10 assignments, and deferred local context data
+        with self.assertNumQueries(15):
+            devices = Device.prefetch_config_context(devices.defer("local_context_data"))
+        with self.assertNumQueries(0):
+            for device in devices:
+                self.assertEqual(device.get_config_context(), expected[device.pk])
+
+    def test_get_for_objects_same_as_get_for_object_virtualmachine(self):
+        cluster_group = ClusterGroup.objects.create(name="Cluster Group")
+        cluster_group_context = ConfigContext.objects.create(
+            name="cluster group", weight=100, data={"cluster_group": 1}
+        )
+        cluster_group_context.cluster_groups.add(cluster_group)
+        region_context = ConfigContext.objects.create(name="region", weight=100, data={"region": 1})
+        region_context.regions.add(self.region)
+        role_context = ConfigContext.objects.create(name="role", weight=100, data={"role": 1})
+        role_context.roles.add(self.devicerole)
+        cluster_type = ClusterType.objects.create(name="Cluster Type 1")
+        cluster = Cluster.objects.create(name="Cluster", group=cluster_group, type=cluster_type, site=self.site)
+        VirtualMachine.objects.create(name="VM 1", cluster=cluster, role=self.devicerole)
+        VirtualMachine.objects.create(name="VM 2", cluster=Cluster.objects.create(name="Cluster 2", type=cluster_type))
+
+        virtual_machines = list(VirtualMachine.objects.all())
+        config_contexts = ConfigContext.objects.get_for_objects(virtual_machines)
+        for virtual_machine in virtual_machines:
+            self.assertEqual(
+                config_contexts[virtual_machine.pk], list(ConfigContext.objects.get_for_object(virtual_machine))
+            )
+
+
+@override_settings(MATERIALIZED_CONFIG_CONTEXTS_ENABLED=True)
+class RenderedConfigContextTest(TestCase):
+    """
+    Tests for the materialized config contexts of devices and virtual machines.
+    """
+
+    def setUp(self):
+        manufacturer = Manufacturer.objects.create(name="Manufacturer 1", slug="manufacturer-1")
+        self.devicetype = DeviceType.objects.create(
+            manufacturer=manufacturer, model="Device Type 1", slug="device-type-1"
+        )
+        self.devicerole = DeviceRole.objects.create(name="Device Role 1", slug="device-role-1")
+        self.site = Site.objects.create(name="Site-1", slug="site-1")
+        self.site_context = ConfigContext.objects.create(name="site", weight=100, data={"site": 1})
+        self.site_context.sites.add(self.site)
+        self.device = Device.objects.create(
+            name="Device 1",
+            device_type=self.devicetype,
+            device_role=self.devicerole,
+            site=self.site,
+            local_context_data={"local": 1},
+        )
+        self.content_type = ContentType.objects.get_for_model(Device)
+
+    def test_render(self):
+        self.assertEqual(RenderedConfigContext.objects.render(Device), 1)
+        rendered = RenderedConfigContext.objects.get(content_type=self.content_type, object_id=self.device.pk)
+        self.assertFalse(rendered.stale)
+        self.assertEqual(rendered.data, {"site": 1, "local": 1})
+
+        device = Device.objects.get(pk=self.device.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(device.get_config_context(), {"site": 1, "local": 1})
+
+        device = Device.objects.annotate_rendered_config_context().get(pk=self.device.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(device.get_config_context(), {"site": 1, "local": 1})
+
+    def test_invalidation(self):
+        RenderedConfigContext.objects.render(Device)
+
+        # Changing a ConfigContext marks the materialized config contexts of the objects it is assigned to as stale
+        self.site_context.data = {"site": 2}
+        self.site_context.save()
+        rendered = RenderedConfigContext.objects.get(content_type=self.content_type, object_id=self.device.pk)
+        self.assertTrue(rendered.stale)
+        self.assertEqual(rendered.version, 1)
+        # Stale config contexts are not read
+        self.assertEqual(Device.objects.get(pk=self.device.pk).get_config_context(), {"site": 2, "local": 1})
+
+        self.assertEqual(RenderedConfigContext.objects.render_stale(), 1)
+        rendered.refresh_from_db()
+        self.assertFalse(rendered.stale)
+        self.assertEqual(rendered.data, {"site": 2, "local": 1})
+
+        # Changing the site of a device marks its materialized config context as stale
+        self.device.site = Site.objects.create(name="Site-2", slug="site-2")
+        self.device.save()
+        rendered.refresh_from_db()
+        self.assertTrue(rendered.stale)
+        RenderedConfigContext.objects.render_stale()
+        rendered.refresh_from_db()
+        self.assertEqual(rendered.data, {"local": 1})
+
+        # Deleting a device deletes its materialized config context
+        device_pk = self.device.pk
+        self.device.delete()
+        self.assertFalse(RenderedConfigContext.objects.filter(object_id=device_pk).exists())
+
+    def test_invalidation_of_assigned_objects(self):
+        site_2 = Site.objects.create(name="Site-2", slug="site-2")
+        device_2 = Device.objects.create(
+            name="Device 2", device_type=self.devicetype, device_role=self.devicerole, site=site_2
+        )
+        RenderedConfigContext.objects.render(Device)
+
+        def get_stale():
+            return set(
+                RenderedConfigContext.objects.filter(content_type=self.content_type, stale=True).values_list(
+                    "object_id", flat=True
+                )
+            )
+
+        # Only the devices to which a ConfigContext is assigned are marked as stale
+        self.site_context.data = {"site": 2}
+        self.site_context.save()
+        self.assertEqual(get_stale(), {self.device.pk})
+        RenderedConfigContext.objects.render_stale()
+
+        # Both the devices it applied to before and after its assignments change are marked as stale
+        self.site_context.sites.set([site_2])
+        self.assertEqual(get_stale(), {self.device.pk, device_2.pk})
+        RenderedConfigContext.objects.render_stale()
+        self.assertEqual(Device.objects.get(pk=device_2.pk).get_config_context(), {"site": 2})
+
+        # Deleting a ConfigContext marks the devices it was assigned to as stale
+        self.site_context.delete()
+        self.assertEqual(get_stale(), {device_2.pk})
+
+    def test_render_does_not_store_data_invalidated_while_rendering(self):
+        RenderedConfigContext.objects.render(Device)
+        original_prefetch = Device.prefetch_config_context
+
+        def prefetch_and_invalidate(objects, materialized=True):
+            objects = original_prefetch(objects, materialized=materialized)
+            RenderedConfigContext.objects.invalidate(Device, [self.device.pk])
+            return objects
+
+        with mock.patch.object(Device, "prefetch_config_context", side_effect=prefetch_and_invalidate):
+            self.assertEqual(RenderedConfigContext.objects.render(Device), 0)
+        self.assertTrue(
+            RenderedConfigContext.objects.get(content_type=self.content_type, object_id=self.device.pk).stale
+        )
+
+    def test_check_consistency(self):
+        RenderedConfigContext.objects.render(Device)
+        self.assertEqual(RenderedConfigContext.objects.check_consistency(Device), [])
+        RenderedConfigContext.objects.filter(object_id=self.device.pk).update(data={})
+        self.assertEqual(RenderedConfigContext.objects.check_consistency(Device), [self.device.pk])
+        RenderedConfigContext.objects.filter(object_id=self.device.pk).delete()
+        self.assertEqual(RenderedConfigContext.objects.check_consistency(Device), [self.device.pk])
+
 
 class ConfigContextSchemaTestCase(TestCase):
     """
@@ -576,6 +771,22 @@ class ExportTemplateTest(TestCase):
         )
         nonduplicate_template.validated_save()
 
+    def test_render_stream(self):
+        """
+        The template iterates over the objects of the queryset in chunks, without caching them on the queryset.
+        """
+        for i in range(3):
+            Site.objects.create(name=f"Site {i}", slug=f"site-{i}")
+        export_template = ExportTemplate(
+            content_type=ContentType.objects.get_for_model(Site),
+            name="Export Template 1",
+            template_code="{{ queryset.count() }}:{% for site in queryset %} {{ site.name }}{% endfor %}",
+        )
+        queryset = Site.objects.order_by("name").prefetch_related("tags")
+
+        self.assertEqual(export_template.render(queryset), "3: Site 0 Site 1 Site 2")
+        self.assertIsNone(queryset._result_cache)
+
 
 class FileProxyTest(TestCase):
     def setUp(self):
@@ -1,17 +1,22 @@
 import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 from django.contrib.contenttypes.models import ContentType
+from django.test import override_settings
 from django.utils import timezone
 from requests import Session
+from requests.exceptions import ConnectionError as RequestsConnectionError
 
 from nautobot.dcim.api.serializers import SiteSerializer
 from nautobot.dcim.models import Site
 from nautobot.extras.choices import ObjectChangeActionChoices
+from nautobot.extras.context_managers import web_request_context
 from nautobot.extras.models import Webhook
-from nautobot.extras.tasks import process_webhook
+from nautobot.extras.tasks import _get_endpoint_session, process_webhook, process_webhooks
 from nautobot.extras.utils import generate_signature
+from nautobot.extras.webhooks import _get_webhooks, enqueue_webhook_groups
 from nautobot.utilities.testing import APITestCase
 
 
@@ -89,3 +94,149 @@ class WebhookTest(APITestCase):
                 self.user.username,
                 request_id,
             )
+
+    def test_webhook_map(self):
+        webhook = Webhook.objects.get(type_create=True)
+        self.assertEqual(_get_webhooks(Site, ObjectChangeActionChoices.ACTION_CREATE), [webhook.pk])
+        self.assertEqual(_get_webhooks(Site, ObjectChangeActionChoices.ACTION_UPDATE), [])
+
+        # Changes to webhooks invalidate the map
+        webhook.type_update = True
+        webhook.save()
+        self.assertEqual(_get_webhooks(Site, ObjectChangeActionChoices.ACTION_UPDATE), [webhook.pk])
+        webhook.content_types.clear()
+        self.assertEqual(_get_webhooks(Site, ObjectChangeActionChoices.ACTION_CREATE), [])
+
+    def test_enqueue_webhook_groups(self):
+        """
+        All deliveries for a request are sent as a single `process_webhooks()` task once the transaction is committed.
+        """
+        webhook = Webhook.objects.get(type_create=True)
+        sites = [Site.objects.create(name=f"Site {i}", slug=f"site-{i}") for i in range(3)]
+        groups = [
+            (sites[:2], ObjectChangeActionChoices.ACTION_CREATE),
+            (sites[2:], ObjectChangeActionChoices.ACTION_CREATE),
+            (sites, ObjectChangeActionChoices.ACTION_UPDATE),  # no webhook
+        ]
+
+        with patch("nautobot.extras.webhooks.transaction.on_commit") as on_commit, patch.object(
+            process_webhooks, "apply_async"
+        ) as apply_async:
+            enqueue_webhook_groups(groups, self.user, uuid.uuid4())
+            # Nothing is serialized or enqueued before the transaction is committed
+            apply_async.assert_not_called()
+            on_commit.call_args[0][0]()
+
+        apply_async.assert_called_once()
+        deliveries = apply_async.call_args[1]["args"][0]
+        self.assertEqual([delivery[0] for delivery in deliveries], [webhook.pk] * 3)
+        self.assertEqual([delivery[1]["name"] for delivery in deliveries], ["Site 0", "Site 1", "Site 2"])
+
+    @override_settings(CHANGELOG_DEFERRED=True)
+    def test_deleted_objects_webhooks(self):
+        """
+        Deletions are serialized while the objects still exist, but enqueued as a single task along with all other
+        changes of the request.
+        """
+        webhook = Webhook.objects.get(type_create=True)
+        webhook.type_delete = True
+        webhook.save()
+        sites = [Site.objects.create(name=f"Site {i}", slug=f"site-{i}") for i in range(3)]
+
+        callbacks = []
+        with patch("nautobot.extras.webhooks.transaction.on_commit", callbacks.append), patch.object(
+            process_webhooks, "apply_async"
+        ) as apply_async:
+            with web_request_context(self.user):
+                Site.objects.create(name="Site 3", slug="site-3")
+                for site in sites:
+                    site.delete()
+            self.assertEqual(len(callbacks), 1)
+            callbacks[0]()
+
+        apply_async.assert_called_once()
+        deliveries = apply_async.call_args[1]["args"][0]
+        self.assertEqual(
+            [(delivery[1]["name"], delivery[3]) for delivery in deliveries],
+            [
+                ("Site 0", ObjectChangeActionChoices.ACTION_DELETE),
+                ("Site 1", ObjectChangeActionChoices.ACTION_DELETE),
+                ("Site 2", ObjectChangeActionChoices.ACTION_DELETE),
+                ("Site 3", ObjectChangeActionChoices.ACTION_CREATE),
+            ],
+        )
+
+    def test_endpoint_sessions(self):
+        """
+        Pooled sessions are shared by webhooks to the same endpoint only if they have the same TLS verification setting.
+        """
+        endpoint = "https://localhost"
+        session, semaphore = _get_endpoint_session(endpoint, True)
+        self.assertIs(_get_endpoint_session(endpoint, True)[0], session)
+
+        for verify in (False, "/etc/ssl/certs/ca.pem"):
+            other_session, other_semaphore = _get_endpoint_session(endpoint, verify)
+            self.assertIsNot(other_session, session)
+            self.assertEqual(other_session.verify, verify)
+            # Concurrency is still limited per endpoint
+            self.assertIs(other_semaphore, semaphore)
+
+    @override_settings(WEBHOOK_RETRY_LIMIT=1, WEBHOOK_RETRY_BACKOFF=10)
+    def test_process_webhooks_retry(self):
+        """
+        Failed deliveries are retried with exponential backoff, up to WEBHOOK_RETRY_LIMIT times.
+        """
+        webhook = Webhook.objects.get(type_create=True)
+        delivery = [
+            webhook.pk,
+            {"name": "Site 1"},
+            Site._meta.model_name,
+            ObjectChangeActionChoices.ACTION_CREATE,
+            str(timezone.now()),
+            self.user.username,
+            str(uuid.uuid4()),
+        ]
+
+        def failing_send(_, request, **kwargs):
+            raise RequestsConnectionError("Connection refused")
+
+        with patch.object(Session, "send", failing_send), patch.object(process_webhooks, "apply_async") as apply_async:
+            process_webhooks([delivery])
+            apply_async.assert_called_once_with(args=[[delivery]], kwargs={"attempt": 1}, countdown=10)
+
+            apply_async.reset_mock()
+            process_webhooks([delivery], attempt=1)
+            apply_async.assert_not_called()
+
+    @override_settings(WEBHOOK_MAX_CONCURRENT_ENDPOINTS=2)
+    def test_process_webhooks_concurrency(self):
+        """
+        Requests to different endpoints are sent from at most WEBHOOK_MAX_CONCURRENT_ENDPOINTS threads.
+        """
+        deliveries = []
+        for i in range(3):
+            webhook = Webhook.objects.create(name=f"Webhook {i}", type_create=True, payload_url=f"http://host-{i}/")
+            deliveries.append(
+                [
+                    webhook.pk,
+                    {"name": f"Site {i}"},
+                    Site._meta.model_name,
+                    ObjectChangeActionChoices.ACTION_CREATE,
+                    str(timezone.now()),
+                    self.user.username,
+                    str(uuid.uuid4()),
+                ]
+            )
+        sent = []
+
+        def failing_send(_, request, **kwargs):
+            sent.append(request.url)
+            raise RequestsConnectionError("Connection refused")
+
+        with patch("nautobot.extras.tasks.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as executor, patch.object(
+            Session, "send", failing_send
+        ), patch.object(process_webhooks, "apply_async"):
+            process_webhooks(deliveries)
+
+        executor.assert_called_once_with(max_workers=2)
+        self.assertEqual(sorted(sent), [f"http://host-{i}/" for i in range(3)])
@@ -1,50 +1,126 @@
+import logging
+
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.utils import timezone
 
 from nautobot.utilities.api import get_serializer_for_model
 from nautobot.extras.models import Webhook
+from nautobot.extras.metadata import metadata_cache
 from nautobot.extras.registry import registry
-from nautobot.extras.tasks import process_webhook
+from nautobot.extras.tasks import process_webhooks
 from .choices import ObjectChangeActionChoices
 
 
+logger = logging.getLogger("nautobot.extras.webhooks")
+
+ACTION_FLAGS = {
+    ObjectChangeActionChoices.ACTION_CREATE: "type_create",
+    ObjectChangeActionChoices.ACTION_UPDATE: "type_update",
+    ObjectChangeActionChoices.ACTION_DELETE: "type_delete",
+}
+
+
+def _get_webhooks(model, action):
+    """
+    Return the PKs of the enabled Webhook(s) assigned to this model + action, or None if this type of object doesn't
+    support webhooks.
+    """
+    # Determine whether this type of object supports webhooks
+    app_label = model._meta.app_label
+    model_name = model._meta.model_name
+    if model_name not in registry["model_features"]["webhooks"].get(app_label, []):
+        return None
+
+    # Retrieve any applicable Webhooks
+    content_type = ContentType.objects.get_for_model(model)
+    webhooks = Webhook.objects.filter(content_types=content_type, enabled=True, **{ACTION_FLAGS[action]: True})
+    return [webhook.pk for webhook in metadata_cache.get(webhooks, content_type.pk, action)]
+
+
+def _get_deliveries(webhook_pks, instances, user, request_id, action, timestamp):
+    """
+    Serialize a list of instances (all of the same model) and return the list of deliveries to pass to
+    `process_webhooks`, one for each webhook + object.
+    """
+    model = instances[0].__class__
+
+    # Get the Model's API serializer class and serialize the objects
+    serializer_class = get_serializer_for_model(model)
+    serializer_context = {
+        "request": None,
+    }
+    serializer = serializer_class(instances, many=True, context=serializer_context)
+
+    return [
+        [webhook_pk, data, model._meta.model_name, action, timestamp, user.username, request_id]
+        for data in serializer.data
+        for webhook_pk in webhook_pks
+    ]
+
+
+def get_webhook_deliveries(instances, user, request_id, action):
+    """
+    Serialize a list of instances (all of the same model) right away and return the deliveries of the Webhook(s)
+    assigned to them + action, to be passed to `enqueue_webhook_groups()` later on. This is used for objects which are
+    about to be deleted and could no longer be serialized once the transaction is committed.
+    """
+    if not instances:
+        return []
+    webhook_pks = _get_webhooks(instances[0].__class__, action)
+    if not webhook_pks:
+        return []
+    return _get_deliveries(webhook_pks, instances, user, request_id, action, str(timezone.now()))
+
+
 def enqueue_webhooks(instance, user, request_id, action):
     """
     Find Webhook(s) assigned to this instance + action and enqueue them
     to be processed
     """
-    # Determine whether this type of object supports webhooks
-    app_label = instance._meta.app_label
-    model_name = instance._meta.model_name
-    if model_name not in registry["model_features"]["webhooks"].get(app_label, []):
+    enqueue_bulk_webhooks([instance], user, request_id, action)
+
+
+def enqueue_bulk_webhooks(instances, user, request_id, action):
+    """
+    Find Webhook(s) assigned to this list of instances (all of the same model) + action and enqueue them
+    to be processed, looking up the Webhooks and serializing the instances only once for the whole list.
+    """
+    enqueue_webhook_groups([(instances, action)], user, request_id)
+
+
+def enqueue_webhook_groups(groups, user, request_id, deliveries=None):
+    """
+    Enqueue the Webhook(s) assigned to each of a list of (instances, action) groups, along with any deliveries already
+    serialized by `get_webhook_deliveries()`, as a single `process_webhooks` task once the current transaction is
+    committed.
+
+    Created and updated objects are serialized only when the transaction is committed, so that the payload reflects
+    their final state (and nothing is serialized or sent at all if the transaction is rolled back). Deleted objects no
+    longer exist at that point, and are therefore serialized immediately.
+    """
+    timestamp = str(timezone.now())
+    deliveries = list(deliveries or [])
+    deferred = []
+
+    for instances, action in groups:
+        if not instances:
+            continue
+        webhook_pks = _get_webhooks(instances[0].__class__, action)
+        if not webhook_pks:
+            continue
+        if action == ObjectChangeActionChoices.ACTION_DELETE:
+            deliveries.extend(_get_deliveries(webhook_pks, instances, user, request_id, action, timestamp))
+        else:
+            deferred.append((webhook_pks, instances, action))
+
+    if not deliveries and not deferred:
         return
 
-    # Retrieve any applicable Webhooks
-    content_type = ContentType.objects.get_for_model(instance)
-    action_flag = {
-        ObjectChangeActionChoices.ACTION_CREATE: "type_create",
-        ObjectChangeActionChoices.ACTION_UPDATE: "type_update",
-        ObjectChangeActionChoices.ACTION_DELETE: "type_delete",
-    }[action]
-    webhooks = Webhook.objects.filter(content_types=content_type, enabled=True, **{action_flag: True})
-
-    if webhooks.exists():
-        # Get the Model's API serializer class and serialize the object
-        serializer_class = get_serializer_for_model(instance.__class__)
-        serializer_context = {
-            "request": None,
-        }
-        serializer = serializer_class(instance, context=serializer_context)
-
-        # Enqueue the webhooks
-        for webhook in webhooks:
-            args = [
-                webhook.pk,
-                serializer.data,
-                instance._meta.model_name,
-                action,
-                str(timezone.now()),
-                user.username,
-                request_id,
-            ]
-            process_webhook.apply_async(args=args)
+    def send():
+        for webhook_pks, instances, action in deferred:
+            deliveries.extend(_get_deliveries(webhook_pks, instances, user, request_id, action, timestamp))
+        logger.debug("Enqueueing %d webhook deliveries for request %s", len(deliveries), request_id)
+        process_webhooks.apply_async(args=[deliveries])
+
+    transaction.on_commit(send)
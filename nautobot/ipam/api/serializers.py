@@ -154,12 +154,22 @@ class RIRSerializer(CustomFieldModelSerializer):
         opt_in_fields = ["computed_fields"]
 
 
+class UtilizationSerializer(serializers.Serializer):
+    """
+    Representation of the `UtilizationData` returned by `get_utilization()`.
+    """
+
+    numerator = serializers.IntegerField(read_only=True)
+    denominator = serializers.IntegerField(read_only=True)
+
+
 class AggregateSerializer(TaggedObjectSerializer, CustomFieldModelSerializer):
     url = serializers.HyperlinkedIdentityField(view_name="ipam-api:aggregate-detail")
     family = ChoiceField(choices=IPAddressFamilyChoices, read_only=True)
     prefix = IPFieldSerializer()
     rir = NestedRIRSerializer()
     tenant = NestedTenantSerializer(required=False, allow_null=True)
+    utilization = UtilizationSerializer(source="get_utilization", read_only=True)
 
     class Meta:
         model = Aggregate
@@ -177,9 +187,10 @@ class AggregateSerializer(TaggedObjectSerializer, CustomFieldModelSerializer):
             "created",
             "last_updated",
             "computed_fields",
+            "utilization",
         ]
         read_only_fields = ["family"]
-        opt_in_fields = ["computed_fields"]
+        opt_in_fields = ["computed_fields", "utilization"]
 
 
 #
@@ -310,6 +321,7 @@ class PrefixSerializer(TaggedObjectSerializer, StatusModelSerializerMixin, Custo
     tenant = NestedTenantSerializer(required=False, allow_null=True)
     vlan = NestedVLANSerializer(required=False, allow_null=True)
     role = NestedRoleSerializer(required=False, allow_null=True)
+    utilization = UtilizationSerializer(source="get_utilization", read_only=True)
 
     class Meta:
         model = Prefix
@@ -331,9 +343,10 @@ class PrefixSerializer(TaggedObjectSerializer, StatusModelSerializerMixin, Custo
             "created",
             "last_updated",
             "computed_fields",
+            "utilization",
         ]
         read_only_fields = ["family"]
-        opt_in_fields = ["computed_fields"]
+        opt_in_fields = ["computed_fields", "utilization"]
 
 
 class PrefixLengthSerializer(serializers.Serializer):
@@ -359,6 +372,31 @@ class PrefixLengthSerializer(serializers.Serializer):
         return data
 
 
+class BulkAllocationSerializer(serializers.Serializer):
+    """
+    Base class of requests to allocate a number of objects from one or more distinct parent prefixes, in the order
+    given.
+    """
+
+    prefixes = serializers.ListField(child=serializers.UUIDField(), min_length=1)
+    count = serializers.IntegerField(min_value=1)
+
+    def validate_prefixes(self, value):
+        duplicates = sorted({str(pk) for pk in value if value.count(pk) > 1})
+        if duplicates:
+            raise serializers.ValidationError([f"Prefix {pk} is listed more than once." for pk in duplicates])
+        return value
+
+
+class BulkAvailablePrefixSerializer(BulkAllocationSerializer):
+    """
+    Request to allocate a number of available child prefixes of the same length from one or more parent prefixes, in
+    the order given. Any other attributes in the request are applied to each of the new prefixes.
+    """
+
+    prefix_length = serializers.IntegerField(min_value=0, max_value=128)
+
+
 class AvailablePrefixSerializer(serializers.Serializer):
     """
     Representation of a prefix which does not exist in the database.
@@ -439,6 +477,13 @@ class IPAddressSerializer(TaggedObjectSerializer, StatusModelSerializerMixin, Cu
         return serializer(obj.assigned_object, context=context).data
 
 
+class BulkAvailableIPSerializer(BulkAllocationSerializer):
+    """
+    Request to allocate a number of available IP addresses from one or more parent prefixes, in the order given. Any
+    other attributes in the request are applied to each of the new IP addresses.
+    """
+
+
 class AvailableIPSerializer(serializers.Serializer):
     """
     Representation of an IP address which does not exist in the database.
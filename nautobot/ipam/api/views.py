@@ -1,12 +1,24 @@
+import collections
+from contextlib import contextmanager, ExitStack
+from itertools import groupby, islice
+
+import netaddr
+from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.routers import APIRootView
 
 from nautobot.extras.api.views import CustomFieldModelViewSet, StatusViewSetMixin
+from nautobot.extras.models import TaggedItem
+from nautobot.extras.signals import handle_bulk_created_objects
 from nautobot.ipam import filters
 from nautobot.ipam.models import (
     Aggregate,
@@ -20,6 +32,7 @@ from nautobot.ipam.models import (
     VLANGroup,
     VRF,
 )
+from nautobot.ipam.signals import update_prefix_tree_index
 from nautobot.utilities.config import get_settings_or_config
 from nautobot.utilities.utils import count_related
 from . import serializers
@@ -34,6 +47,18 @@ class IPAMRootView(APIRootView):
         return "IPAM"
 
 
+class UtilizationViewSetMixin:
+    """
+    Annotate the queryset with utilization data when the opt-in `utilization` field is requested via `?include=`.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.brief and "utilization" in self.request.query_params.get("include", "").split(","):
+            queryset = queryset.annotate_utilization()
+        return queryset
+
+
 #
 # VRFs
 #
@@ -79,7 +104,7 @@ class RIRViewSet(CustomFieldModelViewSet):
 #
 
 
-class AggregateViewSet(CustomFieldModelViewSet):
+class AggregateViewSet(UtilizationViewSetMixin, CustomFieldModelViewSet):
     queryset = Aggregate.objects.prefetch_related("rir").prefetch_related("tags")
     serializer_class = serializers.AggregateSerializer
     filterset_class = filters.AggregateFilterSet
@@ -104,7 +129,65 @@ class RoleViewSet(CustomFieldModelViewSet):
 #
 
 
-class PrefixViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
+def _get_allocation_lock_name(lock_name, prefix):
+    """
+    Return the name of the lock named `lock_name` which guards allocations from `prefix` within its VRF.
+    """
+    return f"{lock_name}-{prefix.vrf_id or 'global'}-{prefix.prefix}"
+
+
+def _lock_prefix_rows(prefixes):
+    """
+    Lock the database rows of the given prefixes for update, and those of the prefixes covering them (in the same VRF,
+    or global) for share, until the end of the current transaction.
+
+    Allocations from nested prefixes (such as a /16 and a /24 within it) may overlap, but hold different allocation
+    locks. Allocating from the /16 locks its row for update, which conflicts with the share lock taken on it by any
+    allocation from the /24, while allocations from sibling prefixes (such as two /24s within the /16) only share the
+    lock on their covering prefix and don't wait for each other.
+    """
+    modes = {}
+    for prefix in prefixes:
+        for pk in (
+            Prefix.objects.ip_family(prefix.family)
+            .net_contains_or_equals(prefix.prefix)
+            .filter(Q(vrf=prefix.vrf_id) | Q(vrf__isnull=True))
+            .values_list("pk", flat=True)
+        ):
+            modes.setdefault(pk, "share")
+    modes.update({prefix.pk: "update" for prefix in prefixes})
+
+    # Rows are locked in order of their PK, whatever their lock mode, so that concurrent requests cannot deadlock
+    for mode, group in groupby(sorted(modes.items()), key=lambda item: item[1]):
+        queryset = Prefix.objects.filter(pk__in=[pk for pk, _ in group]).order_by("pk").values_list("pk")
+        if mode == "update":
+            list(queryset.select_for_update())
+        else:
+            # Django has no equivalent of select_for_update() for share locks, which PostgreSQL and MySQL both support
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"{sql} FOR SHARE", params)
+
+
+@contextmanager
+def _lock_prefixes(lock_name, prefixes):
+    """
+    Hold the lock named `lock_name` guarding allocations from each of the given prefixes (see
+    `_get_allocation_lock_name()`), and run the allocation in a transaction which locks the rows of the prefixes and of
+    the prefixes covering them (see `_lock_prefix_rows()`).
+
+    Locks are always acquired in the same order, so that concurrent requests for overlapping sets of prefixes cannot
+    deadlock.
+    """
+    with ExitStack() as stack:
+        for name in sorted({_get_allocation_lock_name(lock_name, prefix) for prefix in prefixes}):
+            stack.enter_context(cache.lock(name, blocking_timeout=5))
+        with transaction.atomic():
+            _lock_prefix_rows(prefixes)
+            yield
+
+
+class PrefixViewSet(UtilizationViewSetMixin, StatusViewSetMixin, CustomFieldModelViewSet):
     queryset = Prefix.objects.prefetch_related(
         "role",
         "site",
@@ -129,14 +212,16 @@ class PrefixViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
         """
         A convenience method for returning available child prefixes within a parent.
 
-        The advisory lock decorator uses a PostgreSQL advisory lock to prevent this API from being
-        invoked in parallel, which results in a race condition where multiple insertions can occur.
+        Locks on the parent prefix and on the prefixes covering it prevent this API from being invoked in parallel for
+        overlapping prefixes, which results in a race condition where multiple insertions can occur.
         """
         prefix = get_object_or_404(self.queryset, pk=pk)
         if request.method == "POST":
 
-            with cache.lock("available-prefixes", blocking_timeout=5):
-                available_prefixes = prefix.get_available_prefixes()
+            with _lock_prefixes("available-prefixes", [prefix]):
+                # Available prefixes are read from the parent only as far as needed to satisfy the request
+                available_prefixes = prefix.iter_available_prefixes()
+                allocatable_prefixes = netaddr.IPSet()
 
                 # Validate Requested Prefixes' length
                 serializer = serializers.PrefixLengthSerializer(
@@ -153,23 +238,33 @@ class PrefixViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
                 # Allocate prefixes to the requested objects based on availability within the parent
                 for i, requested_prefix in enumerate(requested_prefixes):
 
-                    # Find the first available prefix equal to or larger than the requested size
-                    for available_prefix in available_prefixes.iter_cidrs():
-                        if requested_prefix["prefix_length"] >= available_prefix.prefixlen:
-                            allocated_prefix = "{}/{}".format(
-                                available_prefix.network, requested_prefix["prefix_length"]
-                            )
-                            requested_prefix["prefix"] = allocated_prefix
-                            requested_prefix["vrf"] = prefix.vrf.pk if prefix.vrf else None
-                            break
-                    else:
-                        return Response(
-                            {"detail": "Insufficient space is available to accommodate the requested prefix size(s)"},
-                            status=status.HTTP_204_NO_CONTENT,
-                        )
+                    # Find the first available prefix equal to or larger than the requested size, reading further into
+                    # the parent only when nothing left over from previous allocations is large enough
+                    allocated_prefix = None
+                    while allocated_prefix is None:
+                        for available_prefix in allocatable_prefixes.iter_cidrs():
+                            if requested_prefix["prefix_length"] >= available_prefix.prefixlen:
+                                allocated_prefix = "{}/{}".format(
+                                    available_prefix.network, requested_prefix["prefix_length"]
+                                )
+                                break
+                        else:
+                            available_prefix = next(available_prefixes, None)
+                            if available_prefix is None:
+                                return Response(
+                                    {
+                                        "detail": "Insufficient space is available to accommodate the requested "
+                                        "prefix size(s)"
+                                    },
+                                    status=status.HTTP_204_NO_CONTENT,
+                                )
+                            allocatable_prefixes.add(available_prefix)
+
+                    requested_prefix["prefix"] = allocated_prefix
+                    requested_prefix["vrf"] = prefix.vrf.pk if prefix.vrf else None
 
                     # Remove the allocated prefix from the list of available prefixes
-                    available_prefixes.remove(allocated_prefix)
+                    allocatable_prefixes.remove(allocated_prefix)
 
                 # Initialize the serializer with a list or a single object depending on what was requested
                 context = {"request": request}
@@ -184,9 +279,8 @@ class PrefixViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         else:
-            available_prefixes = prefix.get_available_prefixes()
             serializer = serializers.AvailablePrefixSerializer(
-                available_prefixes.iter_cidrs(),
+                list(prefix.iter_available_prefixes()),
                 many=True,
                 context={
                     "request": request,
@@ -196,6 +290,124 @@ class PrefixViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
 
             return Response(serializer.data)
 
+    def _get_bulk_allocation_request(self, request, serializer_class):
+        """
+        Validate a bulk allocation request, returning the parent prefixes (in the order given), the number of objects
+        requested, and the attributes to apply to each new object.
+        """
+        serializer = serializer_class(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        pks = serializer.validated_data["prefixes"]
+        parents = Prefix.objects.restrict(request.user).in_bulk(pks)
+        missing = [str(pk) for pk in pks if pk not in parents]
+        if missing:
+            raise ValidationError({"prefixes": [f"Prefix {pk} not found." for pk in missing]})
+
+        attrs = {key: value for key, value in request.data.items() if key not in serializer.fields}
+        return [parents[pk] for pk in pks], serializer.validated_data, attrs
+
+    def _bulk_create(self, request, serializer):
+        """
+        Create the objects validated by `serializer` (with `many=True`) using a single `bulk_create()`, then record
+        ObjectChanges and enqueue webhooks for them in bulk.
+        """
+        model = serializer.child.Meta.model
+        instances = []
+        tags = []
+        for attrs in serializer.validated_data:
+            attrs = attrs.copy()
+            tags.append(attrs.pop("tags", None) or [])
+            instances.append(model(**attrs))
+
+        # Enforce object-level permissions on the new objects
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(instances)
+                content_type = ContentType.objects.get_for_model(model)
+                TaggedItem.objects.bulk_create(
+                    [
+                        TaggedItem(content_type=content_type, object_id=instance.pk, tag=tag)
+                        for instance, instance_tags in zip(instances, tags)
+                        for tag in instance_tags
+                    ]
+                )
+                self._validate_objects(instances)
+                handle_bulk_created_objects(request, instances)
+        except ObjectDoesNotExist:
+            raise PermissionDenied()
+
+        return instances
+
+    @swagger_auto_schema(
+        method="post",
+        request_body=serializers.BulkAvailablePrefixSerializer,
+        responses={201: serializers.PrefixSerializer(many=True)},
+    )
+    @action(detail=False, url_path="bulk-available-prefixes", methods=["post"])
+    def bulk_available_prefixes(self, request):
+        """
+        Allocate a number of available child prefixes of the same length from one or more parent prefixes, in a single
+        transaction. Each parent is filled (in the order given) before moving on to the next.
+
+        This holds the same locks as the `available-prefixes` endpoint.
+        """
+        parents, params, attrs = self._get_bulk_allocation_request(request, serializers.BulkAvailablePrefixSerializer)
+        prefix_length = params["prefix_length"]
+        for parent in parents:
+            serializers.PrefixLengthSerializer(
+                data={"prefix_length": prefix_length}, context={"request": request, "prefix": parent}
+            ).is_valid(raise_exception=True)
+
+        with _lock_prefixes("available-prefixes", parents):
+            requested_prefixes = []
+            # Prefixes allocated so far by this request, by VRF, which nested parents must not allocate again
+            allocated_prefixes = collections.defaultdict(netaddr.IPSet)
+            for parent in parents:
+                if parent._children_any_vrf:
+                    excluded = netaddr.IPSet()
+                    for vrf_prefixes in allocated_prefixes.values():
+                        excluded |= vrf_prefixes
+                else:
+                    excluded = allocated_prefixes[parent.vrf_id]
+                # Carve each available block of the parent into prefixes of the requested length, in order
+                available_prefixes = (
+                    available_subnet
+                    for available_prefix in parent.iter_available_prefixes()
+                    for available_block in (
+                        (netaddr.IPSet([available_prefix]) - excluded).iter_cidrs() if excluded else [available_prefix]
+                    )
+                    if prefix_length >= available_block.prefixlen
+                    for available_subnet in available_block.subnet(prefix_length)
+                )
+                for allocated_prefix in islice(available_prefixes, params["count"] - len(requested_prefixes)):
+                    allocated_prefixes[parent.vrf_id].add(allocated_prefix)
+                    requested_prefixes.append(
+                        {
+                            **attrs,
+                            "prefix": str(allocated_prefix),
+                            "vrf": parent.vrf.pk if parent.vrf else None,
+                        }
+                    )
+                if len(requested_prefixes) == params["count"]:
+                    break
+            else:
+                return Response(
+                    {"detail": "Insufficient space is available to accommodate the requested prefix size(s)"},
+                    status=status.HTTP_204_NO_CONTENT,
+                )
+
+            context = {"request": request}
+            serializer = serializers.PrefixSerializer(data=requested_prefixes, many=True, context=context)
+            serializer.is_valid(raise_exception=True)
+            instances = self._bulk_create(request, serializer)
+            # bulk_create() doesn't send post_save, so apply the new prefixes to the prefix tree index directly
+            for instance in instances:
+                update_prefix_tree_index(instance)
+
+        serializer = serializers.PrefixSerializer(instances, many=True, context=context)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     @swagger_auto_schema(method="get", responses={200: serializers.AvailableIPSerializer(many=True)})
     @swagger_auto_schema(
         method="post",
@@ -214,22 +426,22 @@ class PrefixViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
         returned will be equivalent to PAGINATE_COUNT. An arbitrary limit (up to MAX_PAGE_SIZE, if set) may be passed,
         however results will not be paginated.
 
-        The advisory lock decorator uses a PostgreSQL advisory lock to prevent this API from being
-        invoked in parallel, which results in a race condition where multiple insertions can occur.
+        Locks on the parent prefix and on the prefixes covering it prevent this API from being invoked in parallel for
+        overlapping prefixes, which results in a race condition where multiple insertions can occur.
         """
         prefix = get_object_or_404(Prefix.objects.restrict(request.user), pk=pk)
 
         # Create the next available IP within the prefix
         if request.method == "POST":
 
-            with cache.lock("available-ips", blocking_timeout=5):
+            with _lock_prefixes("available-ips", [prefix]):
 
                 # Normalize to a list of objects
                 requested_ips = request.data if isinstance(request.data, list) else [request.data]
 
-                # Determine if the requested number of IPs is available
-                available_ips = prefix.get_available_ips()
-                if available_ips.size < len(requested_ips):
+                # Determine if the requested number of IPs is available, without reading any further into the prefix
+                available_ips = list(islice(prefix.iter_available_ips(), len(requested_ips)))
+                if len(available_ips) < len(requested_ips):
                     return Response(
                         {
                             "detail": "An insufficient number of IP addresses are available within the prefix {} ({} "
@@ -267,11 +479,7 @@ class PrefixViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
                 limit = min(limit, get_settings_or_config("MAX_PAGE_SIZE"))
 
             # Calculate available IPs within the prefix
-            ip_list = []
-            for index, ip in enumerate(prefix.get_available_ips(), start=1):
-                ip_list.append(ip)
-                if index == limit:
-                    break
+            ip_list = list(islice(prefix.iter_available_ips(), limit))
             serializer = serializers.AvailableIPSerializer(
                 ip_list,
                 many=True,
@@ -284,6 +492,64 @@ class PrefixViewSet(StatusViewSetMixin, CustomFieldModelViewSet):
 
             return Response(serializer.data)
 
+    @swagger_auto_schema(
+        method="post",
+        request_body=serializers.BulkAvailableIPSerializer,
+        responses={201: serializers.IPAddressSerializer(many=True)},
+    )
+    @action(
+        detail=False,
+        url_path="bulk-available-ips",
+        methods=["post"],
+        queryset=IPAddress.objects.all(),
+    )
+    def bulk_available_ips(self, request):
+        """
+        Allocate a number of available IP addresses from one or more parent prefixes, in a single transaction. Each
+        parent is filled (in the order given) before moving on to the next.
+
+        This holds the same locks as the `available-ips` endpoint.
+        """
+        parents, params, attrs = self._get_bulk_allocation_request(request, serializers.BulkAvailableIPSerializer)
+
+        with _lock_prefixes("available-ips", parents):
+            requested_ips = []
+            # IP addresses allocated so far by this request, by VRF, which nested parents must not allocate again
+            allocated_ips = collections.defaultdict(set)
+            for parent in parents:
+                if parent._children_any_vrf:
+                    excluded = set().union(*allocated_ips.values())
+                else:
+                    excluded = allocated_ips[parent.vrf_id]
+                available_ips = (ip for ip in parent.iter_available_ips() if ip not in excluded)
+                for available_ip in islice(available_ips, params["count"] - len(requested_ips)):
+                    allocated_ips[parent.vrf_id].add(available_ip)
+                    requested_ips.append(
+                        {
+                            **attrs,
+                            "address": "{}/{}".format(available_ip, parent.prefix.prefixlen),
+                            "vrf": parent.vrf.pk if parent.vrf else None,
+                        }
+                    )
+                if len(requested_ips) == params["count"]:
+                    break
+            else:
+                return Response(
+                    {
+                        "detail": "An insufficient number of IP addresses are available within the prefixes ({} "
+                        "requested, {} available)".format(params["count"], len(requested_ips))
+                    },
+                    status=status.HTTP_204_NO_CONTENT,
+                )
+
+            context = {"request": request}
+            serializer = serializers.IPAddressSerializer(data=requested_ips, many=True, context=context)
+            serializer.is_valid(raise_exception=True)
+            instances = self._bulk_create(request, serializer)
+
+        serializer = serializers.IPAddressSerializer(instances, many=True, context=context)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
 #
 # IP addresses
@@ -7,6 +7,7 @@ class IPAMConfig(NautobotConfig):
 
     def ready(self):
         super().ready()
+        import nautobot.ipam.signals  # noqa: F401
 
         from graphene_django.converter import convert_django_field, convert_field_to_string
         from nautobot.ipam.fields import VarbinaryIPField
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from nautobot.ipam.tree import prefix_tree_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the in-memory prefix tree index and signal all Nautobot processes to rebuild theirs"
+
+    def handle(self, *args, **options):
+        if not settings.PREFIX_TREE_INDEX_ENABLED:
+            self.stdout.write(self.style.WARNING("PREFIX_TREE_INDEX_ENABLED is not set; the index is not in use."))
+
+        self.stdout.write("Rebuilding prefix tree index...")
+        prefix_tree_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"  Indexed {len(prefix_tree_index)} prefixes"))
+
+        # Every other process (including this one) will find the request in the change log and rebuild its index on next use.
+        prefix_tree_index.request_rebuild()
+        self.stdout.write(self.style.SUCCESS("Finished."))
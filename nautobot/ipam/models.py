@@ -27,6 +27,7 @@ from .constants import (
 )
 from .fields import VarbinaryIPField
 from .querysets import PrefixQuerySet, AggregateQuerySet, IPAddressQuerySet
+from .tree import get_prefix_tree_index
 from .validators import DNSValidator
 
 
@@ -370,6 +371,15 @@ class Aggregate(PrimaryModel):
         Returns:
             UtilizationData: Aggregate utilization (numerator=size of child prefixes, denominator=prefix size)
         """
+        # Use the value computed by `AggregateQuerySet.annotate_utilization()` if available
+        if getattr(self, "utilization_numerator", None) is not None:
+            return UtilizationData(numerator=int(self.utilization_numerator), denominator=self.prefix.size)
+
+        index = get_prefix_tree_index()
+        if index is not None:
+            numerator = index.get_covered_size(self.prefix, any_vrf=True, include_self=True)
+            return UtilizationData(numerator=numerator, denominator=self.prefix.size)
+
         queryset = Prefix.objects.net_contained_or_equal(self.prefix)
         child_prefixes = netaddr.IPSet([p.prefix for p in queryset])
         return UtilizationData(numerator=child_prefixes.size, denominator=self.prefix.size)
@@ -620,12 +630,17 @@ class Prefix(PrimaryModel, StatusModel):
     def get_duplicates(self):
         return Prefix.objects.net_equals(self.prefix).filter(vrf=self.vrf).exclude(pk=self.pk)
 
+    @property
+    def _children_any_vrf(self):
+        """Whether this is a container in the global table, whose children may belong to any VRF."""
+        return self.vrf is None and self.status == Prefix.STATUS_CONTAINER
+
     def get_child_prefixes(self):
         """
         Return all Prefixes within this Prefix and VRF. If this Prefix is a container in the global table, return child
         Prefixes belonging to any VRF.
         """
-        if self.vrf is None and self.status == Prefix.STATUS_CONTAINER:
+        if self._children_any_vrf:
             return Prefix.objects.net_contained(self.prefix)
         else:
             return Prefix.objects.net_contained(self.prefix).filter(vrf=self.vrf)
@@ -640,55 +655,114 @@ class Prefix(PrimaryModel, StatusModel):
         else:
             return IPAddress.objects.net_host_contained(self.prefix).filter(vrf=self.vrf)
 
+    @staticmethod
+    def _iter_gaps(first, last, occupied):
+        """
+        Yield the `(first, last)` integer bounds of each range of addresses between `first` and `last` (inclusive) which
+        is not covered by any of the `occupied` ranges.
+
+        `occupied` must be an iterable of `(first, last)` integer ranges ordered by their first address. It is consumed
+        lazily, so only the ranges preceding the last gap requested by the caller are ever read.
+        """
+        cursor = first
+        for start, end in occupied:
+            if start > last:
+                # Ranges are ordered by their first address, so none of the remaining ranges are within bounds either
+                break
+            if start > cursor:
+                yield cursor, start - 1
+            cursor = max(cursor, end + 1)
+            if cursor > last:
+                return
+        if cursor <= last:
+            yield cursor, last
+
+    def _iter_available_prefix_ranges(self):
+        """
+        Yield the integer bounds of each range of addresses within this Prefix not covered by a child Prefix, in order.
+
+        Child Prefixes are walked in order of network address, and only as far as needed by the caller.
+        """
+        child_prefixes = self.get_child_prefixes().order_by("network").values_list("network", "broadcast")
+        occupied = (
+            (int(netaddr.IPAddress(network)), int(netaddr.IPAddress(broadcast)))
+            for network, broadcast in child_prefixes.iterator()
+        )
+        return self._iter_gaps(self.prefix.first, self.prefix.last, occupied)
+
+    def _iter_available_ip_ranges(self):
+        """
+        Yield the integer bounds of each range of usable addresses within this Prefix not used by a child IPAddress, in
+        order.
+
+        Child IPAddresses are walked in order of host address, and only as far as needed by the caller.
+        """
+        first, last = self.prefix.first, self.prefix.last
+        # For "normal" IPv4 prefixes, omit first and last addresses
+        if self.family == 4 and not self.is_pool and self.prefix.prefixlen < 31:
+            first += 1
+            last -= 1
+
+        child_hosts = self.get_child_ips().order_by("host").values_list("host", flat=True)
+        occupied = ((int(netaddr.IPAddress(host)),) * 2 for host in child_hosts.iterator())
+        return self._iter_gaps(first, last, occupied)
+
+    def iter_available_prefixes(self):
+        """
+        Yield the available child prefixes within this prefix in ascending order, as the largest possible CIDR blocks.
+
+        Unlike `get_available_prefixes()`, this doesn't need to load every child Prefix before returning the first one.
+        """
+        index = get_prefix_tree_index()
+        if index is not None:
+            yield from index.get_available_prefixes(self.prefix, self.vrf_id, any_vrf=self._children_any_vrf)
+            return
+
+        version = self.family
+        for first, last in self._iter_available_prefix_ranges():
+            yield from netaddr.iprange_to_cidrs(netaddr.IPAddress(first, version), netaddr.IPAddress(last, version))
+
+    def iter_available_ips(self):
+        """
+        Yield the available IPs within this prefix in ascending order, as `netaddr.IPAddress` objects.
+
+        Unlike `get_available_ips()`, this doesn't need to load every child IPAddress before returning the first one.
+        """
+        version = self.family
+        for first, last in self._iter_available_ip_ranges():
+            for address in range(first, last + 1):
+                yield netaddr.IPAddress(address, version)
+
     def get_available_prefixes(self):
         """
         Return all available Prefixes within this prefix as an IPSet.
         """
-        prefix = netaddr.IPSet(self.prefix)
-        child_prefixes = netaddr.IPSet([child.prefix for child in self.get_child_prefixes()])
-        available_prefixes = prefix - child_prefixes
-
-        return available_prefixes
+        return netaddr.IPSet(self.iter_available_prefixes())
 
     def get_available_ips(self):
         """
         Return all available IPs within this prefix as an IPSet.
         """
-        prefix = netaddr.IPSet(self.prefix)
-        child_ips = netaddr.IPSet([ip.address.ip for ip in self.get_child_ips()])
-        available_ips = prefix - child_ips
-
-        # IPv6, pool, or IPv4 /31-32 sets are fully usable
-        if self.family == 6 or self.is_pool or (self.family == 4 and self.prefix.prefixlen >= 31):
-            return available_ips
-
-        # Omit first and last IP address from the available set
-        # For "normal" IPv4 prefixes, omit first and last addresses
-        available_ips -= netaddr.IPSet(
-            [
-                netaddr.IPAddress(self.prefix.first),
-                netaddr.IPAddress(self.prefix.last),
-            ]
+        version = self.family
+        return netaddr.IPSet(
+            netaddr.IPRange(netaddr.IPAddress(first, version), netaddr.IPAddress(last, version))
+            for first, last in self._iter_available_ip_ranges()
         )
-        return available_ips
 
     def get_first_available_prefix(self):
         """
         Return the first available child prefix within the prefix (or None).
         """
-        available_prefixes = self.get_available_prefixes()
-        if not available_prefixes:
-            return None
-        return available_prefixes.iter_cidrs()[0]
+        return next(self.iter_available_prefixes(), None)
 
     def get_first_available_ip(self):
         """
         Return the first available IP within the prefix (or None).
         """
-        available_ips = self.get_available_ips()
-        if not available_ips:
+        available_ip = next(self.iter_available_ips(), None)
+        if available_ip is None:
             return None
-        return "{}/{}".format(next(available_ips.__iter__()), self.prefix.prefixlen)
+        return "{}/{}".format(available_ip, self.prefix.prefixlen)
 
     def get_utilization(self):
         """Get the child prefix size and parent size.
@@ -698,14 +772,28 @@ class Prefix(PrimaryModel, StatusModel):
         Returns:
             UtilizationData (namedtuple): (numerator, denominator)
         """
+        # Use the value computed by `PrefixQuerySet.annotate_utilization()` if available
+        numerator = getattr(self, "utilization_numerator", None)
+
         if self.status == Prefix.STATUS_CONTAINER:
+            if numerator is not None:
+                return UtilizationData(numerator=int(numerator), denominator=self.prefix.size)
+
+            index = get_prefix_tree_index()
+            if index is not None:
+                numerator = index.get_covered_size(self.prefix, self.vrf_id)
+                return UtilizationData(numerator=numerator, denominator=self.prefix.size)
+
             queryset = Prefix.objects.net_contained(self.prefix).filter(vrf=self.vrf)
             child_prefixes = netaddr.IPSet([p.prefix for p in queryset])
             return UtilizationData(numerator=child_prefixes.size, denominator=self.prefix.size)
 
         else:
-            # Compile an IPSet to avoid counting duplicate IPs
-            child_count = netaddr.IPSet([ip.address.ip for ip in self.get_child_ips()]).size
+            if numerator is not None:
+                child_count = int(numerator)
+            else:
+                # Compile an IPSet to avoid counting duplicate IPs
+                child_count = netaddr.IPSet([ip.address.ip for ip in self.get_child_ips()]).size
             prefix_size = self.prefix.size
             if self.prefix.version == 4 and self.prefix.prefixlen < 31 and not self.is_pool:
                 prefix_size -= 2
@@ -3,22 +3,100 @@ import uuid
 
 import netaddr
 from django.db.models import (
+    Case,
     Count,
+    DecimalField,
+    Exists,
     ExpressionWrapper,
     IntegerField,
     F,
     OuterRef,
     Subquery,
+    Sum,
     Q,
     UUIDField,
     Value,
+    When,
 )
-from django.db.models.functions import Coalesce, Length
+from django.db.models.functions import Cast, Coalesce, Length, Power
+from django.db.models.query import ModelIterable
 
 from nautobot.ipam.constants import IPV4_BYTE_LENGTH, IPV6_BYTE_LENGTH
+from nautobot.ipam.tree import get_prefix_tree_index
 from nautobot.utilities.querysets import RestrictedQuerySet
 
 
+# Output field able to hold the size of any IPv6 network
+ADDRESS_COUNT_FIELD = DecimalField(max_digits=40, decimal_places=0)
+
+
+def _network_size():
+    """
+    Expression for the number of addresses in a Prefix, as 2 ** (address bit length - prefix length).
+    """
+    return Power(
+        Cast(Value(2), output_field=ADDRESS_COUNT_FIELD),
+        Length(F("network")) * 8 - F("prefix_length"),
+        output_field=ADDRESS_COUNT_FIELD,
+    )
+
+
+def _maybe_vrf(vrf_id, fake_uuid):
+    """
+    Expression for comparing (possibly null) VRF IDs; `fake_uuid` stands in for the global table.
+    """
+    return ExpressionWrapper(Coalesce(vrf_id, fake_uuid), output_field=UUIDField())
+
+
+def _child_prefix_size_subquery(include_equal=False, same_vrf=False):
+    """
+    Subquery computing the number of addresses covered by all Prefixes within the outer network.
+
+    Prefixes which are contained within (or are duplicates of) another such Prefix are excluded, so that overlapping
+    Prefixes are only counted once. If `include_equal` is False, only Prefixes with a longer prefix length than the
+    outer network are considered; if `same_vrf` is True, only Prefixes in the same VRF as the outer Prefix are.
+    """
+    from nautobot.ipam.models import Prefix
+
+    # The COALESCE needs a valid, non-zero, non-null UUID value to do the comparison.
+    # The value itself has no meaning, so we just generate a random UUID for the query.
+    FAKE_UUID = uuid.uuid4()
+    length_lookup = "prefix_length__gte" if include_equal else "prefix_length__gt"
+
+    # Prefixes covering a candidate child Prefix, that are themselves within the outer network
+    covering_prefixes = Prefix.objects.filter(
+        Q(**{length_lookup: OuterRef(OuterRef("prefix_length"))})
+        & (
+            Q(prefix_length__lt=OuterRef("prefix_length"))
+            | Q(prefix_length=OuterRef("prefix_length"), pk__lt=OuterRef("pk"))
+        )
+        & Q(network__lte=OuterRef("network"))
+        & Q(broadcast__gte=OuterRef("broadcast"))
+    )
+    child_prefixes = Prefix.objects.filter(
+        Q(**{length_lookup: OuterRef("prefix_length")})
+        & Q(network__gte=OuterRef("network"))
+        & Q(broadcast__lte=OuterRef("broadcast"))
+    )
+    if same_vrf:
+        covering_prefixes = covering_prefixes.annotate(maybe_vrf=_maybe_vrf(F("vrf_id"), FAKE_UUID)).filter(
+            maybe_vrf=_maybe_vrf(OuterRef("vrf_id"), FAKE_UUID)
+        )
+        child_prefixes = child_prefixes.annotate(maybe_vrf=_maybe_vrf(F("vrf_id"), FAKE_UUID)).filter(
+            maybe_vrf=_maybe_vrf(OuterRef("vrf_id"), FAKE_UUID)
+        )
+
+    return Subquery(
+        child_prefixes.filter(~Exists(covering_prefixes))
+        .order_by()
+        .annotate(dummy_group_by=Value(1))  # This is an ORM hack to remove the unwanted GROUP BY clause
+        .values("dummy_group_by")
+        .annotate(size=Sum(_network_size()))
+        .values("size")[:1],
+        output_field=ADDRESS_COUNT_FIELD,
+    )
+
+
 class BaseNetworkQuerySet(RestrictedQuerySet):
     """Base class for network-related querysets."""
 
@@ -235,6 +313,31 @@ class NetworkQuerySet(BaseNetworkQuerySet):
 class AggregateQuerySet(NetworkQuerySet):
     """Queryset for `Aggregate` objects."""
 
+    def annotate_utilization(self):
+        """
+        Annotate each Aggregate with the number of its addresses covered by Prefixes (in any VRF) as
+        `utilization_numerator`, which is used by `Aggregate.get_utilization()` instead of querying per Aggregate.
+        """
+        return self.annotate(
+            utilization_numerator=Coalesce(_child_prefix_size_subquery(include_equal=True), Value(0)),
+        )
+
+
+class PrefixTreeModelIterable(ModelIterable):
+    """
+    Iterable that sets the `parents` and `children` attributes of each Prefix from the prefix tree index.
+
+    See `PrefixQuerySet.annotate_tree()`.
+    """
+
+    def __iter__(self):
+        index = get_prefix_tree_index()
+        for obj in super().__iter__():
+            if index is not None:
+                obj.parents = index.get_parent_count(obj.prefix, obj.vrf_id)
+                obj.children = index.get_child_count(obj.prefix, obj.vrf_id)
+            yield obj
+
 
 class PrefixQuerySet(NetworkQuerySet):
     """Queryset for `Prefix` objects."""
@@ -243,6 +346,68 @@ class PrefixQuerySet(NetworkQuerySet):
         """
         Annotate the number of parent and child prefixes for each Prefix.
 
+        If `settings.PREFIX_TREE_INDEX_ENABLED` is True, the counts are looked up in the in-memory prefix tree index
+        as the Prefixes are loaded instead of being computed by the database.
+        """
+        if get_prefix_tree_index() is not None:
+            clone = self._chain()
+            clone._iterable_class = PrefixTreeModelIterable
+            return clone
+        return self._annotate_tree_subqueries()
+
+    def annotate_utilization(self):
+        """
+        Annotate each Prefix with the numerator of its utilization as `utilization_numerator`, which is used by
+        `Prefix.get_utilization()` instead of querying per Prefix.
+
+        For container Prefixes this is the number of addresses covered by child Prefixes in the same VRF, otherwise it
+        is the number of distinct child IP addresses in the same VRF.
+        """
+        # The COALESCE needs a valid, non-zero, non-null UUID value to do the comparison.
+        # The value itself has no meaning, so we just generate a random UUID for the query.
+        FAKE_UUID = uuid.uuid4()
+
+        from nautobot.ipam.models import IPAddress, Prefix
+
+        child_ip_count = Subquery(
+            IPAddress.objects.annotate(maybe_vrf=_maybe_vrf(F("vrf_id"), FAKE_UUID))
+            .filter(
+                Q(host__gte=OuterRef("network"))
+                & Q(host__lte=OuterRef("broadcast"))
+                & Q(maybe_vrf=_maybe_vrf(OuterRef("vrf_id"), FAKE_UUID))
+            )
+            .order_by()
+            .annotate(dummy_group_by=Value(1))  # This is an ORM hack to remove the unwanted GROUP BY clause
+            .values("dummy_group_by")
+            .annotate(count=Count("host", distinct=True))
+            .values("count")[:1],
+            output_field=IntegerField(),
+        )
+
+        return self.annotate(
+            utilization_numerator=Case(
+                When(
+                    status=Prefix.STATUS_CONTAINER,
+                    then=Coalesce(_child_prefix_size_subquery(same_vrf=True), Value(0)),
+                ),
+                default=Coalesce(child_ip_count, Value(0)),
+                output_field=ADDRESS_COUNT_FIELD,
+            ),
+        )
+
+    def order_by(self, *field_names):
+        """
+        Fall back to database annotations when ordering by `parents` or `children` of an index-backed `annotate_tree()`.
+        """
+        if self._iterable_class is PrefixTreeModelIterable and "children" not in self.query.annotations:
+            if {str(field_name).lstrip("-") for field_name in field_names} & {"parents", "children"}:
+                return self._annotate_tree_subqueries().order_by(*field_names)
+        return super().order_by(*field_names)
+
+    def _annotate_tree_subqueries(self):
+        """
+        Annotate the number of parent and child prefixes for each Prefix using correlated subqueries.
+
         The UUID being used is fake for purposes of satisfying the COALESCE condition.
         """
         # The COALESCE needs a valid, non-zero, non-null UUID value to do the comparison.
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Prefix
+from .tree import prefix_tree_index
+
+
+#
+# Prefix tree index
+#
+
+
+@receiver(post_save, sender=Prefix)
+def update_prefix_tree_index(instance, raw=False, **kwargs):
+    """
+    Apply a saved Prefix to this process's prefix tree index, to be notified to other processes once committed or
+    discarded if rolled back.
+    """
+    if not settings.PREFIX_TREE_INDEX_ENABLED:
+        return
+    # Apply the changes logged earlier by other processes first, as this one will be logged after them. An index which
+    # has not been built yet will load the Prefix from the database on first use instead.
+    if prefix_tree_index.is_built:
+        prefix_tree_index.ensure_current()
+    change = prefix_tree_index.add(instance.pk, instance.vrf_id, instance.prefix)
+    prefix_tree_index.track_change(change, using=instance._state.db)
+
+
+@receiver(post_delete, sender=Prefix)
+def remove_from_prefix_tree_index(instance, **kwargs):
+    """
+    Remove a deleted Prefix from this process's prefix tree index, to be notified to other processes once committed or
+    discarded if rolled back.
+    """
+    if not settings.PREFIX_TREE_INDEX_ENABLED:
+        return
+    if prefix_tree_index.is_built:
+        prefix_tree_index.ensure_current()
+    change = prefix_tree_index.remove(instance.pk)
+    prefix_tree_index.track_change(change, using=instance._state.db)
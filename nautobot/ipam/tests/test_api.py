@@ -1,14 +1,18 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from concurrent.futures.thread import ThreadPoolExecutor
 import json
 from random import shuffle
 
+from django.contrib.contenttypes.models import ContentType
 from django.db import connection
 from django.urls import reverse
 from netaddr import IPNetwork
 from rest_framework import status
 
 from nautobot.dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site
-from nautobot.extras.models import Status
+from nautobot.extras.choices import ObjectChangeActionChoices
+from nautobot.extras.models import ObjectChange, Status
+from nautobot.ipam.api.views import _lock_prefixes
 from nautobot.ipam.choices import ServiceProtocolChoices
 from nautobot.ipam.models import (
     Aggregate,
@@ -251,6 +255,26 @@ class PrefixTest(APIViewTestCases.APIViewTestCase):
         # needs to be enhanced to use the actual API serializers when `api=True`
         cls.validation_excluded_fields = ["status"]
 
+    def test_utilization_include(self):
+        """
+        Test that prefix utilization is only returned when explicitly included.
+        """
+        prefix = Prefix.objects.create(prefix=IPNetwork("192.0.2.0/24"), status=self.status_active)
+        IPAddress.objects.create(address=IPNetwork("192.0.2.1/24"))
+        IPAddress.objects.create(address=IPNetwork("192.0.2.2/24"))
+        self.add_permissions("ipam.view_prefix")
+        url = reverse("ipam-api:prefix-detail", kwargs={"pk": prefix.pk})
+
+        response = self.client.get(url, **self.header)
+        self.assertNotIn("utilization", response.json())
+
+        response = self.client.get(url, data={"include": "utilization"}, **self.header)
+        self.assertEqual(response.json()["utilization"], {"numerator": 2, "denominator": 254})
+
+        response = self.client.get(reverse("ipam-api:prefix-list"), data={"include": "utilization"}, **self.header)
+        for result in response.json()["results"]:
+            self.assertIn("utilization", result)
+
     def test_list_available_prefixes(self):
         """
         Test retrieval of all available prefixes within a parent prefix.
@@ -340,6 +364,23 @@ class PrefixTest(APIViewTestCases.APIViewTestCase):
         self.assertHttpStatus(response, status.HTTP_201_CREATED)
         self.assertEqual(len(response.data), 4)
 
+    def test_create_mixed_length_available_prefixes(self):
+        """
+        Test that prefixes of differing lengths are allocated from the first available space large enough for each.
+        """
+        prefix = Prefix.objects.create(prefix=IPNetwork("192.0.2.0/28"), is_pool=True)
+        url = reverse("ipam-api:prefix-available-prefixes", kwargs={"pk": prefix.pk})
+        self.add_permissions("ipam.view_prefix", "ipam.add_prefix")
+
+        data = [
+            {"prefix_length": 30, "status": "active"},
+            {"prefix_length": 29, "status": "active"},
+            {"prefix_length": 30, "status": "active"},
+        ]
+        response = self.client.post(url, data, format="json", **self.header)
+        self.assertHttpStatus(response, status.HTTP_201_CREATED)
+        self.assertEqual([p["prefix"] for p in response.data], ["192.0.2.0/30", "192.0.2.8/29", "192.0.2.4/30"])
+
     def test_list_available_ips(self):
         """
         Test retrieval of all available IP addresses within a parent prefix.
@@ -388,6 +429,98 @@ class PrefixTest(APIViewTestCases.APIViewTestCase):
         self.assertHttpStatus(response, status.HTTP_204_NO_CONTENT)
         self.assertIn("detail", response.data)
 
+    def test_create_bulk_available_ips(self):
+        """
+        Test the allocation of available IP addresses across multiple parent prefixes in a single request.
+        """
+        vrf = VRF.objects.create(name="Test VRF 1", rd="1234")
+        prefix_1 = Prefix.objects.create(prefix=IPNetwork("192.0.2.0/30"), is_pool=True, status=self.status_active)
+        prefix_2 = Prefix.objects.create(prefix=IPNetwork("198.51.100.0/29"), vrf=vrf, status=self.status_active)
+        IPAddress.objects.create(address=IPNetwork("192.0.2.1/30"))
+        url = reverse("ipam-api:prefix-bulk-available-ips")
+        self.add_permissions("ipam.view_prefix", "ipam.add_ipaddress", "extras.view_status")
+
+        data = {
+            "prefixes": [str(prefix_1.pk), str(prefix_2.pk)],
+            "count": 5,
+            "status": "active",
+            "description": "Bulk IP",
+        }
+        response = self.client.post(url, data, format="json", **self.header)
+        self.assertHttpStatus(response, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [ip["address"] for ip in response.data],
+            ["192.0.2.0/30", "192.0.2.2/30", "192.0.2.3/30", "198.51.100.1/29", "198.51.100.2/29"],
+        )
+        self.assertEqual(response.data[3]["vrf"]["id"], str(vrf.pk))
+        self.assertTrue(all(ip["description"] == "Bulk IP" for ip in response.data))
+
+        # Each new IP address is change logged
+        self.assertEqual(
+            ObjectChange.objects.filter(
+                changed_object_type=ContentType.objects.get_for_model(IPAddress),
+                changed_object_id__in=[ip["id"] for ip in response.data],
+                action=ObjectChangeActionChoices.ACTION_CREATE,
+            ).count(),
+            5,
+        )
+
+        # Only four IPs remain available in the second prefix
+        response = self.client.post(url, data, format="json", **self.header)
+        self.assertHttpStatus(response, status.HTTP_204_NO_CONTENT)
+        self.assertIn("detail", response.data)
+        self.assertEqual(IPAddress.objects.net_host_contained(prefix_2.prefix).count(), 2)
+
+    def test_create_bulk_available_ips_nested(self):
+        """
+        Test that nested parent prefixes don't allocate the same IP address twice in a single request.
+        """
+        prefix_1 = Prefix.objects.create(prefix=IPNetwork("192.0.2.0/30"), is_pool=True, status=self.status_active)
+        prefix_2 = Prefix.objects.create(prefix=IPNetwork("192.0.2.0/29"), is_pool=True, status=self.status_active)
+        url = reverse("ipam-api:prefix-bulk-available-ips")
+        self.add_permissions("ipam.view_prefix", "ipam.add_ipaddress", "extras.view_status")
+
+        data = {"prefixes": [str(prefix_1.pk), str(prefix_2.pk)], "count": 8, "status": "active"}
+        response = self.client.post(url, data, format="json", **self.header)
+        self.assertHttpStatus(response, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [ip["address"] for ip in response.data], [f"192.0.2.{i}/{30 if i < 4 else 29}" for i in range(8)]
+        )
+
+        # A parent prefix may only be listed once
+        data["prefixes"].append(str(prefix_1.pk))
+        response = self.client.post(url, data, format="json", **self.header)
+        self.assertHttpStatus(response, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("prefixes", response.data)
+
+    def test_create_bulk_available_prefixes(self):
+        """
+        Test the allocation of available prefixes across multiple parent prefixes in a single request.
+        """
+        prefix_1 = Prefix.objects.create(prefix=IPNetwork("192.0.2.0/28"), status=self.status_active)
+        prefix_2 = Prefix.objects.create(prefix=IPNetwork("198.51.100.0/28"), status=self.status_active)
+        Prefix.objects.create(prefix=IPNetwork("192.0.2.4/30"), status=self.status_active)
+        url = reverse("ipam-api:prefix-bulk-available-prefixes")
+        self.add_permissions("ipam.view_prefix", "ipam.add_prefix", "extras.view_status")
+
+        data = {
+            "prefixes": [str(prefix_1.pk), str(prefix_2.pk)],
+            "count": 4,
+            "prefix_length": 30,
+            "status": "active",
+        }
+        response = self.client.post(url, data, format="json", **self.header)
+        self.assertHttpStatus(response, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [prefix["prefix"] for prefix in response.data],
+            ["192.0.2.0/30", "192.0.2.8/30", "192.0.2.12/30", "198.51.100.0/30"],
+        )
+
+        # An unknown parent prefix is rejected
+        data["prefixes"].append("00000000-0000-0000-0000-000000000000")
+        response = self.client.post(url, data, format="json", **self.header)
+        self.assertHttpStatus(response, status.HTTP_400_BAD_REQUEST)
+
     def test_create_multiple_available_ips(self):
         """
         Test the creation of available IP addresses within a parent prefix.
@@ -438,6 +571,61 @@ class ParallelPrefixTest(APITransactionTestCase):
         ips = [str(o) for o in IPAddress.objects.filter().all()]
         self.assertEqual(len(ips), len(set(ips)), "Duplicate IPs should not exist")
 
+    def test_create_multiple_available_ips_nested_parallel(self):
+        """
+        Allocations from nested prefixes are serialized as well, as they draw from the same addresses.
+        """
+        prefix = Prefix.objects.create(prefix=IPNetwork("192.0.2.0/29"), is_pool=True)
+        nested_prefix = Prefix.objects.create(prefix=IPNetwork("192.0.2.0/30"), is_pool=True)
+
+        # 4 IPs from each prefix
+        requests = [
+            (url, {"description": f"Test IP {i}", "status": "active"})
+            for url in (
+                reverse("ipam-api:prefix-available-ips", kwargs={"pk": prefix.pk}),
+                reverse("ipam-api:prefix-available-ips", kwargs={"pk": nested_prefix.pk}),
+            )
+            for i in range(1, 5)
+        ]
+
+        self._do_parallel_requests(None, requests)
+
+        hosts = [str(o.host) for o in IPAddress.objects.all()]
+        self.assertEqual(len(hosts), len(set(hosts)), "Duplicate IPs should not exist")
+
+    def test_create_available_ips_sibling_prefixes(self):
+        """
+        Allocations from sibling prefixes within the same covering prefix don't wait for each other.
+        """
+        Prefix.objects.create(prefix=IPNetwork("10.0.0.0/16"))
+        prefix_1 = Prefix.objects.create(prefix=IPNetwork("10.0.1.0/24"))
+        prefix_2 = Prefix.objects.create(prefix=IPNetwork("10.0.2.0/24"))
+        url = reverse("ipam-api:prefix-available-ips", kwargs={"pk": prefix_2.pk})
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with _lock_prefixes("available-ips", [prefix_1]):
+                future = executor.submit(self._threaded_post, url, {"status": "active"})
+                future.result(timeout=10)
+
+        self.assertEqual(IPAddress.objects.net_host_contained(prefix_2.prefix).count(), 1)
+
+    def test_create_available_ips_nested_prefixes(self):
+        """
+        Allocations from a prefix wait for any allocation from a prefix covering it.
+        """
+        prefix = Prefix.objects.create(prefix=IPNetwork("10.0.0.0/16"))
+        nested_prefix = Prefix.objects.create(prefix=IPNetwork("10.0.1.0/24"))
+        url = reverse("ipam-api:prefix-available-ips", kwargs={"pk": nested_prefix.pk})
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with _lock_prefixes("available-ips", [prefix]):
+                future = executor.submit(self._threaded_post, url, {"status": "active"})
+                with self.assertRaises(FutureTimeoutError):
+                    future.result(timeout=1)
+            future.result(timeout=10)
+
+        self.assertEqual(IPAddress.objects.net_host_contained(nested_prefix.prefix).count(), 1)
+
     def _do_parallel_requests(self, url, requests):
         # Randomize request order, such that test run more closely simulates
         # a real calling pattern.
@@ -445,7 +633,9 @@ class ParallelPrefixTest(APITransactionTestCase):
         with ThreadPoolExecutor(max_workers=len(requests)) as executor:
             futures = []
             for req in requests:
-                futures.append(executor.submit(self._threaded_post, url, req))
+                # Each request may be given as a (url, data) tuple to target different URLs
+                request_url, data = req if url is None else (url, req)
+                futures.append(executor.submit(self._threaded_post, request_url, data))
 
     def _threaded_post(self, url, data):
         try:
@@ -297,6 +297,50 @@ class TestPrefix(TestCase):
         IPAddress.objects.create(address=netaddr.IPNetwork("10.0.0.4/24"))
         self.assertEqual(parent_prefix.get_first_available_ip(), "10.0.0.5/24")
 
+    def test_iter_available_prefixes(self):
+
+        parent_prefix = Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.0.0/16"))
+        Prefix.objects.bulk_create(
+            (
+                Prefix(prefix=netaddr.IPNetwork("10.0.0.0/20")),
+                Prefix(prefix=netaddr.IPNetwork("10.0.0.0/24")),  # Overlaps the previous prefix
+                Prefix(prefix=netaddr.IPNetwork("10.0.32.0/20")),
+                Prefix(prefix=netaddr.IPNetwork("10.0.32.0/20")),  # Duplicate of the previous prefix
+                Prefix(prefix=netaddr.IPNetwork("10.0.255.255/32")),
+            )
+        )
+        available_prefixes = parent_prefix.iter_available_prefixes()
+
+        self.assertEqual(next(available_prefixes), netaddr.IPNetwork("10.0.16.0/20"))
+        self.assertEqual(
+            [netaddr.IPNetwork("10.0.16.0/20")] + list(available_prefixes),
+            list(parent_prefix.get_available_prefixes().iter_cidrs()),
+        )
+
+    def test_iter_available_ips(self):
+
+        parent_prefix = Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.0.0/29"))
+        IPAddress.objects.bulk_create(
+            (
+                IPAddress(address=netaddr.IPNetwork("10.0.0.1/29")),
+                IPAddress(address=netaddr.IPNetwork("10.0.0.1/32")),  # Duplicate host of the previous address
+                IPAddress(address=netaddr.IPNetwork("10.0.0.3/29")),
+            )
+        )
+        self.assertEqual(
+            list(parent_prefix.iter_available_ips()),
+            [netaddr.IPAddress(ip) for ip in ("10.0.0.2", "10.0.0.4", "10.0.0.5", "10.0.0.6")],
+        )
+
+        # Pools include the network and broadcast addresses
+        parent_prefix.is_pool = True
+        self.assertEqual(next(parent_prefix.iter_available_ips()), netaddr.IPAddress("10.0.0.0"))
+
+        # IPv6 prefixes are only read as far as needed
+        parent_prefix = Prefix.objects.create(prefix=netaddr.IPNetwork("2001:db8::/48"))
+        IPAddress.objects.create(address=netaddr.IPNetwork("2001:db8::/48"))
+        self.assertEqual(parent_prefix.get_first_available_ip(), "2001:db8::1/48")
+
     def test_get_utilization(self):
 
         # Container Prefix
@@ -1,6 +1,6 @@
 import netaddr
 
-from nautobot.ipam.models import Prefix, Aggregate, IPAddress, RIR
+from nautobot.ipam.models import Prefix, Aggregate, IPAddress, RIR, VRF
 from nautobot.utilities.testing import TestCase
 
 
@@ -72,6 +72,21 @@ class AggregateQuerysetTestCase(TestCase):
         prefix = self.queryset.net_equals(netaddr.IPNetwork("192.168.0.0/16"))[0]
         self.assertEqual(self.queryset.filter(prefix="192.168.0.0/16")[0], prefix)
 
+    def test_annotate_utilization(self):
+        vrf = VRF.objects.create(name="VRF 1")
+        Prefix.objects.create(prefix=netaddr.IPNetwork("192.168.0.0/16"))
+        Prefix.objects.create(prefix=netaddr.IPNetwork("192.168.1.0/24"))
+        Prefix.objects.create(prefix=netaddr.IPNetwork("192.168.2.0/24"), vrf=vrf)
+        Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.0.0/24"))
+        Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.0.0/24"))
+
+        for aggregate in self.queryset.annotate_utilization():
+            self.assertEqual(
+                aggregate.get_utilization(), Aggregate.objects.get(pk=aggregate.pk).get_utilization(), aggregate
+            )
+        self.assertEqual(self.queryset.annotate_utilization().get(prefix="192.168.0.0/16").utilization_numerator, 65536)
+        self.assertEqual(self.queryset.annotate_utilization().get(prefix="192.168.1.0/24").utilization_numerator, 256)
+
 
 class IPAddressQuerySet(TestCase):
     queryset = IPAddress.objects.all()
@@ -237,6 +252,24 @@ class PrefixQuerysetTestCase(TestCase):
         self.assertEqual(self.queryset.annotate_tree().get(prefix="fd78:da4f:e596:c217::/122").parents, 2)
         self.assertEqual(self.queryset.annotate_tree().get(prefix="fd78:da4f:e596:c217::/122").children, 0)
 
+    def test_annotate_utilization(self):
+        vrf = VRF.objects.create(name="VRF 1")
+        container = Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.0.0/16"), status=Prefix.STATUS_CONTAINER)
+        Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.0.0/24"))
+        Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.0.0/26"))
+        Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.2.0/24"), vrf=vrf)
+        Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.4.0/22"))
+        Prefix.objects.create(prefix=netaddr.IPNetwork("10.0.4.0/22"))
+        IPAddress.objects.create(address=netaddr.IPNetwork("10.0.0.1/24"))
+        IPAddress.objects.create(address=netaddr.IPNetwork("10.0.0.1/26"))
+        IPAddress.objects.create(address=netaddr.IPNetwork("10.0.0.2/24"))
+        IPAddress.objects.create(address=netaddr.IPNetwork("10.0.0.3/24"), vrf=vrf)
+
+        for prefix in self.queryset.annotate_utilization():
+            self.assertEqual(prefix.get_utilization(), Prefix.objects.get(pk=prefix.pk).get_utilization(), prefix)
+        self.assertEqual(self.queryset.annotate_utilization().get(pk=container.pk).utilization_numerator, 256 + 1024)
+        self.assertEqual(self.queryset.annotate_utilization().get(prefix="10.0.0.0/24").utilization_numerator, 2)
+
     def test_get_by_prefix(self):
         prefix = self.queryset.net_equals(netaddr.IPNetwork("192.168.0.0/16"))[0]
         self.assertEqual(self.queryset.get(prefix="192.168.0.0/16"), prefix)
@@ -0,0 +1,188 @@
+from unittest import mock
+
+import netaddr
+from django.core.cache import cache
+from django.db import transaction
+from django.test import override_settings
+
+from nautobot.extras.models import Status
+from nautobot.ipam.models import Aggregate, Prefix, RIR, VRF
+from nautobot.ipam.tree import PREFIX_TREE_CHANGE_CACHE_KEY, PrefixTree, PrefixTreeIndex, prefix_tree_index
+from nautobot.utilities.testing import TestCase
+
+
+class PrefixTreeTestCase(TestCase):
+    """Tests for the `nautobot.ipam.tree.PrefixTree` data structure."""
+
+    def setUp(self):
+        super().setUp()
+        self.tree = PrefixTree(32)
+        self.prefixes = {
+            "a": "10.0.0.0/8",
+            "b": "10.0.0.0/16",
+            "c": "10.0.1.0/24",
+            "d": "10.0.2.0/24",
+            "e": "10.0.2.128/25",
+            "f": "10.1.0.0/16",
+            "g": "10.0.1.0/24",  # duplicate of "c"
+        }
+        for pk, prefix in self.prefixes.items():
+            self.insert(pk, prefix)
+
+    def insert(self, pk, prefix):
+        prefix = netaddr.IPNetwork(prefix)
+        self.tree.insert(int(prefix.network), prefix.prefixlen, pk)
+
+    def remove(self, pk, prefix):
+        prefix = netaddr.IPNetwork(prefix)
+        return self.tree.remove(int(prefix.network), prefix.prefixlen, pk)
+
+    def query(self, method, prefix, **kwargs):
+        prefix = netaddr.IPNetwork(prefix)
+        return getattr(self.tree, method)(int(prefix.network), prefix.prefixlen, **kwargs)
+
+    def test_parent_count(self):
+        self.assertEqual(self.query("parent_count", "10.0.0.0/8"), 0)
+        self.assertEqual(self.query("parent_count", "10.0.0.0/16"), 1)
+        self.assertEqual(self.query("parent_count", "10.0.2.128/25"), 3)
+        self.assertEqual(self.query("parent_count", "10.0.1.0/24"), 2)
+        self.assertEqual(self.query("parent_count", "192.168.0.0/16"), 0)
+
+    def test_child_count_and_pks(self):
+        self.assertEqual(self.query("child_count", "10.0.0.0/8"), 6)
+        self.assertEqual(self.query("child_count", "10.0.0.0/16"), 4)
+        self.assertEqual(self.query("child_count", "10.0.0.0/23"), 2)
+        self.assertEqual(self.query("child_count", "10.0.2.128/25"), 0)
+        self.assertEqual(set(self.query("child_pks", "10.0.0.0/16")), {"c", "d", "e", "g"})
+        self.assertEqual(set(self.query("child_pks", "10.0.2.0/24")), {"e"})
+        self.assertEqual(set(self.query("child_pks", "192.168.0.0/16")), set())
+
+    def test_covered(self):
+        # 10.0.1.0/24 (counted once despite the duplicate) and 10.0.2.0/24
+        self.assertEqual(self.query("covered", "10.0.0.0/16"), 512)
+        self.assertEqual(self.query("covered", "10.0.0.0/16", include_self=True), 65536)
+        self.assertEqual(self.query("covered", "10.0.2.0/24"), 128)
+        self.assertEqual(self.query("covered", "10.0.0.0/8"), 2 * 65536)
+
+    def test_available(self):
+        available = [
+            netaddr.IPNetwork((network, prefix_length))
+            for network, prefix_length in self.query("available", "10.0.0.0/16")
+        ]
+        expected = netaddr.IPSet(["10.0.0.0/16"]) - netaddr.IPSet(["10.0.1.0/24", "10.0.2.0/24"])
+        self.assertEqual(available, list(expected.iter_cidrs()))
+
+        available = list(self.query("available", "10.0.2.128/25"))
+        self.assertEqual(available, [(int(netaddr.IPAddress("10.0.2.128")), 25)])
+
+    def test_remove(self):
+        self.assertTrue(self.remove("c", "10.0.1.0/24"))
+        self.assertFalse(self.remove("c", "10.0.1.0/24"))
+        self.assertEqual(self.query("child_count", "10.0.0.0/16"), 3)
+        self.assertEqual(self.query("covered", "10.0.0.0/16"), 512)
+
+        self.assertTrue(self.remove("g", "10.0.1.0/24"))
+        self.assertEqual(self.query("covered", "10.0.0.0/16"), 256)
+
+        for pk, prefix in self.prefixes.items():
+            self.remove(pk, prefix)
+        self.assertEqual(len(self.tree), 0)
+        self.assertEqual(self.tree.root.children, [None, None])
+
+
+@override_settings(PREFIX_TREE_INDEX_ENABLED=True)
+class PrefixTreeIndexTestCase(TestCase):
+    """Tests for Prefix and Aggregate methods backed by the prefix tree index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vrf = VRF.objects.create(name="VRF 1")
+        cls.container = Prefix.objects.create(prefix="10.0.0.0/16", status=Prefix.STATUS_CONTAINER)
+        Prefix.objects.create(prefix="10.0.0.0/24")
+        Prefix.objects.create(prefix="10.0.0.0/26")
+        Prefix.objects.create(prefix="10.0.2.0/24", vrf=cls.vrf)
+        Prefix.objects.create(prefix="10.0.4.0/22")
+        Prefix.objects.create(prefix="10.0.4.0/22")
+
+    def setUp(self):
+        super().setUp()
+        # The index is process-wide, so discard any state left behind by other tests
+        prefix_tree_index.rebuild()
+
+    def test_annotate_tree(self):
+        queryset = Prefix.objects.annotate_tree()
+        self.assertEqual(queryset.get(pk=self.container.pk).parents, 0)
+        self.assertEqual(queryset.get(pk=self.container.pk).children, 4)
+        self.assertEqual(queryset.get(prefix="10.0.0.0/26").parents, 2)
+        self.assertEqual(queryset.get(prefix="10.0.2.0/24").parents, 0)
+        self.assertEqual(queryset.order_by("-children").first().pk, self.container.pk)
+
+    def test_get_utilization(self):
+        self.assertEqual(self.container.get_utilization(), (256 + 1024, 65536))
+
+        Prefix.objects.create(prefix="10.0.128.0/17")
+        self.assertEqual(self.container.get_utilization(), (256 + 1024 + 32768, 65536))
+
+        Prefix.objects.get(prefix="10.0.128.0/17").delete()
+        self.assertEqual(self.container.get_utilization(), (256 + 1024, 65536))
+
+    def test_rollback(self):
+        """Changes applied to the index are discarded when their transaction or savepoint is rolled back."""
+
+        class Rollback(Exception):
+            pass
+
+        prefix = Prefix.objects.get(prefix="10.0.0.0/26")
+        with self.assertRaises(Rollback):
+            with transaction.atomic():
+                Prefix.objects.create(prefix="10.0.128.0/17")
+                prefix.delete()
+                # The changes are visible within the transaction
+                self.assertEqual(self.container.get_utilization(), (256 + 1024 + 32768, 65536))
+                self.assertEqual(Prefix.objects.annotate_tree().get(prefix="10.0.0.0/24").children, 0)
+                raise Rollback
+
+        self.assertEqual(self.container.get_utilization(), (256 + 1024, 65536))
+        self.assertEqual(Prefix.objects.annotate_tree().get(prefix="10.0.0.0/24").children, 1)
+
+    def test_catch_up(self):
+        """Other processes apply committed changes from the change log, rebuilding only if it no longer covers them."""
+        other_index = PrefixTreeIndex()
+        other_index.rebuild()
+        prefix = netaddr.IPNetwork("10.0.0.0/16")
+
+        # Run on_commit callbacks right away, as if each change was committed
+        with mock.patch.object(transaction, "on_commit", side_effect=lambda func, using=None: func()):
+            Prefix.objects.create(prefix="10.0.128.0/17")
+            Prefix.objects.get(prefix="10.0.0.0/26").delete()
+
+        with mock.patch.object(other_index, "rebuild") as rebuild:
+            other_index.ensure_current()
+            rebuild.assert_not_called()
+        self.assertEqual(other_index.version, prefix_tree_index.version)
+        self.assertEqual(other_index.get_child_count(prefix), prefix_tree_index.get_child_count(prefix))
+        self.assertEqual(other_index.get_covered_size(prefix), 256 + 1024 + 32768)
+
+        # A process lagging behind changes which have expired from the log rebuilds its index
+        lagging_index = PrefixTreeIndex()
+        lagging_index.rebuild()
+        with mock.patch.object(transaction, "on_commit", side_effect=lambda func, using=None: func()):
+            Prefix.objects.get(prefix="10.0.128.0/17").delete()
+        cache.delete(PREFIX_TREE_CHANGE_CACHE_KEY.format(prefix_tree_index.version))
+        with mock.patch.object(lagging_index, "rebuild") as rebuild:
+            lagging_index.ensure_current()
+            rebuild.assert_called_once()
+
+    def test_get_available_prefixes(self):
+        # As a global container, children in any VRF are considered
+        expected = netaddr.IPSet(["10.0.0.0/16"]) - netaddr.IPSet(["10.0.0.0/24", "10.0.2.0/24", "10.0.4.0/22"])
+        self.assertEqual(self.container.get_available_prefixes(), expected)
+        self.assertEqual(self.container.get_first_available_prefix(), netaddr.IPNetwork("10.0.1.0/24"))
+
+        self.container.status = Status.objects.get_for_model(Prefix).get(slug="active")
+        self.assertEqual(self.container.get_first_available_prefix(), netaddr.IPNetwork("10.0.1.0/24"))
+        self.assertIn(netaddr.IPNetwork("10.0.2.0/24"), self.container.get_available_prefixes())
+
+    def test_aggregate_get_utilization(self):
+        aggregate = Aggregate.objects.create(prefix="10.0.0.0/8", rir=RIR.objects.create(name="RIR 1", slug="rir-1"))
+        self.assertEqual(aggregate.get_utilization(), (65536, 16777216))
@@ -0,0 +1,529 @@
+"""
+In-memory radix tree index of `Prefix` objects.
+
+When `settings.PREFIX_TREE_INDEX_ENABLED` is True, each Nautobot process keeps a path-compressed binary (Patricia) tree
+of all Prefixes, one tree per VRF and IP version, plus one tree spanning all VRFs. Each tree node caches the number of
+Prefixes below it and the number of addresses covered by their union, so that hierarchy (parent/child counts),
+utilization and free-space questions are answered by walking at most one root-to-leaf path (bounded by the address
+width) instead of loading every child Prefix from the database and building an `IPSet` from it.
+
+The index is kept in sync within a process by the `post_save`/`post_delete` signal handlers in `nautobot.ipam.signals`,
+which apply each change right away (so that the rest of the transaction sees it) and discard it by rebuilding the index
+if the transaction (or savepoint) making it is rolled back. Once committed, changes are appended to a change log shared
+through the Django cache, each under the next value of a version counter; other processes apply the changes logged since
+their local version on next use, and only rebuild their index from the database if some of these changes have expired
+from the log. Changes that bypass signals (such as `bulk_create()` or `QuerySet.update()`) are not tracked; run
+`nautobot-server rebuild_prefix_tree` after such changes.
+"""
+import logging
+import threading
+
+import netaddr
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+logger = logging.getLogger("nautobot.ipam.tree")
+
+# Cache key of the shared index version, incremented for every Prefix change committed.
+PREFIX_TREE_VERSION_CACHE_KEY = "nautobot.ipam.prefix_tree.version"
+
+# Cache key of the change log entry of each version.
+PREFIX_TREE_CHANGE_CACHE_KEY = "nautobot.ipam.prefix_tree.change.{}"
+
+# Maximum number of logged changes a process applies to catch up, and number of seconds each change is kept in the log;
+# a process lagging further behind rebuilds its index from the database instead.
+PREFIX_TREE_CHANGE_LOG_SIZE = 10000
+PREFIX_TREE_CHANGE_LOG_TIMEOUT = 24 * 60 * 60
+
+# Pseudo-VRF key of the trees spanning every VRF (including the global table).
+ANY_VRF = "*"
+
+
+class PrefixTreeNode:
+    """A single node of a `PrefixTree`; "glue" nodes (which only join two branches) have no `pks`."""
+
+    __slots__ = ("network", "prefix_length", "children", "pks", "count", "covered")
+
+    def __init__(self, network, prefix_length):
+        self.network = network
+        self.prefix_length = prefix_length
+        self.children = [None, None]
+        self.pks = set()
+        # Number of Prefixes stored at or below this node
+        self.count = 0
+        # Number of addresses covered by the union of all Prefixes stored at or below this node
+        self.covered = 0
+
+
+class PrefixTree:
+    """
+    Path-compressed binary radix tree of network prefixes of a single IP version.
+
+    Networks are handled as integers (with host bits cleared) and prefix lengths, and every network may be stored
+    multiple times under different primary keys to support duplicate Prefixes.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self.root = PrefixTreeNode(0, 0)
+
+    def __len__(self):
+        return self.root.count
+
+    def _bit(self, network, position):
+        """Return the bit of `network` at `position` (counting from the most significant bit)."""
+        return (network >> (self.width - 1 - position)) & 1
+
+    def _mask(self, network, prefix_length):
+        """Clear all bits of `network` beyond `prefix_length`."""
+        host_bits = self.width - prefix_length
+        return (network >> host_bits) << host_bits
+
+    def _common_length(self, network_a, network_b):
+        """Return the length of the common leading bits of the two given networks."""
+        return self.width - (network_a ^ network_b).bit_length()
+
+    def _size(self, prefix_length):
+        return 1 << (self.width - prefix_length)
+
+    def _refresh(self, node):
+        """Recompute the cached `count` and `covered` values of `node` from its children."""
+        children = [child for child in node.children if child is not None]
+        node.count = len(node.pks) + sum(child.count for child in children)
+        if node.pks:
+            node.covered = self._size(node.prefix_length)
+        else:
+            node.covered = sum(child.covered for child in children)
+
+    def insert(self, network, prefix_length, pk):
+        """Store `pk` under the given network."""
+        path = []
+        node = self.root
+        while True:
+            path.append(node)
+            if node.prefix_length == prefix_length:
+                node.pks.add(pk)
+                break
+
+            bit = self._bit(network, node.prefix_length)
+            child = node.children[bit]
+            if child is None:
+                leaf = PrefixTreeNode(network, prefix_length)
+                leaf.pks.add(pk)
+                node.children[bit] = leaf
+                path.append(leaf)
+                break
+
+            common = min(self._common_length(child.network, network), child.prefix_length, prefix_length)
+            if common == child.prefix_length:
+                node = child
+                continue
+
+            if common == prefix_length:
+                # The new network is a supernet of the existing child; insert it between the two.
+                new_node = PrefixTreeNode(network, prefix_length)
+                new_node.pks.add(pk)
+                new_node.children[self._bit(child.network, prefix_length)] = child
+                node.children[bit] = new_node
+                path.append(new_node)
+                break
+
+            # The two networks diverge before either one ends; join them under a new glue node.
+            glue = PrefixTreeNode(self._mask(network, common), common)
+            leaf = PrefixTreeNode(network, prefix_length)
+            leaf.pks.add(pk)
+            glue.children[self._bit(child.network, common)] = child
+            glue.children[self._bit(network, common)] = leaf
+            node.children[bit] = glue
+            path.extend((glue, leaf))
+            break
+
+        for node in reversed(path):
+            self._refresh(node)
+
+    def remove(self, network, prefix_length, pk):
+        """Remove `pk` from the given network, pruning nodes which are no longer needed."""
+        path, node = self._descend(network, prefix_length)
+        if node is None or node.prefix_length != prefix_length or pk not in node.pks:
+            return False
+        node.pks.discard(pk)
+        path.append(node)
+
+        # Drop empty leaves and splice out nodes left with a single branch (the root is never removed)
+        for i in range(len(path) - 1, 0, -1):
+            node, parent = path[i], path[i - 1]
+            if node.pks:
+                break
+            children = [child for child in node.children if child is not None]
+            if len(children) > 1:
+                break
+            index = 0 if parent.children[0] is node else 1
+            parent.children[index] = children[0] if children else None
+
+        for node in reversed(path):
+            self._refresh(node)
+        return True
+
+    def _descend(self, network, prefix_length):
+        """
+        Walk down the tree towards the given network.
+
+        Returns a tuple of the list of nodes which strictly contain the network, and the topmost node which is equal
+        to or contained within it (or None if no such node exists).
+        """
+        ancestors = []
+        node = self.root
+        while node is not None:
+            if node.prefix_length >= prefix_length:
+                if self._mask(node.network, prefix_length) == network:
+                    return ancestors, node
+                return ancestors, None
+            if self._mask(network, node.prefix_length) != node.network:
+                return ancestors, None
+            ancestors.append(node)
+            node = node.children[self._bit(network, node.prefix_length)]
+        return ancestors, None
+
+    def parent_count(self, network, prefix_length):
+        """Return the number of stored networks which strictly contain the given network."""
+        ancestors, _ = self._descend(network, prefix_length)
+        return sum(len(node.pks) for node in ancestors)
+
+    def child_count(self, network, prefix_length):
+        """Return the number of stored networks which are strictly contained within the given network."""
+        _, node = self._descend(network, prefix_length)
+        if node is None:
+            return 0
+        if node.prefix_length == prefix_length:
+            return node.count - len(node.pks)
+        return node.count
+
+    def child_pks(self, network, prefix_length):
+        """Yield the primary keys of all stored networks strictly contained within the given network."""
+        _, node = self._descend(network, prefix_length)
+        if node is None:
+            return
+        if node.prefix_length == prefix_length:
+            stack = [child for child in node.children if child is not None]
+        else:
+            stack = [node]
+        while stack:
+            node = stack.pop()
+            yield from node.pks
+            stack.extend(child for child in node.children if child is not None)
+
+    def covered(self, network, prefix_length, include_self=False):
+        """
+        Return the number of addresses of the given network covered by the union of stored networks within it.
+
+        Only strictly contained networks are considered unless `include_self` is True.
+        """
+        _, node = self._descend(network, prefix_length)
+        if node is None:
+            return 0
+        if node.prefix_length == prefix_length and not (include_self and node.pks):
+            return sum(child.covered for child in node.children if child is not None)
+        return node.covered
+
+    def available(self, network, prefix_length):
+        """
+        Yield `(network, prefix_length)` tuples of the largest blocks within the given network that are not covered
+        by any strictly contained stored network, in ascending order of address.
+        """
+        _, node = self._descend(network, prefix_length)
+        if node is not None and node.prefix_length == prefix_length:
+            yield from self._available_below(network, prefix_length, node)
+        else:
+            yield from self._available_within(network, prefix_length, node)
+
+    def _available_within(self, network, prefix_length, node):
+        """Yield free blocks within a region whose topmost stored node is `node` (or None)."""
+        if node is None or not node.covered:
+            yield network, prefix_length
+        elif node.prefix_length == prefix_length:
+            if not node.pks:
+                yield from self._available_below(network, prefix_length, node)
+        else:
+            # `node` lies within one half of the region; the other half is entirely free.
+            node_half = self._bit(node.network, prefix_length)
+            for half in (0, 1):
+                half_network = network | (half << (self.width - prefix_length - 1))
+                yield from self._available_within(half_network, prefix_length + 1, node if half == node_half else None)
+
+    def _available_below(self, network, prefix_length, node):
+        """Yield free blocks within a region exactly matching `node`, disregarding the node's own entries."""
+        if not any(node.children):
+            yield network, prefix_length
+            return
+        for half in (0, 1):
+            half_network = network | (half << (self.width - prefix_length - 1))
+            yield from self._available_within(half_network, prefix_length + 1, node.children[half])
+
+
+class PrefixTreeIndex:
+    """
+    Collection of `PrefixTree`s covering all Prefixes, keyed by VRF (or `ANY_VRF`) and IP version.
+
+    Public methods take and return `netaddr.IPNetwork` objects and VRF primary keys (None being the global table).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._trees = {}
+        self._members = {}
+        self.version = None
+        self.is_built = False
+        self.is_stale = False
+        # Changes applied but not yet committed, as (database connection, on_commit callback, index of the callback
+        # among the connection's on_commit callbacks, list of changes) tuples
+        self._pending = []
+
+    def __len__(self):
+        return len(self._members)
+
+    def _get_tree(self, vrf_id, version, create=False):
+        key = (vrf_id, version)
+        if key not in self._trees and create:
+            self._trees[key] = PrefixTree(32 if version == 4 else 128)
+        return self._trees.get(key)
+
+    def _add(self, pk, vrf_id, prefix):
+        prefix = netaddr.IPNetwork(prefix).cidr
+        member = (vrf_id, prefix.version, int(prefix.network), prefix.prefixlen)
+        self._members[pk] = member
+        for key in (vrf_id, ANY_VRF):
+            self._get_tree(key, prefix.version, create=True).insert(member[2], member[3], pk)
+
+    def _remove(self, pk):
+        member = self._members.pop(pk, None)
+        if member is None:
+            return
+        vrf_id, version, network, prefix_length = member
+        for key in (vrf_id, ANY_VRF):
+            self._get_tree(key, version).remove(network, prefix_length, pk)
+
+    def _apply(self, change):
+        """Apply a change tuple, as logged by `track_change()`."""
+        if change[0] == "add":
+            _, pk, vrf_id, prefix = change
+            self._remove(pk)
+            self._add(pk, vrf_id, prefix)
+        elif change[0] == "remove":
+            self._remove(change[1])
+
+    def add(self, pk, vrf_id, prefix):
+        """Add (or move) the Prefix with the given primary key, returning the change applied."""
+        change = ("add", pk, vrf_id, str(prefix))
+        with self._lock:
+            self._apply(change)
+        return change
+
+    def remove(self, pk):
+        """Remove the Prefix with the given primary key, if present, returning the change applied."""
+        change = ("remove", pk)
+        with self._lock:
+            self._apply(change)
+        return change
+
+    def rebuild(self):
+        """Rebuild the index from the database."""
+        from nautobot.ipam.models import Prefix
+
+        with self._lock:
+            # Read the shared version *before* loading Prefixes, so that concurrently logged changes are replayed on top.
+            version = cache.get(PREFIX_TREE_VERSION_CACHE_KEY, 0)
+            self._trees = {}
+            self._members = {}
+            prefixes = Prefix.objects.order_by().values_list("pk", "vrf_id", "network", "prefix_length")
+            for pk, vrf_id, network, prefix_length in prefixes.iterator():
+                self._add(pk, vrf_id, f"{network}/{prefix_length}")
+            self.version = version
+            self.is_built = True
+            self.is_stale = False
+            logger.debug("Rebuilt prefix tree index of %d prefixes at version %s", len(self._members), version)
+
+    def track_change(self, change, using=None):
+        """
+        Follow the outcome of the transaction in which a change (as returned by `add()` or `remove()`) was just applied
+        to the index: append it to the shared change log once it is committed, or discard it (by rebuilding the index on
+        next use) if it is rolled back.
+        """
+        connection = transaction.get_connection(using)
+
+        with self._lock:
+            if self._pending and connection.in_atomic_block:
+                # A change already tracked in the same transaction and savepoint shares the fate of this one
+                last_connection, last_callback, index, changes = self._pending[-1]
+                hooks = connection.run_on_commit
+                if (
+                    last_connection is connection
+                    and index < len(hooks)
+                    and hooks[index][1] is last_callback
+                    and hooks[index][0] == set(connection.savepoint_ids)
+                ):
+                    changes.append(change)
+                    return
+
+            changes = [change]
+
+            def on_commit():
+                with self._lock:
+                    self._pending = [entry for entry in self._pending if entry[1] is not on_commit]
+                self.publish(changes)
+
+            self._pending.append((connection, on_commit, len(connection.run_on_commit), changes))
+
+        transaction.on_commit(on_commit, using=using)
+
+    def _discard_rolled_back(self):
+        """
+        Mark the index as stale if any change applied to it has been rolled back, i.e. its transaction is over (or its
+        savepoint was rolled back) without its on_commit callback having been run.
+        """
+        if not self._pending:
+            return
+        registered = {}
+        pending = []
+        for entry in self._pending:
+            connection, callback = entry[:2]
+            if connection not in registered:
+                in_transaction = connection.in_atomic_block
+                registered[connection] = {id(hook[1]) for hook in connection.run_on_commit} if in_transaction else set()
+            if id(callback) in registered[connection]:
+                pending.append(entry)
+            else:
+                self.is_stale = True
+        self._pending = pending
+
+    def _catch_up(self):
+        """
+        Apply the changes logged since the local version, returning False if they are no longer all available (or if a
+        rebuild was requested), in which case the index must be rebuilt instead.
+        """
+        version = cache.get(PREFIX_TREE_VERSION_CACHE_KEY, 0)
+        if version == self.version:
+            return True
+        if self.version is None or not 0 < version - self.version <= PREFIX_TREE_CHANGE_LOG_SIZE:
+            return False
+
+        keys = [PREFIX_TREE_CHANGE_CACHE_KEY.format(v) for v in range(self.version + 1, version + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) < len(keys) or any(change[0] == "rebuild" for change in changes.values()):
+            return False
+        for key in keys:
+            self._apply(changes[key])
+        self.version = version
+        logger.debug("Applied %d changes to the prefix tree index, now at version %s", len(keys), version)
+        return True
+
+    def ensure_current(self):
+        """
+        Apply the changes logged by any process since the index was last updated, or rebuild the index if it has not
+        been built yet, if changes applied to it were rolled back, or if the logged changes are no longer available.
+        """
+        with self._lock:
+            self._discard_rolled_back()
+            if self.is_built and not self.is_stale and self._catch_up():
+                return
+            self.rebuild()
+
+    def publish(self, changes):
+        """
+        Append the given committed changes to the shared change log, for every process (including this one, which
+        replays them in order with any changes logged concurrently by other processes) to apply.
+        """
+        cache.add(PREFIX_TREE_VERSION_CACHE_KEY, 0, timeout=None)
+        last_version = cache.incr(PREFIX_TREE_VERSION_CACHE_KEY, len(changes))
+        first_version = last_version - len(changes) + 1
+        cache.set_many(
+            {
+                PREFIX_TREE_CHANGE_CACHE_KEY.format(version): change
+                for version, change in enumerate(changes, start=first_version)
+            },
+            timeout=PREFIX_TREE_CHANGE_LOG_TIMEOUT,
+        )
+        with self._lock:
+            if self.is_built and not self.is_stale and not self._catch_up():
+                self.is_stale = True
+
+    def request_rebuild(self):
+        """Have every process (including this one) rebuild its index from the database on next use."""
+        self.publish([("rebuild",)])
+
+    def _get_query_tree(self, prefix, vrf_id, any_vrf):
+        return self._get_tree(ANY_VRF if any_vrf else vrf_id, prefix.version)
+
+    def get_parent_count(self, prefix, vrf_id=None):
+        """Return the number of Prefixes in the same VRF which strictly contain `prefix`."""
+        prefix = netaddr.IPNetwork(prefix).cidr
+        with self._lock:
+            tree = self._get_query_tree(prefix, vrf_id, False)
+            return tree.parent_count(int(prefix.network), prefix.prefixlen) if tree else 0
+
+    def get_child_count(self, prefix, vrf_id=None, any_vrf=False):
+        """Return the number of Prefixes in the same VRF (or any VRF) strictly contained within `prefix`."""
+        prefix = netaddr.IPNetwork(prefix).cidr
+        with self._lock:
+            tree = self._get_query_tree(prefix, vrf_id, any_vrf)
+            return tree.child_count(int(prefix.network), prefix.prefixlen) if tree else 0
+
+    def get_child_pks(self, prefix, vrf_id=None, any_vrf=False):
+        """Return a list of the primary keys of all Prefixes strictly contained within `prefix`."""
+        prefix = netaddr.IPNetwork(prefix).cidr
+        with self._lock:
+            tree = self._get_query_tree(prefix, vrf_id, any_vrf)
+            return list(tree.child_pks(int(prefix.network), prefix.prefixlen)) if tree else []
+
+    def get_covered_size(self, prefix, vrf_id=None, any_vrf=False, include_self=False):
+        """Return the number of addresses within `prefix` covered by (strictly) contained Prefixes."""
+        prefix = netaddr.IPNetwork(prefix).cidr
+        with self._lock:
+            tree = self._get_query_tree(prefix, vrf_id, any_vrf)
+            return tree.covered(int(prefix.network), prefix.prefixlen, include_self=include_self) if tree else 0
+
+    def get_available_prefixes(self, prefix, vrf_id=None, any_vrf=False):
+        """Return the list of largest `netaddr.IPNetwork` blocks within `prefix` not covered by contained Prefixes."""
+        prefix = netaddr.IPNetwork(prefix).cidr
+        with self._lock:
+            tree = self._get_query_tree(prefix, vrf_id, any_vrf)
+            if tree is None:
+                return [prefix]
+            return [
+                netaddr.IPNetwork((network, prefix_length), version=prefix.version)
+                for network, prefix_length in tree.available(int(prefix.network), prefix.prefixlen)
+            ]
+
+    def get_first_available_prefix(self, prefix, vrf_id=None, any_vrf=False, prefix_length=None):
+        """
+        Return the first available block within `prefix` (or None).
+
+        If `prefix_length` is given, return the first available child prefix of exactly that length instead.
+        """
+        prefix = netaddr.IPNetwork(prefix).cidr
+        with self._lock:
+            tree = self._get_query_tree(prefix, vrf_id, any_vrf)
+            if tree is None:
+                blocks = [(int(prefix.network), prefix.prefixlen)]
+            else:
+                blocks = tree.available(int(prefix.network), prefix.prefixlen)
+            for network, block_length in blocks:
+                if prefix_length is None or block_length <= prefix_length:
+                    return netaddr.IPNetwork(
+                        (network, prefix_length if prefix_length is not None else block_length), version=prefix.version
+                    )
+        return None
+
+
+prefix_tree_index = PrefixTreeIndex()
+
+
+def get_prefix_tree_index():
+    """
+    Return the up-to-date process-wide `PrefixTreeIndex`, or None if `settings.PREFIX_TREE_INDEX_ENABLED` is False.
+    """
+    if not settings.PREFIX_TREE_INDEX_ENABLED:
+        return None
+    prefix_tree_index.ensure_current()
+    return prefix_tree_index
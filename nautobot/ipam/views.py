@@ -1,3 +1,4 @@
+import netaddr
 from django.db.models import Prefetch, Q, Count, F
 from django.db.models.expressions import RawSQL
 from django.shortcuts import get_object_or_404, redirect, render
@@ -213,7 +214,7 @@ class AggregateListView(generic.ObjectListView):
             "AND ipam_prefix.broadcast <= ipam_aggregate.broadcast",
             (),
         )
-    )
+    ).annotate_utilization()
     filterset = filters.AggregateFilterSet
     filterset_form = forms.AggregateFilterForm
     table = tables.AggregateDetailTable
@@ -223,12 +224,14 @@ class AggregateListView(generic.ObjectListView):
         ipv4_total = 0
         ipv6_total = 0
 
-        for aggregate in self.queryset:
-            if aggregate.prefix.version == 6:
+        # Only the prefixes are needed here, so avoid computing the annotations for every aggregate
+        for network, prefix_length in self.queryset.values_list("network", "prefix_length"):
+            prefix = netaddr.IPNetwork(f"{network}/{prefix_length}")
+            if prefix.version == 6:
                 # Report equivalent /64s for IPv6 to keep things sane
-                ipv6_total += int(aggregate.prefix.size / 2 ** 64)
+                ipv6_total += int(prefix.size / 2 ** 64)
             else:
-                ipv4_total += aggregate.prefix.size
+                ipv4_total += prefix.size
 
         return {
             "ipv4_total": ipv4_total,
@@ -420,13 +423,17 @@ class PrefixListView(generic.ObjectListView):
             return self._queryset
 
         if get_settings_or_config("DISABLE_PREFIX_LIST_HIERARCHY"):
-            self._queryset = Prefix.objects.annotate(parents=Count(None)).order_by(
-                F("vrf__name").asc(nulls_first=True),
-                "network",
-                "prefix_length",
+            self._queryset = (
+                Prefix.objects.annotate(parents=Count(None))
+                .order_by(
+                    F("vrf__name").asc(nulls_first=True),
+                    "network",
+                    "prefix_length",
+                )
+                .annotate_utilization()
             )
         else:
-            self._queryset = Prefix.objects.annotate_tree()
+            self._queryset = Prefix.objects.annotate_tree().annotate_utilization()
 
         return self._queryset
 
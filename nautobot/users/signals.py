@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.signals import request_started
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from nautobot.core.authentication import object_permission_cache
+from .models import ObjectPermission
+
+
+User = get_user_model()
+
+
+def invalidate_object_permission_cache(**kwargs):
+    """
+    Invalidate the cached permissions of all users when an ObjectPermission, its assignments or group memberships change.
+    """
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+    object_permission_cache.changed()
+
+
+post_save.connect(invalidate_object_permission_cache, sender=ObjectPermission)
+post_delete.connect(invalidate_object_permission_cache, sender=ObjectPermission)
+for through in (
+    ObjectPermission.object_types.through,
+    ObjectPermission.groups.through,
+    ObjectPermission.users.through,
+    User.groups.through,
+):
+    m2m_changed.connect(invalidate_object_permission_cache, sender=through)
+post_delete.connect(invalidate_object_permission_cache, sender=Group)
+post_delete.connect(invalidate_object_permission_cache, sender=User)
+
+request_started.connect(object_permission_cache.expire)
@@ -0,0 +1,284 @@
+"""
+Engine for the bulk import of objects from CSV data.
+
+`BulkImportView` used to bind a form to each row of CSV data and save it on its own, so that each `CSVModelChoiceField`
+of each row looked up its related object with a query, and the first invalid row aborted the whole import.
+`CSVImporter` instead processes the rows in chunks: the objects referenced by all of the rows of a chunk are retrieved
+with a single query per field (see `CSVLookupCache`), and, where the view allows it, the valid rows of the chunk are
+checked for uniqueness together and inserted with a single `bulk_create()`. The errors of every invalid row are
+collected rather than raised.
+"""
+import collections
+import functools
+import operator
+
+from django.conf import settings
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import connection, IntegrityError, models, transaction
+from django.db.models import Q
+
+from nautobot.utilities.forms import CSVLookupCache, CSVModelChoiceField, CSVModelForm, restrict_form_fields
+from nautobot.utilities.permissions import get_permission_for_model, get_permitted_pks
+
+
+class CSVImporter:
+    """
+    Create objects from rows of CSV data (as parsed by `CSVDataField` or `CSVFileField`), validating each row with a
+    `CSVModelForm`.
+
+    :param model_form: The CSVModelForm class used to validate each row
+    :param headers: Dictionary of column headers, mapping field names to the attribute by which they match a related
+        object (if any)
+    :param request: The request on behalf of which the objects are created
+    :param save_obj: Callable which saves a valid form and returns the new object (default: `form.save()`)
+    :param bulk_create: Whether valid rows may be inserted with `bulk_create()`, bypassing the `save()` method of the
+        model (and `save_obj`) and its `pre_save`/`post_save` signals; rows are otherwise saved one at a time
+    :param atomic: If True, no object is created unless all rows are valid
+    :param progress_callback: Callable called with the number of rows processed so far and the total number of rows,
+        after each chunk of rows
+    :param chunk_size: Number of rows validated and inserted together (default: `settings.CSV_IMPORT_CHUNK_SIZE`)
+    """
+
+    def __init__(
+        self,
+        model_form,
+        headers,
+        request,
+        save_obj=None,
+        bulk_create=False,
+        atomic=True,
+        progress_callback=None,
+        chunk_size=None,
+    ):
+        self.model_form = model_form
+        self.model = model_form._meta.model
+        self.headers = headers
+        self.request = request
+        self.save_obj = save_obj or (lambda form: form.save())
+        self.bulk_create = bulk_create
+        self.atomic = atomic
+        self.progress_callback = progress_callback
+        self.chunk_size = chunk_size or settings.CSV_IMPORT_CHUNK_SIZE
+        self.permission = get_permission_for_model(self.model, "add")
+
+        # Uniqueness can be validated for many objects at once, unless the model or the form customizes it
+        self.defer_unique_validation = (
+            issubclass(model_form, CSVModelForm)
+            and model_form.validate_unique is CSVModelForm.validate_unique
+            and self.model.validate_unique is models.Model.validate_unique
+        )
+
+        # The fields whose related objects can be retrieved in bulk
+        self.lookup_fields = [
+            name
+            for name, field in model_form.base_fields.items()
+            if isinstance(field, CSVModelChoiceField) and not getattr(field, "STATIC_CHOICES", False)
+        ]
+
+    def run(self, records):
+        """
+        Import the given records, returning a list of the objects created and a dictionary mapping the number of each
+        invalid row (starting at 1) to a list of its error messages.
+        """
+        created = []
+        bulk_created = []
+        errors = {}
+
+        with transaction.atomic():
+            for start in range(0, len(records), self.chunk_size):
+                rows = list(enumerate(records[start : start + self.chunk_size], start=start + 1))
+                chunk_created, chunk_bulk_created, chunk_errors = self._import_chunk(rows)
+                created.extend(chunk_created)
+                bulk_created.extend(chunk_bulk_created)
+                errors.update(chunk_errors)
+
+                if self.progress_callback is not None:
+                    self.progress_callback(start + len(rows), len(records))
+
+            if self.atomic and errors:
+                transaction.set_rollback(True)
+                return [], errors
+
+            # Objects created with bulk_create() don't send the signals which record ObjectChanges and enqueue webhooks
+            if bulk_created:
+                from nautobot.extras.signals import handle_bulk_created_objects  # avoid circular import
+
+                for start in range(0, len(bulk_created), self.chunk_size):
+                    handle_bulk_created_objects(self.request, bulk_created[start : start + self.chunk_size])
+
+        return created, errors
+
+    def _import_chunk(self, rows):
+        """
+        Import the given (row number, record) pairs, returning the objects created, those of them created with
+        `bulk_create()`, and the errors of the invalid rows.
+
+        Object-level permissions are enforced once the rows are saved. Unless the import is atomic (and thus bound to be
+        rolled back anyway), the chunk is then rolled back and imported again without the rows whose objects the user
+        may not create.
+        """
+        if not rows:
+            return [], [], {}
+
+        sid = transaction.savepoint()
+        with CSVLookupCache():
+            created, bulk_created, errors = self._save_rows(rows)
+
+        permitted_pks = get_permitted_pks(self.request.user, self.permission, [obj for _, obj in created])
+        denied = {row for row, obj in created if obj.pk not in permitted_pks}
+        if denied and not self.atomic:
+            transaction.savepoint_rollback(sid)
+            rows = [(row, record) for row, record in rows if row not in denied]
+            created, bulk_created, errors = self._import_chunk(rows)
+        else:
+            transaction.savepoint_commit(sid)
+            created = [obj for _, obj in created]
+
+        for row in denied:
+            errors[row] = [f"Row {row}: Object import failed due to object-level permissions violation"]
+
+        return created, bulk_created, errors
+
+    def _bind_forms(self, rows):
+        """
+        Return a list of (row number, form) pairs for the given (row number, record) pairs, having retrieved the objects
+        referenced by the records in bulk into the active CSVLookupCache.
+        """
+        lookup_cache = CSVLookupCache.get_active()
+
+        # Objects referenced while the forms are initialized (e.g. to limit the choices of another field)
+        for name in self.lookup_fields:
+            field = self.model_form.base_fields[name]
+            values = {record.get(name) for _, record in rows}
+            lookup_cache.prefetch(field.queryset, self.headers.get(name) or field.to_field_name, values)
+
+        forms = []
+        for row, record in rows:
+            form = self.model_form(record, headers=self.headers)
+            restrict_form_fields(form, self.request.user)
+            forms.append((row, form))
+
+        # Objects referenced by each field, through its queryset as restricted (and possibly limited) for each form
+        for name in self.lookup_fields:
+            values_by_queryset = collections.OrderedDict()
+            for _, form in forms:
+                field = form.fields.get(name)
+                value = form.data.get(name)
+                if field is None or value in field.empty_values:
+                    continue
+                key = (lookup_cache.get_sql(field.queryset), field.to_field_name)
+                if key[0] is not None:
+                    values_by_queryset.setdefault(key, (field.queryset, set()))[1].add(value)
+            for (_, to_field_name), (queryset, values) in values_by_queryset.items():
+                lookup_cache.prefetch(queryset, to_field_name, values)
+
+        return forms
+
+    @staticmethod
+    def _get_errors(row, form):
+        return [f"Row {row} {field}: {message}" for field, messages in form.errors.items() for message in messages]
+
+    def _save_rows_one_at_a_time(self, rows):
+        created = []
+        errors = {}
+        for row, form in self._bind_forms(rows):
+            if form.is_valid():
+                created.append((row, self.save_obj(form)))
+            else:
+                errors[row] = self._get_errors(row, form)
+        return created, errors
+
+    def _save_rows(self, rows):
+        """
+        Validate and save the given (row number, record) pairs, returning a list of (row number, object) pairs for the
+        objects created, the list of those created with `bulk_create()`, and the errors of the invalid rows.
+        """
+        if not self.bulk_create:
+            created, errors = self._save_rows_one_at_a_time(rows)
+            return created, [], errors
+
+        valid = []
+        invalid = []
+        for row, form in self._bind_forms(rows):
+            form.defer_unique_validation = self.defer_unique_validation
+            (valid if form.is_valid() else invalid).append((row, form))
+        if self.defer_unique_validation:
+            self._validate_unique(valid)
+            invalid.extend((row, form) for row, form in valid if form.errors)
+            valid = [(row, form) for row, form in valid if not form.errors]
+
+        instances = [form.save(commit=False) for _, form in valid]
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create(instances)
+                for _, form in valid:
+                    if any(form.cleaned_data.get(field.name) for field in self.model._meta.many_to_many):
+                        form.save_m2m()
+        except IntegrityError:
+            # A conflict which validation didn't catch; validate and save every row of the chunk on its own instead
+            created, errors = self._save_rows_one_at_a_time(rows)
+            return created, [], errors
+
+        created = list(zip([row for row, _ in valid], instances))
+        records = dict(rows)
+
+        # Rows which failed to reference an object may refer to an object created by another row of the chunk, as
+        # rows saved one at a time can; validate these once more (and save them on their own) now that it exists
+        retry = [
+            (row, records[row])
+            for row, form in sorted(invalid, key=operator.itemgetter(0))
+            if any(isinstance(form.fields.get(name), CSVModelChoiceField) for name in form.errors)
+        ]
+        retry_created, errors = self._save_rows_one_at_a_time(retry)
+        created.extend(retry_created)
+        retried = {row for row, _ in retry}
+        for row, form in invalid:
+            if row not in retried:
+                errors[row] = self._get_errors(row, form)
+
+        return sorted(created, key=operator.itemgetter(0)), instances, errors
+
+    def _validate_unique(self, forms):
+        """
+        Validate the uniqueness of the instances of the given valid forms, against each other and against the database,
+        with a single query per unique constraint; any conflict is added to the errors of the form, as the form's own
+        `validate_unique()` would do for a single instance.
+        """
+        checks = collections.defaultdict(list)
+        for _, form in forms:
+            instance = form.instance
+            unique_checks, date_checks = instance._get_unique_checks(exclude=form._get_validation_exclusions())
+            if date_checks:
+                form.defer_unique_validation = False
+                form.validate_unique()
+                continue
+            for model_class, unique_check in unique_checks:
+                values = []
+                for field_name in unique_check:
+                    value = getattr(instance, instance._meta.get_field(field_name).attname)
+                    # As in Model._perform_unique_checks(), null values can't conflict
+                    if value is None or (value == "" and connection.features.interprets_empty_strings_as_nulls):
+                        break
+                    values.append(value)
+                else:
+                    checks[(model_class, unique_check)].append((form, tuple(values)))
+
+        for (model_class, unique_check), entries in checks.items():
+            if len(unique_check) == 1:
+                existing = model_class._default_manager.filter(
+                    **{f"{unique_check[0]}__in": [values[0] for _, values in entries]}
+                )
+            else:
+                existing = model_class._default_manager.filter(
+                    functools.reduce(operator.or_, (Q(**dict(zip(unique_check, values))) for _, values in entries))
+                )
+            seen = set(existing.values_list(*unique_check))
+
+            error_key = unique_check[0] if len(unique_check) == 1 else NON_FIELD_ERRORS
+            for form, values in entries:
+                if values in seen:
+                    form._update_errors(
+                        ValidationError({error_key: [form.instance.unique_error_message(model_class, unique_check)]})
+                    )
+                else:
+                    seen.add(values)
@@ -40,6 +40,7 @@ from .forms import (
 )
 from .utils import (
     add_blank_choice,
+    CSVLookupCache,
     expand_alphanumeric_pattern,
     expand_ipaddress_pattern,
     form_from_model,
@@ -83,6 +84,7 @@ __all__ = (
     "CSVContentTypeField",
     "CSVDataField",
     "CSVFileField",
+    "CSVLookupCache",
     "CSVModelChoiceField",
     "CSVModelForm",
     "CSVMultipleChoiceField",
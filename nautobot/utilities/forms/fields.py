@@ -19,7 +19,14 @@ from nautobot.utilities.choices import unpack_grouped_choices
 from nautobot.utilities.validators import EnhancedURLValidator
 from . import widgets
 from .constants import ALPHANUMERIC_EXPANSION_PATTERN, IP4_EXPANSION_PATTERN, IP6_EXPANSION_PATTERN
-from .utils import expand_alphanumeric_pattern, expand_ipaddress_pattern, parse_numeric_range, parse_csv, validate_csv
+from .utils import (
+    CSVLookupCache,
+    expand_alphanumeric_pattern,
+    expand_ipaddress_pattern,
+    parse_numeric_range,
+    parse_csv,
+    validate_csv,
+)
 
 __all__ = (
     "CommentField",
@@ -180,6 +187,17 @@ class CSVModelChoiceField(forms.ModelChoiceField):
     }
 
     def to_python(self, value):
+        # Use the objects retrieved in bulk by the CSVLookupCache in use, if any
+        lookup_cache = CSVLookupCache.get_active()
+        if lookup_cache is not None and value not in self.empty_values:
+            objects = lookup_cache.get(self.queryset, self.to_field_name, value)
+            if objects is not None:
+                if len(objects) > 1:
+                    raise forms.ValidationError(
+                        f'"{value}" is not a unique value for this field; multiple objects were found'
+                    )
+                return objects[0]
+
         try:
             return super().to_python(value)
         except MultipleObjectsReturned:
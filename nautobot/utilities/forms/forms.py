@@ -130,6 +130,9 @@ class CSVModelForm(forms.ModelForm):
     ModelForm used for the import of objects in CSV format.
     """
 
+    # Set by CSVImporter, which validates the uniqueness of many imported objects at once rather than one at a time
+    defer_unique_validation = False
+
     def __init__(self, *args, headers=None, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -139,6 +142,10 @@ class CSVModelForm(forms.ModelForm):
                 if to_field is not None:
                     self.fields[field].to_field_name = to_field
 
+    def validate_unique(self):
+        if not self.defer_unique_validation:
+            super().validate_unique()
+
 
 class PrefixFieldMixin(forms.ModelForm):
     """
@@ -1,6 +1,8 @@
 import re
+import threading
 
 from django import forms
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
 from django.forms.models import fields_for_model
 
 from nautobot.utilities.querysets import RestrictedQuerySet
@@ -8,6 +10,7 @@ from .constants import ALPHANUMERIC_EXPANSION_PATTERN, IP4_EXPANSION_PATTERN, IP
 
 __all__ = (
     "add_blank_choice",
+    "CSVLookupCache",
     "expand_alphanumeric_pattern",
     "expand_ipaddress_pattern",
     "form_from_model",
@@ -186,3 +189,90 @@ def validate_csv(headers, fields, required_fields):
     for f in required_fields:
         if f not in headers:
             raise forms.ValidationError(f'Required column header "{f}" not found.')
+
+
+class CSVLookupCache:
+    """
+    Cache of the objects referenced by rows of CSV data, retrieved in bulk so that each `CSVModelChoiceField` need not
+    look up its object with a query of its own.
+
+    Objects are cached per queryset (as identified by its SQL), so that a field whose queryset has been limited for a
+    given row (e.g. to the racks of the site named in the same row) is only ever given an object from that limited
+    queryset. Only objects found are cached; any other value is looked up in the database as usual.
+
+    While in use as a context manager, the cache is consulted by every `CSVModelChoiceField` in the current thread.
+    """
+
+    _active = threading.local()
+
+    def __init__(self):
+        # {(SQL of queryset, field name): {value: [matching objects]}}
+        self._objects = {}
+        # {id(queryset): (queryset, SQL of queryset)}, to compile the SQL of each queryset only once
+        self._queries = {}
+
+    def __enter__(self):
+        self._previous = getattr(self._active, "cache", None)
+        self._active.cache = self
+        return self
+
+    def __exit__(self, *exc_info):
+        self._active.cache = self._previous
+
+    @classmethod
+    def get_active(cls):
+        """
+        Return the cache in use in the current thread, if any.
+        """
+        return getattr(cls._active, "cache", None)
+
+    def get_sql(self, queryset):
+        """
+        Return the SQL identifying `queryset` in the cache, or None if the queryset is empty by definition.
+        """
+        entry = self._queries.get(id(queryset))
+        if entry is None or entry[0] is not queryset:
+            try:
+                sql = str(queryset.query)
+            except EmptyResultSet:
+                sql = None
+            entry = self._queries[id(queryset)] = (queryset, sql)
+        return entry[1]
+
+    def prefetch(self, queryset, to_field_name, values):
+        """
+        Retrieve and cache the objects of `queryset` whose `to_field_name` (or PK) matches any of the given values, with
+        a single query.
+        """
+        field_name = to_field_name or "pk"
+        sql = self.get_sql(queryset)
+        if sql is None:
+            return
+        try:
+            model_field = queryset.model._meta.pk if field_name == "pk" else queryset.model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return
+        objects = self._objects.setdefault((sql, field_name), {})
+
+        lookup_values = []
+        for value in {str(value) for value in values if value not in (None, "")} - objects.keys():
+            # Leave any value that isn't valid for the field (e.g. a malformed UUID) to the field's own validation
+            try:
+                lookup_values.append(model_field.to_python(value))
+            except ValidationError:
+                continue
+        if not lookup_values:
+            return
+
+        for obj in queryset.filter(**{f"{field_name}__in": lookup_values}):
+            objects.setdefault(str(getattr(obj, field_name)), []).append(obj)
+
+    def get(self, queryset, to_field_name, value):
+        """
+        Return the list of cached objects of `queryset` whose `to_field_name` (or PK) matches `value`, or None if no
+        such object has been cached.
+        """
+        sql = self.get_sql(queryset)
+        if sql is None:
+            return None
+        return self._objects.get((sql, to_field_name or "pk"), {}).get(str(value))
@@ -12,7 +12,7 @@ from django.utils.text import Truncator
 from django_tables2.data import TableQuerysetData
 from django_tables2.utils import Accessor
 
-from nautobot.extras.models import CustomField
+from nautobot.extras.models import ComputedField, CustomField
 from nautobot.extras.choices import CustomFieldTypeChoices
 
 
@@ -36,6 +36,12 @@ class BaseTable(tables.Table):
             name = "cf_{}".format(cf.name)
             self.base_columns[name] = CustomFieldColumn(cf)
 
+        # Add computed field columns
+        for computed_field in ComputedField.objects.get_for_model(self._meta.model):
+            self.base_columns[f"cpf_{computed_field.slug}"] = ComputedFieldColumn(computed_field)
+        # Rendered values of the computed fields for the rows being displayed, keyed by slug and then by primary key
+        self.computed_field_values = {}
+
         # Init table
         super().__init__(*args, **kwargs)
 
@@ -335,6 +341,31 @@ class ContentTypesColumn(tables.ManyToManyColumn):
         return value
 
 
+class ComputedFieldColumn(tables.Column):
+    """
+    Display computed fields, rendering each one for all rows of the current page at once.
+    """
+
+    def __init__(self, computedfield, *args, **kwargs):
+        self.computedfield = computedfield
+        kwargs["accessor"] = Accessor("pk")
+        kwargs["verbose_name"] = computedfield.label
+        kwargs["orderable"] = False
+        kwargs["empty_values"] = ()
+
+        super().__init__(*args, **kwargs)
+
+    def render(self, record, table):
+        values = table.computed_field_values.get(self.computedfield.slug, {})
+        if record.pk not in values:
+            records = [row.record for row in table.paginated_rows]
+            values = dict(zip([obj.pk for obj in records], self.computedfield.render_many(records)))
+            table.computed_field_values[self.computedfield.slug] = values
+        if record.pk not in values:
+            return self.computedfield.render(context={"obj": record})
+        return values[record.pk]
+
+
 class CustomFieldColumn(tables.Column):
     """
     Display custom fields in the appropriate format.
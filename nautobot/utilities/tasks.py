@@ -3,10 +3,14 @@ import logging
 import requests
 from cacheops.simple import cache, CacheMiss
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.http import QueryDict
+from django.utils.module_loading import import_string
 from packaging import version
 
 from nautobot.core.celery import nautobot_task
 from nautobot.utilities.config import get_settings_or_config
+from nautobot.utilities.utils import copy_safe_request
 
 # Get an instance of a logger
 logger = logging.getLogger("nautobot.releases")
@@ -53,3 +57,74 @@ def get_releases(pre_releases=False):
 
     # Since this is a Celery task, we can't return Version objects as they are not JSON serializable.
     return [(str(version), url) for version, url in releases]
+
+
+def enqueue_import_csv_data(view, request, headers, records, atomic=True):
+    """
+    Convenience wrapper for JobResult.enqueue_job() to enqueue the import_csv_data job for the given BulkImportView.
+    """
+    from nautobot.extras.models import JobResult
+
+    model = view.queryset.model
+    safe_request = copy_safe_request(request)
+    # The CSV data is passed to the job on its own; don't pass it a second time as part of the request
+    safe_request.POST = QueryDict()
+
+    return JobResult.enqueue_job(
+        import_csv_data,
+        f"Bulk import of {model._meta.verbose_name_plural}",
+        ContentType.objects.get_for_model(model),
+        request.user,
+        view_class=f"{type(view).__module__}.{type(view).__qualname__}",
+        headers=headers,
+        records=records,
+        atomic=atomic,
+        request=safe_request,
+    )
+
+
+@nautobot_task
+def import_csv_data(view_class, headers, records, atomic, request, job_result_pk):
+    """
+    Worker function to import rows of CSV data through the given BulkImportView, logging its progress and the errors
+    of any invalid rows to the JobResult.
+    """
+    from nautobot.extras.choices import JobResultStatusChoices, LogLevelChoices
+    from nautobot.extras.context_managers import change_logging
+    from nautobot.extras.models import JobResult
+
+    job_result = JobResult.objects.get(pk=job_result_pk)
+    job_result.set_status(JobResultStatusChoices.STATUS_RUNNING)
+    job_result.save()
+
+    def progress_callback(processed, total):
+        job_result.log(f"Processed {processed} of {total} rows", level_choice=LogLevelChoices.LOG_INFO, logger=logger)
+
+    try:
+        view = import_string(view_class)()
+        importer = view._get_importer(request, headers, atomic=atomic, progress_callback=progress_callback)
+        with change_logging(request):
+            created, errors = importer.run(records)
+
+        for row in sorted(errors):
+            for message in errors[row]:
+                job_result.log(message, level_choice=LogLevelChoices.LOG_FAILURE, logger=logger)
+
+        summary = f"Imported {len(created)} of {len(records)} rows"
+        job_result.log(summary, level_choice=LogLevelChoices.LOG_INFO, logger=logger)
+        job_result.data = {"output": summary}
+        if errors:
+            job_result.set_status(JobResultStatusChoices.STATUS_FAILED)
+        else:
+            job_result.set_status(JobResultStatusChoices.STATUS_COMPLETED)
+
+    except Exception as exc:
+        job_result.log(
+            f"Error while importing CSV data: {exc}",
+            level_choice=LogLevelChoices.LOG_FAILURE,
+            logger=logger,
+        )
+        job_result.set_status(JobResultStatusChoices.STATUS_ERRORED)
+
+    finally:
+        job_result.save()
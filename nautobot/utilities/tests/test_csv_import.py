@@ -0,0 +1,210 @@
+from unittest import mock
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nautobot.dcim.choices import InterfaceTypeChoices
+from nautobot.dcim.forms import InterfaceCSVForm
+from nautobot.dcim.models import Device, DeviceRole, DeviceType, Interface, Manufacturer, Site
+from nautobot.extras.models import JobResult, ObjectChange
+from nautobot.utilities.csv_import import CSVImporter
+from nautobot.utilities.forms import CSVLookupCache
+
+
+User = get_user_model()
+
+
+class CSVImporterTest(TestCase):
+    """
+    Validate the import of rows of CSV data by CSVImporter.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        site = Site.objects.create(name="Site 1", slug="site-1")
+        manufacturer = Manufacturer.objects.create(name="Manufacturer 1", slug="manufacturer-1")
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model="Device Type 1", slug="device-type-1")
+        device_role = DeviceRole.objects.create(name="Device Role 1", slug="device-role-1")
+        for i in range(1, 4):
+            Device.objects.create(name=f"Device {i}", device_type=device_type, device_role=device_role, site=site)
+
+        cls.headers = {"device": None, "name": None, "type": None}
+        cls.user = User.objects.create(username="User 1", is_superuser=True)
+
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+        self.request.id = uuid.uuid4()
+
+    def _get_records(self, count, start=0):
+        return [
+            {"device": f"Device {i % 3 + 1}", "name": f"eth{i}", "type": InterfaceTypeChoices.TYPE_1GE_FIXED}
+            for i in range(start, start + count)
+        ]
+
+    def test_import(self):
+        records = self._get_records(10)
+        progress = []
+        importer = CSVImporter(
+            InterfaceCSVForm,
+            self.headers,
+            self.request,
+            bulk_create=True,
+            progress_callback=lambda processed, total: progress.append((processed, total)),
+            chunk_size=4,
+        )
+
+        created, errors = importer.run(records)
+
+        self.assertEqual(errors, {})
+        self.assertEqual(len(created), 10)
+        self.assertEqual(Interface.objects.count(), 10)
+        self.assertEqual(progress, [(4, 10), (8, 10), (10, 10)])
+        self.assertEqual(ObjectChange.objects.filter(request_id=self.request.id).count(), 10)
+
+    def test_import_queries(self):
+        importer = CSVImporter(InterfaceCSVForm, self.headers, self.request, bulk_create=True)
+        # Populate the caches (such as that of content types) which are shared by all imports
+        importer.run(self._get_records(3, start=100))
+
+        with CaptureQueriesContext(connection) as queries:
+            created, errors = importer.run(self._get_records(10))
+        self.assertEqual(len(created), 10)
+
+        # Devices are retrieved and Interfaces inserted once for the whole chunk rather than once per row, so importing
+        # more rows in a single chunk takes exactly as many queries
+        with self.assertNumQueries(len(queries)):
+            created, errors = importer.run(self._get_records(40, start=10))
+        self.assertEqual(errors, {})
+        self.assertEqual(len(created), 40)
+
+    def test_import_atomic(self):
+        records = self._get_records(5)
+        records[2]["device"] = "Device 4"
+
+        for bulk_create in (True, False):
+            importer = CSVImporter(InterfaceCSVForm, self.headers, self.request, bulk_create=bulk_create)
+            created, errors = importer.run(records)
+
+            self.assertEqual(created, [])
+            self.assertEqual(list(errors), [3])
+            self.assertTrue(errors[3][0].startswith("Row 3 device: "))
+            self.assertEqual(Interface.objects.count(), 0)
+
+    def test_import_skip_invalid(self):
+        records = self._get_records(5)
+        records[2]["device"] = "Device 4"
+        # Duplicates the name of the first interface of the same device
+        records[4]["name"] = "eth1"
+
+        importer = CSVImporter(InterfaceCSVForm, self.headers, self.request, bulk_create=True, atomic=False)
+        created, errors = importer.run(records)
+
+        self.assertEqual(sorted(errors), [3, 5])
+        self.assertEqual([interface.name for interface in created], ["eth0", "eth1", "eth3"])
+        self.assertEqual(Interface.objects.count(), 3)
+
+    def test_import_lag_in_same_chunk(self):
+        headers = dict(self.headers, lag=None)
+        records = [
+            {"device": "Device 1", "name": "eth0", "type": InterfaceTypeChoices.TYPE_1GE_FIXED, "lag": "ae0"},
+            {"device": "Device 1", "name": "ae0", "type": InterfaceTypeChoices.TYPE_LAG, "lag": ""},
+        ]
+
+        created, errors = CSVImporter(InterfaceCSVForm, headers, self.request, bulk_create=True).run(records)
+
+        self.assertEqual(errors, {})
+        self.assertEqual([interface.name for interface in created], ["eth0", "ae0"])
+        self.assertEqual(Interface.objects.get(name="eth0").lag, Interface.objects.get(name="ae0"))
+
+
+class BulkImportViewTest(TestCase):
+    """
+    Validate the import options of BulkImportView.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        site = Site.objects.create(name="Site 1", slug="site-1")
+        manufacturer = Manufacturer.objects.create(name="Manufacturer 1", slug="manufacturer-1")
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model="Device Type 1", slug="device-type-1")
+        device_role = DeviceRole.objects.create(name="Device Role 1", slug="device-role-1")
+        for i in range(1, 3):
+            Device.objects.create(name=f"Device {i}", device_type=device_type, device_role=device_role, site=site)
+
+        cls.user = User.objects.create(username="User 1", is_superuser=True)
+        cls.url = reverse("dcim:interface_import")
+        cls.csv_data = "\n".join(
+            [
+                "device,name,type",
+                f"Device 1,eth0,{InterfaceTypeChoices.TYPE_1GE_FIXED}",
+                f"Device 3,eth1,{InterfaceTypeChoices.TYPE_1GE_FIXED}",
+                f"Device 2,eth2,{InterfaceTypeChoices.TYPE_1GE_FIXED}",
+            ]
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_import_invalid_rows(self):
+        response = self.client.post(self.url, {"csv_data": self.csv_data})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Row 2 device: ")
+        self.assertEqual(Interface.objects.count(), 0)
+
+    def test_import_skip_invalid_rows(self):
+        response = self.client.post(self.url, {"csv_data": self.csv_data, "skip_invalid": "on"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Row 2 device: ")
+        self.assertEqual(
+            sorted(Interface.objects.values_list("device__name", "name")), [("Device 1", "eth0"), ("Device 2", "eth2")]
+        )
+
+    @mock.patch("nautobot.utilities.tasks.import_csv_data.apply_async")
+    def test_import_in_background(self, apply_async):
+        response = self.client.post(self.url, {"csv_data": self.csv_data, "skip_invalid": "on", "background": "on"})
+
+        job_result = JobResult.objects.get()
+        self.assertRedirects(response, job_result.get_absolute_url(), fetch_redirect_response=False)
+        self.assertEqual(job_result.obj_type, ContentType.objects.get_for_model(Interface))
+        apply_async.assert_called_once()
+        kwargs = apply_async.call_args[1]["kwargs"]
+        self.assertEqual(kwargs["view_class"], "nautobot.dcim.views.InterfaceBulkImportView")
+        self.assertEqual(len(kwargs["records"]), 3)
+        self.assertFalse(kwargs["atomic"])
+        # The rows are only imported by the background job
+        self.assertEqual(Interface.objects.count(), 0)
+
+
+class CSVLookupCacheTest(TestCase):
+    """
+    Validate the bulk retrieval of related objects by CSVLookupCache.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(1, 4):
+            Site.objects.create(name=f"Site {i}", slug=f"site-{i}")
+
+    def test_prefetch(self):
+        queryset = Site.objects.all()
+        lookup_cache = CSVLookupCache()
+
+        with self.assertNumQueries(1):
+            lookup_cache.prefetch(queryset, "name", {"Site 1", "Site 2", "Site 4"})
+            self.assertEqual([site.slug for site in lookup_cache.get(queryset, "name", "Site 1")], ["site-1"])
+            self.assertIsNone(lookup_cache.get(queryset, "name", "Site 4"))
+            self.assertIsNone(lookup_cache.get(queryset, "slug", "site-1"))
+
+    def test_get_active(self):
+        self.assertIsNone(CSVLookupCache.get_active())
+        with CSVLookupCache() as lookup_cache:
+            self.assertIs(CSVLookupCache.get_active(), lookup_cache)
+        self.assertIsNone(CSVLookupCache.get_active())
@@ -3,10 +3,16 @@ from django.test import TestCase
 
 from nautobot.core.settings_funcs import is_truthy
 from nautobot.utilities.utils import (
+    buffer_stream,
     get_filterset_for_model,
+    get_jinja2_template,
     deepmerge,
     dict_to_filter_params,
     normalize_querydict,
+    queryset_iterator,
+    render_jinja2,
+    render_jinja2_many,
+    render_jinja2_stream,
 )
 from nautobot.dcim.models import Device, Site
 from nautobot.dcim.filters import DeviceFilterSet, SiteFilterSet
@@ -134,6 +140,58 @@ class DeepMergeTest(TestCase):
         self.assertEqual(deepmerge(dict1, dict2), merged)
 
 
+class RenderJinja2Test(TestCase):
+    """
+    Validate the operation of render_jinja2() and its compiled template cache.
+    """
+
+    def test_get_jinja2_template(self):
+        template_code = "{{ obj.name }} ({{ obj.slug }})"
+        template = get_jinja2_template(template_code)
+        self.assertIs(get_jinja2_template(template_code), template)
+        self.assertIsNot(get_jinja2_template(template_code + "!"), template)
+
+    def test_render_jinja2(self):
+        site = Site(name="Site 1", slug="site-1")
+        self.assertEqual(render_jinja2("{{ obj.name }} ({{ obj.slug }})", {"obj": site}), "Site 1 (site-1)")
+
+    def test_render_jinja2_many(self):
+        sites = [Site(name=f"Site {i}", slug=f"site-{i}") for i in range(3)]
+        self.assertEqual(
+            render_jinja2_many("{{ obj.slug }}", [{"obj": site} for site in sites]), ["site-0", "site-1", "site-2"]
+        )
+
+    def test_render_jinja2_stream(self):
+        context = {"numbers": range(20000)}
+        chunks = list(render_jinja2_stream("{% for n in numbers %}{{ n }},{% endfor %}", context))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), "".join(f"{n}," for n in range(20000)))
+
+
+class StreamingTest(TestCase):
+    """
+    Validate the operation of buffer_stream() and queryset_iterator().
+    """
+
+    def test_buffer_stream(self):
+        self.assertEqual(list(buffer_stream(["ab", "cd", "e"], buffer_size=3)), ["abcd", "e"])
+        self.assertEqual(list(buffer_stream([], buffer_size=3)), [])
+
+    def test_queryset_iterator(self):
+        for i in range(5):
+            Site.objects.create(name=f"Site {i}", slug=f"site-{i}")
+
+        queryset = Site.objects.order_by("name")
+        self.assertEqual(
+            [site.name for site in queryset_iterator(queryset, chunk_size=2)], [f"Site {i}" for i in range(5)]
+        )
+
+        # One query fetches all of the sites, and the tags of each chunk of sites are prefetched with one more
+        with self.assertNumQueries(4):
+            for site in queryset_iterator(queryset.prefetch_related("tags"), chunk_size=2):
+                list(site.tags.all())
+
+
 class GetFiltersetModelTest(TestCase):
     def test_get_filterset_for_model(self):
         self.assertEqual(get_filterset_for_model(Device), DeviceFilterSet)
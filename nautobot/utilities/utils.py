@@ -1,17 +1,18 @@
 import copy
 import datetime
-import json
 import inspect
+import threading
 from importlib import import_module
 from collections import OrderedDict, namedtuple
-from itertools import count, groupby
+from itertools import count, groupby, islice
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.serializers import serialize
-from django.db.models import Count, OuterRef, Subquery, Model
+from django.db.models import Count, OuterRef, Subquery, Model, prefetch_related_objects
 from django.db.models.functions import Coalesce
 from django.template import engines
+from prometheus_client import Counter
 
 from nautobot.dcim.choices import CableLengthUnitChoices
 from nautobot.extras.utils import is_taggable
@@ -114,8 +115,9 @@ def serialize_object(obj, extra=None, exclude=None):
     can be provided to exclude them from the returned dictionary. Private fields (prefaced with an underscore) are
     implicitly excluded.
     """
-    json_str = serialize("json", [obj])
-    data = json.loads(json_str)[0]["fields"]
+    # The "python" format yields the same data as the "json" format without a round trip through a JSON string;
+    # any remaining non-JSON values (such as datetimes) are encoded when the ObjectChange is saved.
+    data = serialize("python", [obj])[0]["fields"]
 
     # Include custom_field_data as "custom_fields"
     if hasattr(obj, "_custom_field_data"):
@@ -227,13 +229,123 @@ def to_meters(length, unit):
     raise ValueError("Unknown unit {}. Must be 'm', 'cm', 'ft', or 'in'.".format(unit))
 
 
+# Maximum number of compiled Jinja2 templates kept by get_jinja2_template()
+JINJA2_TEMPLATE_CACHE_SIZE = 1000
+
+jinja2_template_cache_hit = Counter("jinja2_template_cache_hit", "Number of compiled Jinja2 template cache hits")
+jinja2_template_cache_miss = Counter("jinja2_template_cache_miss", "Number of compiled Jinja2 template cache misses")
+
+_jinja2_templates = OrderedDict()
+_jinja2_templates_lock = threading.Lock()
+
+
+def get_jinja2_template(template_code):
+    """
+    Return the compiled Jinja2 template for the given template code.
+
+    Compiled templates are kept in a least-recently-used cache keyed by their source, shared by all threads of the
+    process, so each distinct template is only parsed and compiled once.
+    """
+    with _jinja2_templates_lock:
+        template = _jinja2_templates.get(template_code)
+        if template is not None:
+            _jinja2_templates.move_to_end(template_code)
+            jinja2_template_cache_hit.inc()
+            return template
+
+    jinja2_template_cache_miss.inc()
+    template = engines["jinja"].from_string(template_code)
+
+    with _jinja2_templates_lock:
+        _jinja2_templates[template_code] = template
+        if len(_jinja2_templates) > JINJA2_TEMPLATE_CACHE_SIZE:
+            _jinja2_templates.popitem(last=False)
+    return template
+
+
 def render_jinja2(template_code, context):
     """
     Render a Jinja2 template with the provided context. Return the rendered content.
     """
-    rendering_engine = engines["jinja"]
-    template = rendering_engine.from_string(template_code)
-    return template.render(context=context)
+    return get_jinja2_template(template_code).render(context=context)
+
+
+def render_jinja2_many(template_code, contexts):
+    """
+    Render a Jinja2 template once for each of the provided contexts. Return the list of rendered contents.
+    """
+    template = get_jinja2_template(template_code)
+    return [template.render(context=context) for context in contexts]
+
+
+def render_jinja2_stream(template_code, context):
+    """
+    Render a Jinja2 template with the provided context, yielding the rendered content piece by piece as it is generated
+    rather than building it in memory all at once.
+    """
+    template = get_jinja2_template(template_code)
+    # `template` is the engine's wrapper; the underlying jinja2.Template can generate its output lazily
+    return buffer_stream(template.template.generate(context))
+
+
+def buffer_stream(strings, buffer_size=64 * 1024):
+    """
+    Join an iterable of (typically small) strings into chunks of at least `buffer_size` characters, for use as the
+    content of a `StreamingHttpResponse`.
+    """
+    buffer = []
+    length = 0
+    for string in strings:
+        buffer.append(string)
+        length += len(string)
+        if length >= buffer_size:
+            yield "".join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def queryset_iterator(queryset, chunk_size=2000):
+    """
+    Iterate over the objects of a queryset without caching them, fetching `chunk_size` objects from the database at a
+    time. Unlike `QuerySet.iterator()`, the `prefetch_related()` lookups of the queryset are applied to each chunk.
+    """
+    iterator = queryset.iterator(chunk_size=chunk_size)
+    lookups = queryset._prefetch_related_lookups
+    if not lookups:
+        yield from iterator
+        return
+
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        prefetch_related_objects(chunk, *lookups)
+        yield from chunk
+
+
+class IteratorQuerySet:
+    """
+    Wrapper of a queryset which is iterated over with `queryset_iterator()`, in chunks and without caching the objects,
+    while any other attributes (such as `count()` or `filter()`) are those of the queryset.
+    """
+
+    def __init__(self, queryset, chunk_size=2000):
+        self.queryset = queryset
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        return queryset_iterator(self.queryset, chunk_size=self.chunk_size)
+
+    def __len__(self):
+        return self.queryset.count()
+
+    def __bool__(self):
+        return self.queryset.exists()
+
+    def __getattr__(self, name):
+        return getattr(self.queryset, name)
 
 
 def prepare_cloned_fields(instance):